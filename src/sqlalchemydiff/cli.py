@@ -0,0 +1,505 @@
+"""Command line interface for sqlalchemy-diff.
+
+Exit codes:
+
+- 0: the schemas match.
+- 1: the schemas differ.
+- 2: the comparison could not be performed.
+- 3: no differences were found, but the comparison is partial or sampled.
+"""
+
+import argparse
+import json
+import re
+import sys
+from collections import Counter
+from typing import TextIO
+
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import SQLAlchemyError
+
+from .comparer import Comparer, CompareResult
+from .connection import DBConnectionFactory, EngineGroup
+from .inspection.exceptions import SqlalchemydiffException
+from .inspection.records import to_builtin
+from .inspection.strategy import STRATEGIES
+from .inspection.throttle import Throttle
+from .snapshot import DEFAULT_CACHE_TTL, Snapshot, SnapshotCache
+
+
+EXIT_MATCH = 0
+EXIT_DIFFERENT = 1
+EXIT_ERROR = 2
+EXIT_PARTIAL = 3
+
+FORMATS = ("summary", "json", "jsonl")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="sqlalchemy-diff",
+        description=(
+            "Compare two database schemas. Each side is either a database URL or the path "
+            "to a snapshot file."
+        ),
+    )
+    parser.add_argument("one", help="URL or snapshot file of the first database")
+    parser.add_argument("two", help="URL or snapshot file of the second database")
+    parser.add_argument("--one-alias", default="one", help="alias of the first database")
+    parser.add_argument("--two-alias", default="two", help="alias of the second database")
+    parser.add_argument(
+        "--ignore",
+        action="append",
+        dest="ignores",
+        metavar="CLAUSE",
+        help=(
+            "ignore clause, for example 'employees', 'enums.status' or "
+            "'employees.columns.address' (can be repeated)"
+        ),
+    )
+    parser.add_argument(
+        "--include",
+        action="append",
+        metavar="PATTERN",
+        help=(
+            "only compare the tables matching this name or glob pattern, for example "
+            "'employees' or 'employee_*' (can be repeated)"
+        ),
+    )
+    parser.add_argument(
+        "--alembic-range",
+        metavar="BASE:HEAD",
+        help=(
+            "only compare the tables changed by the Alembic migrations after BASE, up to HEAD, "
+            "for example 'ae1027a6acf:heads' (needs alembic)"
+        ),
+    )
+    parser.add_argument(
+        "--alembic-config",
+        default="alembic.ini",
+        metavar="PATH",
+        help="Alembic config of the migrations (default: alembic.ini)",
+    )
+    parser.add_argument(
+        "--ignore-inspector",
+        action="append",
+        dest="ignore_inspectors",
+        metavar="KEY",
+        help="key of an inspector to skip, for example 'enums' (can be repeated)",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="number of threads used to inspect the databases (default: 1)",
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="keep the reflected objects in a compact form, to reduce memory usage",
+    )
+    parser.add_argument(
+        "--consistent",
+        action="store_true",
+        help="reflect each database as it was when the comparison started (PostgreSQL only)",
+    )
+    parser.add_argument(
+        "--one-sided-names-only",
+        action="store_true",
+        help="only record the names of the tables found in one database only",
+    )
+    parser.add_argument(
+        "--collapse-partitions",
+        action="store_true",
+        help=(
+            "leave out the partitions of partitioned tables, and only report the ones that do "
+            "not match their table (PostgreSQL only)"
+        ),
+    )
+    parser.add_argument(
+        "--template-pattern",
+        metavar="REGEX",
+        help=(
+            "group the tables whose names match REGEX by the template name its first group "
+            "captures, and only reflect one table of each template and the tables that do not "
+            "match it"
+        ),
+    )
+    parser.add_argument(
+        "--sample",
+        type=int,
+        metavar="N",
+        help=(
+            "only reflect a sample of N of the tables found in both databases, and report an "
+            "upper bound on the number of tables that differ"
+        ),
+    )
+    parser.add_argument(
+        "--sample-seed",
+        default="0",
+        metavar="SEED",
+        help="seed the sample of the tables is picked from (default: 0)",
+    )
+    parser.add_argument(
+        "--checkpoint-dir",
+        metavar="PATH",
+        help=(
+            "directory where the results are saved as they complete, to resume an interrupted "
+            "comparison"
+        ),
+    )
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=0,
+        help="number of times the reflection of a table is retried on transient errors",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        metavar="SECONDS",
+        help="deadline of the comparison, past which the result is partial",
+    )
+    parser.add_argument(
+        "--inspector-timeout",
+        action="append",
+        dest="inspector_timeouts",
+        metavar="KEY=SECONDS",
+        help="time limit of an inspector, for example 'columns=30' (can be repeated)",
+    )
+    parser.add_argument(
+        "--reflection",
+        choices=STRATEGIES,
+        default="bulk",
+        help=(
+            "how the tables are reflected: in bulk, one at a time, or chosen from the number "
+            "of tables of each database (default: bulk)"
+        ),
+    )
+    parser.add_argument(
+        "--max-qps",
+        type=float,
+        help="maximum number of statements per second on each database",
+    )
+    parser.add_argument(
+        "--max-connections",
+        type=int,
+        help="maximum number of inspections run at the same time on each database",
+    )
+    parser.add_argument(
+        "--statement-timeout",
+        type=float,
+        metavar="SECONDS",
+        help="statement timeout of the catalog queries, on PostgreSQL",
+    )
+    parser.add_argument(
+        "--lock-timeout",
+        type=float,
+        metavar="SECONDS",
+        help="lock timeout of the catalog queries, past which a table is skipped, on PostgreSQL",
+    )
+    parser.add_argument(
+        "--application-name",
+        help="application name of the catalog queries, on PostgreSQL",
+    )
+    parser.add_argument(
+        "--one-replica",
+        action="append",
+        dest="one_replicas",
+        metavar="URL",
+        help="read replica the first database is reflected from (can be repeated)",
+    )
+    parser.add_argument(
+        "--two-replica",
+        action="append",
+        dest="two_replicas",
+        metavar="URL",
+        help="read replica the second database is reflected from (can be repeated)",
+    )
+    parser.add_argument(
+        "--max-replica-lag",
+        type=float,
+        metavar="SECONDS",
+        help="replication lag past which a replica is not used, on PostgreSQL",
+    )
+    parser.add_argument(
+        "--history",
+        metavar="PATH",
+        help=(
+            "JSON file where the cost and mismatch frequency of the inspectors are recorded, to "
+            "run first the inspectors that are cheap or often differ"
+        ),
+    )
+    parser.add_argument(
+        "--fail-fast",
+        action="store_true",
+        help="stop at the first inspector that finds differences",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        help="directory where snapshots of the databases given as URLs are cached",
+    )
+    parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        metavar="SECONDS",
+        default=DEFAULT_CACHE_TTL,
+        help=f"maximum age of a cached snapshot (default: {DEFAULT_CACHE_TTL:g})",
+    )
+    parser.add_argument("--save-one", metavar="PATH", help="save a snapshot of the first side")
+    parser.add_argument("--save-two", metavar="PATH", help="save a snapshot of the second side")
+    parser.add_argument(
+        "-f",
+        "--format",
+        choices=FORMATS,
+        default="summary",
+        help="output format (default: summary)",
+    )
+    parser.add_argument("-o", "--output", help="file to write the output to (default: stdout)")
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    cache = SnapshotCache(args.cache_dir, ttl=args.cache_ttl) if args.cache_dir else None
+
+    try:
+        include = get_include(args.include, args.alembic_range, args.alembic_config, args.one)
+        one = get_side(args.one, cache, args.save_one, args.one_replicas, args.max_replica_lag)
+        two = get_side(args.two, cache, args.save_two, args.two_replicas, args.max_replica_lag)
+        result = Comparer(one, two).compare(
+            one_alias=args.one_alias,
+            two_alias=args.two_alias,
+            ignores=args.ignores,
+            ignore_inspectors=args.ignore_inspectors,
+            jobs=args.jobs,
+            compact=args.compact,
+            consistent=args.consistent,
+            include=include,
+            one_sided_names_only=args.one_sided_names_only,
+            partitions=args.collapse_partitions,
+            template_pattern=args.template_pattern,
+            sample=args.sample,
+            sample_seed=args.sample_seed,
+            checkpoint=args.checkpoint_dir,
+            retries=args.retries,
+            timeout=args.timeout,
+            inspector_timeouts=get_inspector_timeouts(args.inspector_timeouts),
+            history=args.history,
+            fail_fast=args.fail_fast,
+            reflection=args.reflection,
+            throttle=get_throttle(args),
+        )
+
+        cached = {
+            alias: cache.ages[source]
+            for alias, source in ((args.one_alias, args.one), (args.two_alias, args.two))
+            if cache is not None and source in cache.ages
+        }
+        if args.output:
+            with open(args.output, "w") as stream:
+                write_result(result, args.format, stream, cached)
+        else:
+            write_result(result, args.format, sys.stdout, cached)
+    except (
+        SqlalchemydiffException,
+        SQLAlchemyError,
+        ValueError,
+        OSError,
+        ImportError,
+        re.error,
+    ) as e:
+        print(f"sqlalchemy-diff: error: {e}", file=sys.stderr)
+        return EXIT_ERROR
+
+    if result.has_differences:
+        return EXIT_DIFFERENT
+    return EXIT_PARTIAL if result.is_partial else EXIT_MATCH
+
+
+def get_include(
+    include: list[str] | None, alembic_range: str | None, alembic_config: str, source: str
+) -> list[str] | None:
+    """Return the patterns of the tables to compare, `None` to compare all of them.
+
+    The tables changed by the migrations in `alembic_range`, run for the dialect of `source`,
+    are added to `include`. If these cannot all be known, all the tables are compared.
+    """
+    if alembic_range is None:
+        return include
+
+    base, separator, head = alembic_range.partition(":")
+    if not separator or not base or not head:
+        raise ValueError(f"Invalid Alembic range, expected BASE:HEAD: '{alembic_range}'")
+
+    from .migrations import get_migration_tables
+
+    tables = get_migration_tables(alembic_config, base, head, get_dialect_name(source))
+    if tables is None:
+        return None
+    return (include or []) + sorted(tables)
+
+
+def get_dialect_name(source: str) -> str:
+    """Return the name of the dialect of `source`, a database URL or a snapshot file."""
+    if "://" in source:
+        return make_url(source).get_backend_name()
+    return Snapshot.load(source).dialect
+
+
+def get_inspector_timeouts(inspector_timeouts: list[str] | None) -> dict[str, float]:
+    """Return the time limits of the inspectors, from their `KEY=SECONDS` options."""
+    timeouts = {}
+    for inspector_timeout in inspector_timeouts or []:
+        key, separator, seconds = inspector_timeout.partition("=")
+        try:
+            timeouts[key] = float(seconds)
+        except ValueError:
+            separator = ""
+        if not separator or not key:
+            raise ValueError(
+                f"Invalid inspector timeout, expected KEY=SECONDS: '{inspector_timeout}'"
+            )
+    return timeouts
+
+
+def get_throttle(args: argparse.Namespace) -> Throttle | None:
+    """Return the throttle of the reflection, if any of its options is given."""
+    options = {
+        "max_qps": args.max_qps,
+        "max_connections": args.max_connections,
+        "statement_timeout": args.statement_timeout,
+        "lock_timeout": args.lock_timeout,
+        "application_name": args.application_name,
+    }
+    if all(value is None for value in options.values()):
+        return None
+    return Throttle(**options)
+
+
+def get_side(
+    source: str,
+    cache: SnapshotCache | None = None,
+    save_to: str | None = None,
+    replicas: list[str] | None = None,
+    max_replica_lag: float | None = None,
+) -> Engine | EngineGroup | Snapshot:
+    """Return an engine, a group of engines or a snapshot for `source`.
+
+    A snapshot is taken, rather than returning an engine, when it has to be cached or saved. A
+    database with `replicas` is a group of engines, and its snapshot is taken from a replica.
+    """
+    if "://" not in source:
+        if replicas:
+            raise ValueError(f"Replicas need a database URL, not a snapshot: '{source}'")
+        side = Snapshot.load(source)
+    else:
+        side = cache.get(source) if cache else None
+        if side is None:
+            engine: Engine | EngineGroup
+            if replicas:
+                engine = DBConnectionFactory.create_engine_group(
+                    source, replicas, max_lag=max_replica_lag
+                )
+            else:
+                engine = DBConnectionFactory.create_engine(source)
+            if cache is None and save_to is None:
+                return engine
+
+            side = Snapshot.take(
+                engine.get_engines()[0] if isinstance(engine, EngineGroup) else engine
+            )
+            if cache:
+                cache.put(source, side)
+
+    if save_to:
+        side.dump(save_to)
+    return side
+
+
+def get_status(result: CompareResult, cached: dict[str, float] | None = None) -> dict | None:
+    """Return the status of `result`, if it is partial, sampled or compared from a cache.
+
+    `cached` has the age, in seconds, of the cached snapshot each side was compared from, by
+    alias. Returns `None` for a complete comparison of the databases.
+    """
+    if result.uncovered or result.unavailable:
+        status = "partial"
+    elif result.sample is not None:
+        status = "sampled"
+    elif cached:
+        status = "cached"
+    else:
+        return None
+    return {
+        "status": status,
+        "uncovered": result.uncovered,
+        "unavailable": result.unavailable,
+        "sample": result.sample._asdict() if result.sample is not None else None,
+        "cached": {alias: round(age, 1) for alias, age in (cached or {}).items()},
+    }
+
+
+def write_result(
+    result: CompareResult,
+    output_format: str,
+    stream: TextIO,
+    cached: dict[str, float] | None = None,
+) -> None:
+    """Write `result` to `stream` in `output_format`, one chunk at a time.
+
+    The `json` and `jsonl` formats have the status of the comparison, if any (see
+    :func:`get_status`): under the `status` key of the errors, and as the last record.
+    """
+    status = get_status(result, cached)
+    if output_format == "json":
+        encoder = json.JSONEncoder(indent=4, sort_keys=True, default=to_builtin)
+        errors = result.errors if status is None else {**result.errors, "status": status}
+        for chunk in encoder.iterencode(errors):
+            stream.write(chunk)
+        stream.write("\n")
+
+    elif output_format == "jsonl":
+        for record in result.iter_errors():
+            stream.write(json.dumps(record, sort_keys=True))
+            stream.write("\n")
+        if status is not None:
+            stream.write(json.dumps(status, sort_keys=True))
+            stream.write("\n")
+
+    else:
+        counts = Counter(record["inspector"] for record in result.iter_errors())
+        for inspector_key, count in counts.items():
+            stream.write(f"{inspector_key}: {count} difference(s)\n")
+        if result.sample is not None:
+            sample = result.sample
+            stream.write(
+                f"Sampled {sample.sampled} of {sample.tables} table(s), {sample.drifted} differ: "
+                f"at most {sample.max_drifted} differ with {sample.confidence:.0%} confidence.\n"
+            )
+        if result.uncovered:
+            uncovered = ", ".join(
+                key if tables is None else f"{key} ({len(tables)} table(s))"
+                for key, tables in result.uncovered.items()
+            )
+            stream.write(f"Partial comparison, not compared: {uncovered}.\n")
+        if result.unavailable:
+            unavailable = sorted(
+                {name for tables in result.unavailable.values() for name in tables}
+            )
+            stream.write(
+                f"Tables locked by other transactions, not compared: {', '.join(unavailable)}.\n"
+            )
+        if result.has_differences:
+            stream.write("Schemas differ.\n")
+        elif result.uncovered or result.unavailable:
+            stream.write("No differences found in what was compared.\n")
+        elif result.is_sampled:
+            stream.write("No differences found in the sampled tables.\n")
+        else:
+            stream.write("Schemas match.\n")
+
+
+if __name__ == "__main__":  # pragma: no cover
+    sys.exit(main())
@@ -1,16 +1,59 @@
 import json
 import logging
-from collections.abc import Iterable
+import os
+import re
+from collections.abc import Callable, Collection, Iterable, Iterator, Mapping
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import AbstractContextManager, ExitStack, closing, contextmanager, nullcontext
 from copy import deepcopy
+from dataclasses import dataclass, replace
+from functools import partial
+from itertools import chain
 from typing import Any
 
-from sqlalchemy.engine import Engine
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import DBAPIError
 
-from .connection import DBConnectionFactory
+from . import transaction
+from .connection import DBConnectionFactory, EngineGroup
+from .identical import find_identical_tables
 from .inspection import IgnoreSpecFactory, register
 from .inspection.base import BaseInspector
+from .inspection.checkpoint import Checkpoint, InspectionCheckpoint, RetryPolicy, retrying
+from .inspection.contention import Contention, skipping_contention
+from .inspection.deadline import Budget, within
 from .inspection.exceptions import InspectorNotSupported, UnknownInspector
-from .inspection.ignore import IgnoreSpecType
+from .inspection.ignore import (
+    IgnoreSpecType,
+    OneSidedTableSpec,
+    TableIgnoreSpec,
+    TableIncludeSpec,
+    TemplateTableSpec,
+    UnsampledTableSpec,
+)
+from .inspection.inspectors import TablesInspector
+from .inspection.partitions import (
+    Partition,
+    collapse_partitions,
+    find_partitioned_tables,
+    find_partitions,
+)
+from .inspection.records import Interner, to_builtin
+from .inspection.schema import reflect_schema
+from .inspection.strategy import (
+    SNAPSHOT,
+    STRATEGIES,
+    choose_strategy,
+    count_tables,
+    reflecting,
+)
+from .inspection.throttle import Throttle
+from .sampling import SampleResult, get_max_drifted, sample_tables
+from .scheduling import InspectorHistory
+from .snapshot import Snapshot
+from .stats import CompareStats, StatsRecorder
+from .templates import find_template_tables, get_definitions, get_template_tables
+from .tracing import span
 
 
 logger = logging.getLogger(__name__)
@@ -24,13 +67,46 @@ class CompareResult:
 
     :attribute result: The comparison result.
     :attribute errors: The errors of the comparison.
+    :attribute stats: The timing and query statistics of the comparison, if available.
+    :attribute sample: The :class:`~sqlalchemydiff.sampling.SampleResult` of the comparison, if
+        only a sample of the tables was compared.
+    :attribute uncovered: The inspectors that did not complete, before the deadline of the
+        comparison or because it stopped at the first difference, by key, with the tables they
+        did not compare, or `None` if they compared none.
+    :attribute unavailable: The tables that could not be reflected because they were locked by
+        other transactions, by inspector key.
+    :attribute reflection: The strategy each database was reflected with, by alias (see
+        :mod:`sqlalchemydiff.inspection.strategy`).
+    :attribute routes: The URLs of the engines each group of engines was reflected from, by
+        alias (see :class:`~sqlalchemydiff.connection.EngineGroup`).
+
+    If the comparison was run in compact mode, `result` and `errors` contain records rather
+    than dicts: these are converted back to dicts when the result is output.
     """
 
-    def __init__(self, result: dict, one_alias: str = "one", two_alias: str = "two"):
+    def __init__(
+        self,
+        result: dict,
+        one_alias: str = "one",
+        two_alias: str = "two",
+        stats: CompareStats | None = None,
+        sample: SampleResult | None = None,
+        uncovered: dict[str, list[str] | None] | None = None,
+        unavailable: dict[str, list[str]] | None = None,
+        reflection: dict[str, str] | None = None,
+        routes: dict[str, list[str]] | None = None,
+    ):
         self.result = result
+        self.stats = stats
+        self.sample = sample
+        self.uncovered = uncovered or {}
+        self.unavailable = unavailable or {}
+        self.reflection = reflection or {}
+        self.routes = routes or {}
         self._one_only_alias = f"{one_alias}_only"
         self._two_only_alias = f"{two_alias}_only"
-        self.errors = self._compile_errors()
+        with span("compile_errors"):
+            self.errors = self._compile_errors()
 
     def _prune_keys(self, data: dict) -> None:
         data.pop("common", None)
@@ -56,8 +132,54 @@ class CompareResult:
 
     @property
     def is_match(self):
-        """Tell if comparison was a match."""
-        return not any(self.errors.values())
+        """Tell if comparison was a match.
+
+        A partial comparison is never a match, even if what was compared matches, since the
+        tables it did not compare may differ.
+        """
+        return not self.has_differences and not self.is_partial
+
+    @property
+    def has_differences(self) -> bool:
+        """Tell if differences were found, in what was compared."""
+        return any(self.errors.values())
+
+    @property
+    def is_partial(self) -> bool:
+        """Tell if some inspectors did not complete, some tables were unavailable, or only a
+        sample of the tables was compared."""
+        return bool(self.uncovered or self.unavailable or self.is_sampled)
+
+    @property
+    def is_sampled(self) -> bool:
+        """Tell if only a sample of the tables was compared, leaving some tables out."""
+        return self.sample is not None and self.sample.sampled < self.sample.tables
+
+    def iter_errors(self) -> Iterator[dict]:
+        """Yield the `errors` as flat records, one per differing item.
+
+        Each record has the `inspector` key, the `table` name (`None` for database level
+        inspectors), the `kind` of difference (for example `one_only` or `diff`), and the
+        `item` itself.
+        """
+        for inspector_key, inspector_errors in self.errors.items():
+            inspector_cls = register[inspector_key][1]
+            if inspector_cls.db_level:
+                tables = [(None, inspector_errors)]
+            else:
+                tables = inspector_errors.items()
+
+            for table_name, table_errors in tables:
+                for kind, items in table_errors.items():
+                    if isinstance(items, Mapping):
+                        items = [items]
+                    for item in items:
+                        yield {
+                            "inspector": inspector_key,
+                            "table": table_name,
+                            "kind": kind,
+                            "item": to_builtin(item),
+                        }
 
     def dump_result(self, filename):
         """Dump `result` dict to a file."""
@@ -68,17 +190,185 @@ class CompareResult:
         return self._dump(self.errors, filename)
 
     def _dump(self, data_to_dump, filename):
-        data = self._dump_data(data_to_dump)
-        self._write_data_to_file(data, filename)
+        with span("dump", filename=str(filename)):
+            data = self._dump_data(data_to_dump)
+            self._write_data_to_file(data, filename)
 
     def _dump_data(self, data):
-        return json.dumps(data, indent=4, sort_keys=True)
+        return json.dumps(data, indent=4, sort_keys=True, default=to_builtin)
 
     def _write_data_to_file(self, data, filename):
         with open(filename, "w") as stream:
             stream.write(data)
 
 
+@dataclass(frozen=True)
+class CompareOptions:
+    """The options of a comparison (see :meth:`Comparer.compare`).
+
+    If `include` is given, only the tables matching one of its table names or glob patterns
+    (for example `employees` or `employee_*`) are compared. The other tables are neither
+    reflected nor diffed, as if they were ignored.
+
+    If `one_sided_names_only` is true, the tables of both databases are inspected first, and
+    the tables found in one database only are then not reflected by the table level
+    inspectors: only their names are recorded, by the `tables` inspector.
+
+    If `partitions` is true, the partitions of the partitioned tables of each database are
+    left out of the comparison, and the `tables` inspector reports, for each partitioned
+    table, the `mismatched_partitions` whose structure does not match it (see
+    :mod:`sqlalchemydiff.inspection.partitions`).
+
+    If `template_pattern` is given, the tables whose names match it, such as per-tenant
+    tables, are grouped by the name of their template, captured by its first group (for
+    example `tenant_\\d+_(\\w+)`). Only one representative of each template, and the tables
+    whose structure does not match it, are reflected by the table level inspectors: the
+    other tables are only recorded by the `tables` inspector (see
+    :mod:`sqlalchemydiff.templates`). Both sides must be databases.
+
+    If `sample` is given, only a deterministic pseudo-random sample of `sample` of the
+    tables found in both databases, picked from `sample_seed`, is reflected by the table
+    level inspectors, along with the tables found in one database only. The `sample` of the
+    result then has an upper bound, with `sample_confidence`, on the number of tables that
+    differ (see :mod:`sqlalchemydiff.sampling`).
+
+    If `checkpoint` is given, the results of the inspections are saved in that directory as
+    they complete, down to each table. If the comparison is interrupted, running it again
+    with the same `checkpoint` reuses them, and only reflects what is missing. The
+    checkpoint is cleared once the comparison completes, unless it is partial (see
+    :mod:`sqlalchemydiff.inspection.checkpoint`).
+
+    The reflection of a table that fails with a transient error, a dropped connection or a
+    serialization failure, is retried up to `retries` times, with an exponential backoff.
+
+    If `timeout` is given, the comparison must complete within `timeout` seconds, and each
+    inspector whose key is in `inspector_timeouts` must complete within the given number of
+    seconds. On PostgreSQL, the statements are cancelled past the deadline, through their
+    `statement_timeout`. Once the deadline is past, the inspectors stop reflecting tables,
+    and the result is partial: its `uncovered` inspectors and tables are left out of the
+    comparison (see :mod:`sqlalchemydiff.inspection.deadline`). The phases run before the
+    inspections, such as finding the partitions or the templates, are not bounded.
+
+    If `history` is given, the cost and the mismatch frequency of each inspector are recorded
+    in that JSON file across comparisons, and the inspectors are run in the order that finds
+    the first difference the soonest (see :mod:`sqlalchemydiff.scheduling`). If `fail_fast`
+    is true, the comparison stops at the first inspector that finds differences, and the
+    inspectors that were not run are `uncovered`.
+
+    The tables are reflected with the `reflection` strategy: ``bulk``, ``per_table``, or
+    ``auto`` to count the tables of each database first, and only use the bulk backend of
+    the large ones. The strategy used for each database is recorded in the `reflection` of
+    the result (see :mod:`sqlalchemydiff.inspection.strategy`).
+
+    With a `throttle`, the statements and the concurrent inspections on each database are
+    limited, and on PostgreSQL the catalog queries run with the session settings of the
+    throttle, such as a low `lock_timeout` (see :mod:`sqlalchemydiff.inspection.throttle`).
+    With a `lock_timeout`, a table that is locked by another transaction is reflected again
+    after the other tables, and left out of the comparison if it is still locked: it is then
+    `unavailable` (see :mod:`sqlalchemydiff.inspection.contention`).
+
+    A side that is a group of engines is reflected from its replicas that are connected to
+    and caught up when the comparison starts, or from its primary if none of them is. The
+    inspectors are spread across these replicas, so that each one runs a share of the
+    catalog queries, and the engines each side was reflected from are recorded in the
+    `routes` of the result. With `consistent`, a single engine of the group is reflected.
+
+    If `jobs` is greater than one, the inspectors are run concurrently on both databases,
+    using up to `jobs` threads.
+
+    If `compact` is true, the reflected objects are kept as compact, immutable records
+    rather than dicts, which reduces the memory needed to compare large schemas. Equal
+    strings, values and records are also shared across tables and across both databases.
+
+    If `skip_identical` is true, both sides must be schemas of the same database. The tables
+    that are identical in both are then found in the database (see
+    :mod:`sqlalchemydiff.identical`), and left out of the comparison, as if they were
+    ignored: they are neither reflected nor diffed, and are not part of the `result`.
+
+    If `consistent` is true, each database is reflected as it was when the comparison
+    started, even with `jobs` greater than one, and even if its schema is changed during
+    the comparison (see :mod:`sqlalchemydiff.transaction`). This is only supported on
+    PostgreSQL.
+    """
+
+    jobs: int = 1
+    compact: bool = False
+    skip_identical: bool = False
+    consistent: bool = False
+    include: Iterable[str] | None = None
+    one_sided_names_only: bool = False
+    partitions: bool = False
+    template_pattern: str | re.Pattern | None = None
+    sample: int | None = None
+    sample_seed: int | str = 0
+    sample_confidence: float = 0.95
+    checkpoint: str | os.PathLike | None = None
+    retries: int = 0
+    timeout: float | None = None
+    inspector_timeouts: Mapping[str, float] | None = None
+    history: str | os.PathLike | None = None
+    fail_fast: bool = False
+    reflection: str = "bulk"
+    throttle: Throttle | None = None
+
+    def __post_init__(self):
+        if self.jobs < 1:
+            raise ValueError("jobs must be a positive integer")
+        if self.sample is not None and self.sample < 0:
+            raise ValueError("sample must not be negative")
+        if not 0 < self.sample_confidence < 1:
+            raise ValueError("sample_confidence must be between 0 and 1")
+        if self.retries < 0:
+            raise ValueError("retries must not be negative")
+        if self.reflection not in STRATEGIES:
+            raise ValueError(f"reflection must be one of: {', '.join(STRATEGIES)}")
+        unknown_inspectors = set(self.inspector_timeouts or {}) - register.keys()
+        if unknown_inspectors:
+            raise UnknownInspector(f"Unknown inspector: {', '.join(sorted(unknown_inspectors))}")
+        if self.template_pattern is not None:
+            template_pattern = re.compile(self.template_pattern)
+            if template_pattern.groups < 1:
+                raise ValueError("template_pattern needs a group capturing the template name")
+            object.__setattr__(self, "template_pattern", template_pattern)
+
+
+class _InspectionContext:
+    """The state of a comparison its inspections are run with.
+
+    The databases that have an exported snapshot in `snapshot_ids`, by alias, are reflected
+    through a connection that imports it, and the partitions of the databases in
+    `partitions_by_alias` are collapsed, into their partitioned tables in `partitioned_by_alias`.
+    The inspections are resumed from `checkpoint`, if any, and the tables are reflected with
+    `retry_policy`, until the deadline of `budget`, with the strategy of each database in
+    `strategies`, by alias, within the limits of `throttle`. If `contentions` is given, the
+    tables locked by other transactions are skipped, and recorded in a contention for each
+    inspection, by inspector key and alias. The databases are reflected from the engines of
+    their `routes`, by alias.
+    """
+
+    def __init__(
+        self,
+        recorder: StatsRecorder,
+        checkpoint: Checkpoint | None = None,
+        retry_policy: RetryPolicy | None = None,
+        budget: Budget | None = None,
+        throttle: Throttle | None = None,
+        contentions: dict[tuple[str, str], Contention] | None = None,
+        routes: dict[str, list[Engine | Snapshot]] | None = None,
+    ):
+        self.recorder = recorder
+        self.checkpoint = checkpoint
+        self.retry_policy = retry_policy
+        self.budget = budget
+        self.throttle = throttle
+        self.contentions = contentions
+        self.routes = routes or {}
+        self.snapshot_ids: dict[str, str] = {}
+        self.strategies: dict[str, str] = {}
+        self.partitions_by_alias: dict[str, dict[str, Partition]] = {}
+        self.partitioned_by_alias: dict[str, set[str]] = {}
+
+
 class Comparer:
     """
     Compare two database schemas.
@@ -88,6 +378,13 @@ class Comparer:
 
     Simply call the `compare` method to get the result.
 
+    Either side can also be a :class:`~sqlalchemydiff.snapshot.Snapshot`, to compare a
+    database against a previously captured schema, or an
+    :class:`~sqlalchemydiff.connection.EngineGroup`, to reflect a database from its read replicas.
+
+    By default, the default schema of each engine is compared. Pass `one_schema` and
+    `two_schema` to compare other schemas, for example two schemas of the same database.
+
     You can customise how certain aspects of the comparison are performed by setting your own
     classes for the `ignore_spec_factory` and `compare_result_class` attributes.
     """
@@ -95,9 +392,20 @@ class Comparer:
     ignore_spec_factory_class = IgnoreSpecFactory
     compare_result_class = CompareResult
 
-    def __init__(self, db_one_engine: Engine, db_two_engine: Engine):
+    # Schema the second database is attached as, by `from_sqlite_files`
+    attached_schema = "sqlalchemydiff_two"
+
+    def __init__(
+        self,
+        db_one_engine: Engine | EngineGroup | Snapshot,
+        db_two_engine: Engine | EngineGroup | Snapshot,
+        one_schema: str | None = None,
+        two_schema: str | None = None,
+    ):
         self.db_one_engine = db_one_engine
         self.db_two_engine = db_two_engine
+        self.one_schema = one_schema
+        self.two_schema = two_schema
 
     @classmethod
     def from_params(
@@ -106,13 +414,46 @@ class Comparer:
         db_two_uri: str,
         db_one_params: dict[str, Any] | None = None,
         db_two_params: dict[str, Any] | None = None,
+        db_one_replica_uris: Iterable[str] | None = None,
+        db_two_replica_uris: Iterable[str] | None = None,
+        max_replica_lag: float | None = None,
+    ):
+        """Create the engines of both databases.
+
+        A database with `replica_uris` is reflected from these read replicas, falling back to
+        the primary at its URI, as a group of engines (see
+        :class:`~sqlalchemydiff.connection.EngineGroup`).
+        """
+        engines = []
+        for uri, params, replica_uris in (
+            (db_one_uri, db_one_params, db_one_replica_uris),
+            (db_two_uri, db_two_params, db_two_replica_uris),
+        ):
+            if replica_uris:
+                engines.append(
+                    DBConnectionFactory.create_engine_group(
+                        uri, replica_uris, max_lag=max_replica_lag, **(params or {})
+                    )
+                )
+            else:
+                engines.append(DBConnectionFactory.create_engine(uri, **(params or {})))
+
+        return cls(*engines)
+
+    @classmethod
+    def from_sqlite_files(
+        cls, db_one_path: str, db_two_path: str, params: dict[str, Any] | None = None
     ):
-        db_one_params = db_one_params or {}
-        db_two_params = db_two_params or {}
-        db_one_engine = DBConnectionFactory.create_engine(db_one_uri, **db_one_params)
-        db_two_engine = DBConnectionFactory.create_engine(db_two_uri, **db_two_params)
+        """Compare two SQLite files through a single engine.
 
-        return cls(db_one_engine, db_two_engine)
+        The second file is attached to the connections to the first one, so that both are
+        reflected from the same connection, and the identical tables can be found with
+        `skip_identical`.
+        """
+        engine = DBConnectionFactory.create_engine(f"sqlite:///{db_one_path}", **(params or {}))
+        DBConnectionFactory.attach_sqlite_database(engine, db_two_path, cls.attached_schema)
+
+        return cls(engine, engine, two_schema=cls.attached_schema)
 
     def compare(
         self,
@@ -120,23 +461,494 @@ class Comparer:
         two_alias: str = "two",
         ignores: list[str] | None = None,
         ignore_inspectors: Iterable[str] | None = None,
+        options: CompareOptions | None = None,
+        **kwargs: Any,
     ):
+        """Compare the two databases.
+
+        The comparison is run with `options`, where the keyword arguments, if any, override the
+        options of the same name (see :class:`CompareOptions`), so that, for example,
+        ``compare(jobs=4)`` is the same as ``compare(options=CompareOptions(jobs=4))``.
+
+        The time spent and the statements executed by each inspector on each database, as well
+        as the time spent diffing, are recorded in the `stats` of the result.
+        """
+        options = replace(options or CompareOptions(), **kwargs)
+        if options.template_pattern is not None and self._has_snapshot():
+            raise ValueError("template_pattern needs both sides to be databases")
+        budget = (
+            Budget(options.timeout, options.inspector_timeouts)
+            if options.timeout is not None or options.inspector_timeouts
+            else None
+        )
+
         ignore_specs = self.ignore_spec_factory_class().create_specs(register, ignores)
+        ignore_specs += [TableIncludeSpec(pattern) for pattern in options.include or []]
+        routes = self._route(one_alias, two_alias)
+        if options.consistent:
+            # An exported snapshot can only be imported on the server it was exported from
+            routes = {alias: engines[:1] for alias, engines in routes.items()}
+        if options.skip_identical:
+            ignore_specs += [
+                TableIgnoreSpec(name) for name in sorted(self._find_identical(routes[one_alias][0]))
+            ]
 
         filtered_inspectors = self._filter_inspectors(set(ignore_inspectors or set()))
+        interner = Interner() if options.compact else None
+
+        def make_inspector(inspector_class: type[BaseInspector]) -> BaseInspector:
+            return inspector_class(
+                one_alias=one_alias,
+                two_alias=two_alias,
+                compact=options.compact,
+                interner=interner,
+            )
+
+        inspectors = [
+            (key, make_inspector(inspector_class)) for key, inspector_class in filtered_inspectors
+        ]
+        inspector_history = (
+            InspectorHistory(options.history) if options.history is not None else None
+        )
+        if inspector_history is not None:
+            order = inspector_history.order(key for key, _ in inspectors)
+            inspectors.sort(key=lambda item: order.index(item[0]))
+
+        engines = [
+            (alias, engine)
+            for alias in (one_alias, two_alias)
+            for engine in routes[alias]
+            if not isinstance(engine, Snapshot)
+        ]
+        if options.consistent and not all(
+            transaction.is_supported(engine) for _, engine in engines
+        ):
+            raise ValueError("consistent reflection is only supported on PostgreSQL")
+        throttle = options.throttle
+        context = _InspectionContext(
+            recorder=StatsRecorder(),
+            checkpoint=Checkpoint(options.checkpoint) if options.checkpoint is not None else None,
+            retry_policy=RetryPolicy(options.retries),
+            budget=budget,
+            throttle=throttle,
+            contentions=(
+                {} if throttle is not None and throttle.lock_timeout is not None else None
+            ),
+            routes=routes,
+        )
+        recorder = context.recorder
 
         result = {}
-        with self.db_one_engine.begin(), self.db_two_engine.begin():
-            for key, inspector_class in filtered_inspectors:
-                inspector = inspector_class(one_alias=one_alias, two_alias=two_alias)
+        uncovered: dict[str, list[str] | None] = {}
+        unavailable: dict[str, list[str]] = {}
+        with ExitStack() as stack:
+            stack.enter_context(recorder.time_comparison())
+            stack.enter_context(recorder.listen(engine for _, engine in engines))
+            if budget is not None and (throttle is None or throttle.statement_timeout is None):
+                stack.enter_context(budget.listen(engine for _, engine in engines))
+            if throttle is not None:
+                # With a statement timeout, it also lowers it to the time left before the deadline
+                stack.enter_context(throttle.listen(engine for _, engine in engines))
+            for alias, engine in engines:
+                with span("connect", database=alias):
+                    if options.consistent:
+                        context.snapshot_ids[alias] = stack.enter_context(
+                            transaction.export_snapshot(engine)
+                        )
+                    else:
+                        stack.enter_context(engine.begin())
+
+            context.strategies = {
+                alias: (
+                    SNAPSHOT
+                    if isinstance(engine, Snapshot)
+                    else choose_strategy(
+                        options.reflection,
+                        engine.dialect.name,
+                        partial(
+                            self._count_tables, engine, schema, context.snapshot_ids.get(alias)
+                        ),
+                    )
+                )
+                for alias, engine, schema in (
+                    (one_alias, routes[one_alias][0], self.one_schema),
+                    (two_alias, routes[two_alias][0], self.two_schema),
+                )
+            }
+
+            if options.partitions:
+                for alias, engine, schema in (
+                    (one_alias, routes[one_alias][0], self.one_schema),
+                    (two_alias, routes[two_alias][0], self.two_schema),
+                ):
+                    if not isinstance(engine, Snapshot):
+                        (
+                            context.partitions_by_alias[alias],
+                            context.partitioned_by_alias[alias],
+                        ) = self._find_partitions(engine, schema, context.snapshot_ids.get(alias))
+
+            if options.template_pattern is not None:
+                ignore_specs = ignore_specs + self._find_templates(
+                    options.template_pattern,
+                    make_inspector(TablesInspector),
+                    ignore_specs,
+                    context,
+                )
 
-                db_one_info = self._get_db_info(ignore_specs, inspector, self.db_one_engine)
-                db_two_info = self._get_db_info(ignore_specs, inspector, self.db_two_engine)
+            inspections: list[tuple[str, BaseInspector, Any, Any]] = []
+            common_tables, sampled_tables = None, None
+            if options.one_sided_names_only or options.sample is not None:
+                inspections, db_one_tables, db_two_tables = self._inspect_tables(
+                    inspectors, make_inspector, ignore_specs, context
+                )
+                inspectors = [
+                    (key, inspector) for key, inspector in inspectors if key != TablesInspector.key
+                ]
+
+                if db_one_tables is not None and db_two_tables is not None:
+                    if options.one_sided_names_only:
+                        one_sided = sorted(db_one_tables ^ db_two_tables)
+                        ignore_specs = ignore_specs + [OneSidedTableSpec(n) for n in one_sided]
+                    if options.sample is not None:
+                        common_tables = (db_one_tables & db_two_tables) - {
+                            spec.table_name
+                            for spec in ignore_specs
+                            if isinstance(spec, TemplateTableSpec)
+                        }
+                        sampled_tables = sample_tables(
+                            common_tables, options.sample, options.sample_seed
+                        )
+                        ignore_specs = ignore_specs + [
+                            UnsampledTableSpec(name)
+                            for name in sorted(common_tables - sampled_tables)
+                        ]
+
+            pending = stack.enter_context(
+                closing(self._inspect(inspectors, ignore_specs, options.jobs, context))
+            )
+            mismatched = {}
+            differing_tables: set[str] = set()
+            for key, inspector, db_one_info, db_two_info in chain(inspections, pending):
+                left_out = []
+                if budget is not None:
+                    tables = budget.get_uncovered(key, (one_alias, two_alias))
+                    if tables is None or tables:
+                        uncovered[key] = tables
+                    left_out += tables or []
+                if context.contentions is not None:
+                    tables = sorted(
+                        {
+                            table_name
+                            for alias in (one_alias, two_alias)
+                            if (key, alias) in context.contentions
+                            for table_name in context.contentions[key, alias].unavailable_tables
+                        }
+                    )
+                    if tables:
+                        unavailable[key] = tables
+                    left_out += tables
+                if left_out and db_one_info is not None and db_two_info is not None:
+                    db_one_info = self._leave_out(db_one_info, left_out)
+                    db_two_info = self._leave_out(db_two_info, left_out)
 
                 if db_one_info is not None and db_two_info is not None:
-                    result[key] = inspector.diff(db_one_info, db_two_info)
+                    with span("diff", inspector=key), recorder.time_diff(key):
+                        result[key] = inspector.diff(db_one_info, db_two_info)
+                    mismatched[key] = self._differs(inspector, result[key])
+                    if not inspector.db_level:
+                        differing_tables |= self._get_differing_tables(inspector, result[key])
+                    if options.fail_fast and mismatched[key]:
+                        break
+
+            if options.fail_fast and any(mismatched.values()):
+                uncovered.update(
+                    (key, None)
+                    for key, _ in filtered_inspectors
+                    if key not in mismatched and key not in uncovered
+                )
+
+        if inspector_history is not None:
+            inspector_history.record(
+                {
+                    key: (self._get_cost(recorder.stats, key), differs)
+                    for key, differs in mismatched.items()
+                    if key not in uncovered and key not in unavailable
+                }
+            )
+            inspector_history.save()
+        result = {key: result[key] for key, _ in filtered_inspectors if key in result}
+
+        if context.checkpoint is not None and not uncovered and not unavailable:
+            context.checkpoint.clear()
+
+        sample = None
+        if common_tables is not None and sampled_tables is not None:
+            drifted = len(differing_tables & sampled_tables)
+            tables, sampled = len(common_tables), len(sampled_tables)
+            sample = SampleResult(
+                tables,
+                sampled,
+                drifted,
+                options.sample_confidence,
+                get_max_drifted(tables, sampled, drifted, options.sample_confidence),
+            )
+        return self.compare_result_class(
+            result,
+            one_alias=one_alias,
+            two_alias=two_alias,
+            stats=recorder.stats,
+            sample=sample,
+            uncovered=uncovered,
+            unavailable=unavailable,
+            reflection=context.strategies,
+            routes={
+                alias: [engine.url.render_as_string(hide_password=True) for engine in routes[alias]]
+                for alias, side in (
+                    (one_alias, self.db_one_engine),
+                    (two_alias, self.db_two_engine),
+                )
+                if isinstance(side, EngineGroup)
+            },
+        )
+
+    def _inspect_tables(
+        self,
+        inspectors: list[tuple[str, BaseInspector]],
+        make_inspector: Callable[[type[BaseInspector]], BaseInspector],
+        ignore_specs: list[IgnoreSpecType],
+        context: _InspectionContext,
+    ) -> tuple[list[tuple[str, BaseInspector, Any, Any]], set[str] | None, set[str] | None]:
+        """Inspect the tables of both databases, before the table level inspectors.
+
+        Returns the inspection of the tables, if the `tables` inspector is in `inspectors`, and
+        the names of the tables of each database, `None` for a database they are unknown for.
+        """
+        tables_inspector = dict(inspectors).get(TablesInspector.key)
+        inspections = list(
+            self._inspect(
+                [(TablesInspector.key, tables_inspector or make_inspector(TablesInspector))],
+                ignore_specs,
+                1,
+                context,
+            )
+        )
+        _, _, db_one_tables, db_two_tables = inspections[0]
+
+        return (
+            inspections if tables_inspector else [],
+            None if db_one_tables is None else set(db_one_tables),
+            None if db_two_tables is None else set(db_two_tables),
+        )
+
+    def _find_templates(
+        self,
+        pattern: re.Pattern,
+        tables_inspector: BaseInspector,
+        ignore_specs: list[IgnoreSpecType],
+        context: _InspectionContext,
+    ) -> list[TemplateTableSpec]:
+        """Return a spec for each table that matches the representative of its template.
+
+        The tables ignored by `ignore_specs`, and the partitions that are collapsed, are not
+        grouped, so that a representative is never left out of the comparison.
+        """
+        ignore_clauses = tables_inspector._filter_ignorers(ignore_specs)
+        tables = []
+        for alias, schema in (
+            (tables_inspector.one_alias, self.one_schema),
+            (tables_inspector.two_alias, self.two_schema),
+        ):
+            with (
+                span("find_templates", database=alias),
+                self._connect(
+                    context.routes[alias][0], context.snapshot_ids.get(alias)
+                ) as connection,
+            ):
+                definitions = get_definitions(connection, schema)
+            partitions = context.partitions_by_alias.get(alias) or {}
+            tables.append(
+                {
+                    name: table
+                    for name, table in get_template_tables(definitions, pattern).items()
+                    if not ignore_clauses.is_table_ignored(name) and name not in partitions
+                }
+            )
 
-        return self.compare_result_class(result, one_alias=one_alias, two_alias=two_alias)
+        return [
+            TemplateTableSpec(name, template)
+            for name, template in find_template_tables(tables).items()
+        ]
+
+    def _inspect(
+        self,
+        inspectors: list[tuple[str, BaseInspector]],
+        ignore_specs: list[IgnoreSpecType],
+        jobs: int,
+        context: _InspectionContext,
+    ) -> Iterable[tuple[str, BaseInspector, Any, Any]]:
+        """Yield the inspection results of both databases, in the order of `inspectors`.
+
+        The inspections are run with `context` (see :class:`_InspectionContext`). An inspection
+        that does not complete before its deadline has no result.
+
+        The databases that have engines in the routes of `context`, by alias, are reflected from
+        these, each inspector from one of them, picked from its position in the registry.
+        """
+        positions = {key: position for position, key in enumerate(register)}
+
+        def get_db_info(inspector: BaseInspector, one: bool):
+            side, alias, schema = (
+                (self.db_one_engine, inspector.one_alias, self.one_schema)
+                if one
+                else (self.db_two_engine, inspector.two_alias, self.two_schema)
+            )
+            engines = context.routes.get(alias) or [side]
+            engine = engines[positions[inspector.key] % len(engines)]
+            budget, throttle = context.budget, context.throttle
+            deadline = budget.start(inspector.key, alias) if budget is not None else None
+            contention = None
+            if context.contentions is not None:
+                contention = context.contentions[inspector.key, alias] = Contention()
+            with (
+                span("inspect", inspector=inspector.key, database=alias),
+                context.recorder.time_inspection(inspector.key, alias),
+                reflect_schema(schema),
+                collapse_partitions(
+                    context.partitions_by_alias.get(alias),
+                    context.partitioned_by_alias.get(alias, ()),
+                ),
+                retrying(context.retry_policy),
+                within(deadline),
+                skipping_contention(contention),
+                reflecting(context.strategies.get(alias)),
+                (
+                    throttle.connection(engine)
+                    if throttle is not None and not isinstance(engine, Snapshot)
+                    else nullcontext()
+                ),
+                self._resume(
+                    context.checkpoint,
+                    ignore_specs,
+                    inspector,
+                    side,
+                    alias,
+                    schema,
+                    context.partitions_by_alias.get(alias),
+                    context.partitioned_by_alias.get(alias, ()),
+                    context.strategies.get(alias),
+                ) as resumed,
+            ):
+                if resumed is not None and resumed.completed:
+                    return resumed.info
+                if deadline is not None and deadline.expired:
+                    deadline.skipped = True
+                    return None
+
+                try:
+                    snapshot_id = context.snapshot_ids.get(alias)
+                    if snapshot_id is not None:
+                        with transaction.import_snapshot(engine, snapshot_id) as connection:
+                            info = self._get_db_info(ignore_specs, inspector, connection)
+                    else:
+                        info = self._get_db_info(ignore_specs, inspector, engine)
+                except DBAPIError:
+                    if deadline is None or not deadline.expired:
+                        raise
+                    deadline.skipped = True
+                    return None
+
+                if (
+                    resumed is not None
+                    and not (deadline and deadline.uncovered_tables)
+                    and not (contention and contention.unavailable_tables)
+                ):
+                    resumed.complete(info)
+                return info
+
+        if jobs == 1:
+            for key, inspector in inspectors:
+                yield key, inspector, get_db_info(inspector, True), get_db_info(inspector, False)
+            return
+
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            futures = [
+                (
+                    key,
+                    inspector,
+                    executor.submit(get_db_info, inspector, True),
+                    executor.submit(get_db_info, inspector, False),
+                )
+                for key, inspector in inspectors
+            ]
+            try:
+                for key, inspector, db_one_future, db_two_future in futures:
+                    yield key, inspector, db_one_future.result(), db_two_future.result()
+            finally:
+                # The inspections that have not started are not run once the results are
+                # no longer needed
+                for _, _, db_one_future, db_two_future in futures:
+                    db_one_future.cancel()
+                    db_two_future.cancel()
+
+    def _differs(self, inspector: BaseInspector, diff: dict) -> bool:
+        """Tell if the `diff` of an inspector has differences."""
+        keys = (f"{inspector.one_alias}_only", f"{inspector.two_alias}_only", "diff")
+        tables = [diff] if inspector.db_level else diff.values()
+        return any(table.get(key) for table in tables for key in keys)
+
+    def _get_differing_tables(self, inspector: BaseInspector, diff: dict) -> set[str]:
+        """Return the tables the `diff` of a table level inspector has differences in."""
+        keys = (f"{inspector.one_alias}_only", f"{inspector.two_alias}_only", "diff")
+        return {name for name, table in diff.items() if any(table.get(key) for key in keys)}
+
+    def _get_cost(self, stats: CompareStats, inspector_key: str) -> float:
+        """Return the time spent inspecting both databases and diffing them, in seconds."""
+        inspector_stats = stats.inspectors[inspector_key]
+        return inspector_stats.diff_time + sum(
+            inspection.wall_time for inspection in inspector_stats.inspection.values()
+        )
+
+    def _leave_out(self, info: dict, tables: list[str]) -> dict:
+        """Return the inspection `info` of a table level inspector, without `tables`."""
+        tables_set = set(tables)
+        return {
+            table_name: item for table_name, item in info.items() if table_name not in tables_set
+        }
+
+    def _resume(
+        self,
+        checkpoint: Checkpoint | None,
+        ignore_specs: list[IgnoreSpecType],
+        inspector: BaseInspector,
+        engine: Engine | EngineGroup | Snapshot,
+        alias: str,
+        schema: str | None,
+        partitions: dict[str, Partition] | None,
+        partitioned: Collection[str],
+        strategy: str | None,
+    ) -> AbstractContextManager[InspectionCheckpoint | None]:
+        """Resume the inspection of a database from `checkpoint`, unless it is a snapshot.
+
+        The inspection is resumed only with the same options: its ignore specs, the partitions
+        it collapses, the partitioned tables and the reflection strategy. A group of engines is
+        resumed by the URL of its primary, whichever engine it is reflected from.
+        """
+        if checkpoint is None or isinstance(engine, Snapshot):
+            return nullcontext()
+        url = engine.url.render_as_string(hide_password=True)
+        return checkpoint.resume(
+            (
+                alias,
+                url,
+                schema,
+                inspector.key,
+                inspector.compact,
+                ignore_specs,
+                None if partitions is None else sorted(partitions.items()),
+                sorted(partitioned),
+                strategy,
+            )
+        )
 
     def _filter_inspectors(
         self, ignore_inspectors: set[str] | None
@@ -151,9 +963,69 @@ class Comparer:
         return [(key, cls) for key, (_, cls) in register.items() if key not in ignore_inspectors]
 
     def _get_db_info(
-        self, ignore_specs: list[IgnoreSpecType], inspector: BaseInspector, engine: Engine
-    ) -> dict | None:
+        self,
+        ignore_specs: list[IgnoreSpecType],
+        inspector: BaseInspector,
+        engine: Engine | Snapshot,
+    ) -> Any | None:
+        if isinstance(engine, Snapshot):
+            return engine.get_info(inspector, ignore_specs)
+
         try:
-            return inspector.inspect(engine, ignore_specs)
+            info = inspector.inspect(engine, ignore_specs)
         except InspectorNotSupported as e:
             logger.warning({"engine": engine, "inspector": inspector.key, "error": e.message})
+            return None
+
+        if self._has_snapshot():
+            return Snapshot.normalise(info)
+        return info
+
+    def _find_identical(self, engine: Engine | Snapshot) -> set[str]:
+        """Find the identical tables of both sides, in `engine`, the one they are reflected from."""
+        side = self.db_one_engine
+        if isinstance(side, Snapshot) or side is not self.db_two_engine:
+            raise ValueError("skip_identical needs both sides to be in the same database")
+
+        with span("find_identical"), engine.connect() as connection:
+            return find_identical_tables(connection, self.one_schema, self.two_schema)
+
+    def _route(self, one_alias: str, two_alias: str) -> dict[str, list[Engine | Snapshot]]:
+        """Return the engines each side is reflected from, by alias.
+
+        A group of engines is checked once, even if it is on both sides.
+        """
+        checked: dict[int, list[Engine]] = {}
+        routes: dict[str, list[Engine | Snapshot]] = {}
+        for alias, side in ((one_alias, self.db_one_engine), (two_alias, self.db_two_engine)):
+            if not isinstance(side, EngineGroup):
+                routes[alias] = [side]
+                continue
+            if id(side) not in checked:
+                with span("check_replicas", database=alias):
+                    checked[id(side)] = side.get_engines()
+            routes[alias] = list(checked[id(side)])
+        return routes
+
+    def _count_tables(self, engine: Engine, schema: str | None, snapshot_id: str | None) -> int:
+        with span("count_tables"), self._connect(engine, snapshot_id) as connection:
+            return count_tables(connection, schema)
+
+    def _find_partitions(
+        self, engine: Engine, schema: str | None, snapshot_id: str | None
+    ) -> tuple[dict[str, Partition], set[str]]:
+        with span("find_partitions"), self._connect(engine, snapshot_id) as connection:
+            return find_partitions(connection, schema), find_partitioned_tables(connection, schema)
+
+    @contextmanager
+    def _connect(self, engine: Engine, snapshot_id: str | None) -> Iterator[Connection]:
+        """Connect to `engine`, importing the exported snapshot `snapshot_id`, if any."""
+        if snapshot_id is None:
+            with engine.connect() as connection:
+                yield connection
+        else:
+            with transaction.import_snapshot(engine, snapshot_id) as connection:
+                yield connection
+
+    def _has_snapshot(self) -> bool:
+        return isinstance(self.db_one_engine, Snapshot) or isinstance(self.db_two_engine, Snapshot)
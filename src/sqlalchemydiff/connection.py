@@ -1,7 +1,75 @@
+import logging
+from collections.abc import Iterable
 from typing import Any
 
-from sqlalchemy import create_engine
-from sqlalchemy.engine import Engine
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import URL, Connection, Engine
+from sqlalchemy.exc import DBAPIError
+
+
+logger = logging.getLogger(__name__)
+
+
+# The replay lag of a PostgreSQL standby, zero on a primary, or on a standby that replayed all it
+# received, and NULL if it is behind and has not replayed any transaction yet
+REPLICA_LAG_QUERY = """
+SELECT CASE
+    WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+END
+"""
+
+
+class EngineGroup:
+    """A primary engine and its read replicas, to reflect a database away from its primary.
+
+    The reflection of a group is spread across its replicas that can be connected to, and
+    whose replication lag is at most `max_lag` seconds, if given. It falls back to the primary
+    when none of them can be used. The lag is only measured on PostgreSQL: on other databases,
+    the replicas are always up to date.
+
+    A group can be used in place of an engine on either side of a
+    :class:`~sqlalchemydiff.comparer.Comparer`.
+    """
+
+    def __init__(
+        self, primary: Engine, replicas: Iterable[Engine] = (), max_lag: float | None = None
+    ):
+        self.primary = primary
+        self.replicas = list(replicas)
+        self.max_lag = max_lag
+
+    @property
+    def url(self) -> URL:
+        return self.primary.url
+
+    def get_engines(self) -> list[Engine]:
+        """Return the replicas that can be reflected, or the primary if none of them can."""
+        return [replica for replica in self.replicas if self._is_usable(replica)] or [self.primary]
+
+    def _is_usable(self, replica: Engine) -> bool:
+        try:
+            with replica.connect() as connection:
+                lag = get_replica_lag(connection) if self.max_lag is not None else None
+        except DBAPIError as e:
+            logger.warning({"engine": replica, "error": str(e.orig)})
+            return False
+
+        if self.max_lag is not None and (lag is None or lag > self.max_lag):
+            logger.warning({"engine": replica, "error": f"Replica lag too high: {lag}"})
+            return False
+        return True
+
+
+def get_replica_lag(connection: Connection) -> float | None:
+    """Return how far behind its primary the database of `connection` is, in seconds.
+
+    Returns `None` if the lag is not known, and zero on databases other than PostgreSQL.
+    """
+    if connection.dialect.name != "postgresql":
+        return 0.0
+    lag = connection.execute(text(REPLICA_LAG_QUERY)).scalar()
+    return None if lag is None else float(lag)
 
 
 class DBConnectionFactory:
@@ -10,3 +78,27 @@ class DBConnectionFactory:
     @staticmethod
     def create_engine(uri: str, **params: Any) -> Engine:
         return create_engine(uri, **params)
+
+    @classmethod
+    def create_engine_group(
+        cls,
+        uri: str,
+        replica_uris: Iterable[str],
+        max_lag: float | None = None,
+        **params: Any,
+    ) -> EngineGroup:
+        """Create a group of the primary at `uri`, and its replicas at `replica_uris`."""
+        return EngineGroup(
+            cls.create_engine(uri, **params),
+            [cls.create_engine(replica_uri, **params) for replica_uri in replica_uris],
+            max_lag=max_lag,
+        )
+
+    @staticmethod
+    def attach_sqlite_database(engine: Engine, path: str, schema: str) -> None:
+        """Attach the SQLite database at `path` as `schema`, on each connection of `engine`."""
+        quoted_schema = engine.dialect.identifier_preparer.quote_identifier(schema)
+
+        @event.listens_for(engine, "connect")
+        def attach(dbapi_connection: Any, connection_record: Any) -> None:
+            dbapi_connection.execute(f"ATTACH DATABASE ? AS {quoted_schema}", (path,))
@@ -0,0 +1,184 @@
+"""Find the tables that are identical in two schemas of the same database.
+
+When both sides of a comparison are in the same database, the tables whose definitions are
+identical can be found with a few queries joining the catalogs of the two schemas, and left out
+of the comparison, so that they are neither reflected nor diffed.
+
+Finders are registered by dialect name in :data:`finders`. On the other dialects, no table is
+found to be identical.
+"""
+
+from collections.abc import Callable
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from .inspection.schema import get_qualifier_pattern
+
+
+def find_sqlite_identical_tables(
+    connection: Connection, one_schema: str | None, two_schema: str | None
+) -> set[str]:
+    """Find the identical tables of two SQLite databases, attached to the same connection.
+
+    On SQLite, reflection is based on the SQL a table and its indexes were created with, so two
+    tables are identical when these are. Since a foreign key that does not name the columns it
+    refers to is reflected with the primary key of the referred table, a table that refers to
+    a table that is not identical is not considered identical either.
+    """
+    quote = connection.dialect.identifier_preparer.quote_identifier
+    one = f"{quote(one_schema or 'main')}.sqlite_master"
+    two = f"{quote(two_schema or 'main')}.sqlite_master"
+
+    # Tables created with the same SQL, and whose indexes are all in the other table too
+    same_indexes = (
+        "NOT EXISTS (SELECT 1 FROM {a} AS ia WHERE ia.type = 'index' AND ia.tbl_name = a.name "
+        "AND NOT EXISTS (SELECT 1 FROM {b} AS ib WHERE ib.type = 'index' "
+        "AND ib.tbl_name = a.name AND ib.name = ia.name AND ib.sql IS ia.sql))"
+    )
+    rows = connection.exec_driver_sql(
+        f"SELECT a.name FROM {one} AS a "
+        f"JOIN {two} AS b ON b.type = 'table' AND b.name = a.name AND b.sql IS a.sql "
+        f"WHERE a.type = 'table' AND a.name NOT LIKE 'sqlite~_%' ESCAPE '~' "
+        f"AND {same_indexes.format(a=one, b=two)} AND {same_indexes.format(a=two, b=one)}"
+    )
+    identical = {name for (name,) in rows}
+
+    rows = connection.exec_driver_sql(
+        f'SELECT m.name, fk."table" FROM {one} AS m '
+        f"JOIN pragma_foreign_key_list(m.name, ?) AS fk WHERE m.type = 'table'",
+        (one_schema or "main",),
+    )
+    referred_tables = {}
+    for name, referred_table in rows:
+        referred_tables.setdefault(name, set()).add(referred_table.lower())
+
+    while True:
+        identical_names = {name.lower() for name in identical}
+        not_identical = {
+            name for name in identical if not referred_tables.get(name, set()) <= identical_names
+        }
+        if not not_identical:
+            return identical
+        identical -= not_identical
+
+
+# The definitions of the tables of two schemas, which are the same for two identical tables
+POSTGRESQL_DEFINITIONS = r"""
+WITH tables AS (
+    SELECT c.oid, c.relkind, n.nspname AS schema_name, c.relname AS name
+    FROM pg_catalog.pg_class AS c
+    JOIN pg_catalog.pg_namespace AS n ON n.oid = c.relnamespace
+    WHERE c.relkind IN ('r', 'p') AND n.nspname IN (:one_schema, :two_schema)
+),
+columns AS (
+    SELECT a.attrelid AS oid, string_agg(
+        concat_ws(
+            ' ', a.attname, pg_catalog.format_type(a.atttypid, a.atttypmod), a.attnotnull,
+            a.attidentity, a.attgenerated, pg_catalog.pg_get_expr(d.adbin, d.adrelid),
+            pg_catalog.col_description(a.attrelid, a.attnum)
+        ),
+        E'\n' ORDER BY a.attname
+    ) AS definition
+    FROM pg_catalog.pg_attribute AS a
+    LEFT JOIN pg_catalog.pg_attrdef AS d ON d.adrelid = a.attrelid AND d.adnum = a.attnum
+    WHERE a.attrelid IN (SELECT oid FROM tables) AND a.attnum > 0 AND NOT a.attisdropped
+    GROUP BY a.attrelid
+),
+constraints AS (
+    SELECT conrelid AS oid, string_agg(
+        concat_ws(
+            ' ', conname, contype, pg_catalog.pg_get_constraintdef(oid, true),
+            pg_catalog.obj_description(oid, 'pg_constraint')
+        ),
+        E'\n' ORDER BY conname
+    ) AS definition
+    FROM pg_catalog.pg_constraint
+    WHERE conrelid IN (SELECT oid FROM tables)
+    GROUP BY conrelid
+),
+indexes AS (
+    SELECT i.indrelid AS oid, string_agg(
+        concat_ws(
+            ' ', pg_catalog.pg_get_indexdef(i.indexrelid),
+            pg_catalog.obj_description(i.indexrelid, 'pg_class')
+        ),
+        E'\n' ORDER BY c.relname
+    ) AS definition
+    FROM pg_catalog.pg_index AS i
+    JOIN pg_catalog.pg_class AS c ON c.oid = i.indexrelid
+    WHERE i.indrelid IN (SELECT oid FROM tables)
+    GROUP BY i.indrelid
+),
+definitions AS (
+    SELECT t.schema_name, t.name, pg_catalog.regexp_replace(
+        concat_ws(
+            E'\n', t.relkind, pg_catalog.obj_description(t.oid, 'pg_class'),
+            columns.definition, constraints.definition, indexes.definition
+        ),
+        CASE WHEN t.schema_name = :one_schema THEN :one_pattern ELSE :two_pattern END,
+        '\1',
+        'g'
+    ) AS definition
+    FROM tables AS t
+    LEFT JOIN columns ON columns.oid = t.oid
+    LEFT JOIN constraints ON constraints.oid = t.oid
+    LEFT JOIN indexes ON indexes.oid = t.oid
+)
+"""
+
+POSTGRESQL_IDENTICAL_TABLES = (
+    POSTGRESQL_DEFINITIONS
+    + r"""
+SELECT coalesce(one.name, two.name) AS name, one.definition = two.definition AS identical
+FROM (SELECT * FROM definitions WHERE schema_name = :one_schema) AS one
+FULL OUTER JOIN (SELECT * FROM definitions WHERE schema_name = :two_schema) AS two
+    ON two.name = one.name
+"""
+)
+
+
+def find_postgresql_identical_tables(
+    connection: Connection, one_schema: str | None, two_schema: str | None
+) -> set[str]:
+    """Find the identical tables of two schemas of the same PostgreSQL database.
+
+    The definition of each table, its columns, constraints and indexes is read from
+    ``pg_catalog`` for both schemas, with the name of the schema removed where it qualifies
+    another name, as the inspectors do (see
+    :class:`~sqlalchemydiff.inspection.schema.SchemaInspector`). The definitions are then
+    joined by table name in the database, and only the names of the tables, with whether they
+    are identical, are returned.
+    """
+    default_schema = connection.dialect.default_schema_name
+    one_schema = one_schema or default_schema
+    two_schema = two_schema or default_schema
+    quote = connection.dialect.identifier_preparer.quote
+
+    rows = connection.execute(
+        text(POSTGRESQL_IDENTICAL_TABLES),
+        {
+            "one_schema": one_schema,
+            "two_schema": two_schema,
+            "one_pattern": get_qualifier_pattern(quote(one_schema)),
+            "two_pattern": get_qualifier_pattern(quote(two_schema)),
+        },
+    )
+    return {name for name, identical in rows if identical}
+
+
+# Identical table finders, by dialect name
+finders: dict[str, Callable[[Connection, str | None, str | None], set[str]]] = {
+    "sqlite": find_sqlite_identical_tables,
+    "postgresql": find_postgresql_identical_tables,
+}
+
+
+def find_identical_tables(
+    connection: Connection, one_schema: str | None, two_schema: str | None
+) -> set[str]:
+    """Return the names of the tables that are identical in `one_schema` and `two_schema`."""
+    finder = finders.get(connection.dialect.name)
+    if finder is None:
+        return set()
+    return finder(connection, one_schema, two_schema)
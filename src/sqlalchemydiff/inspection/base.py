@@ -1,12 +1,37 @@
 import abc
 import inspect as stdlib_inspect
+from collections import deque
+from collections.abc import Callable, Mapping
+from contextlib import nullcontext
+from typing import Any
 
 from sqlalchemy import inspect
-from sqlalchemy.engine import Engine
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.sql.elements import TextClause
 
+from ..tracing import span
+from .bulk import get_bulk_inspector
+from .checkpoint import call_with_retries, current_checkpoint
 from .compat import Inspector
+from .contention import current_contention, is_lock_contention, savepoint
+from .deadline import current_deadline
 from .exceptions import InspectorNotSupported
-from .ignore import EnumIgnoreSpec, IgnoreClauses, IgnoreSpecType, TableIgnoreSpec
+from .ignore import (
+    EnumIgnoreSpec,
+    IgnoreClauses,
+    IgnoreSpecType,
+    OneSidedTableSpec,
+    TableIgnoreSpec,
+    TableIncludeSpec,
+    TemplateTableSpec,
+    UnsampledTableSpec,
+)
+from .partitions import current_partitions
+from .pipeline import query_tables
+from .records import Interner, Record
+from .schema import current_schema, get_schema_inspector
+from .strategy import PER_TABLE, current_strategy
 
 
 class BaseInspectorMeta(abc.ABCMeta):
@@ -45,16 +70,30 @@ class BaseInspector(abc.ABC, metaclass=BaseInspectorMeta):
 
     To create your own inspector, you need to subclass this class and implement its
     abstract methods.
+
+    If `compact` is true, and the inspector has a `record_class`, the reflected items are
+    converted into records (see :mod:`sqlalchemydiff.inspection.records`). If an `interner` is
+    also given, the records, their values and the table names are shared through it. Pass the
+    same interner to the inspectors of both databases to share the values between them.
     """
 
     key: str = ""
     db_level = False
+    record_class: type[Record] | None = None
 
-    def __init__(self, one_alias: str = "one", two_alias: str = "two"):
+    def __init__(
+        self,
+        one_alias: str = "one",
+        two_alias: str = "two",
+        compact: bool = False,
+        interner: Interner | None = None,
+    ):
         self.one_alias = one_alias
         self.two_alias = two_alias
         self.one_only_alias = f"{one_alias}_only"
         self.two_only_alias = f"{two_alias}_only"
+        self.compact = compact
+        self.interner = interner
 
     @abc.abstractmethod
     def inspect(
@@ -68,7 +107,7 @@ class BaseInspector(abc.ABC, metaclass=BaseInspectorMeta):
     def _is_supported(self, inspector: Inspector) -> bool: ...  # pragma: no cover
 
     def _filter_ignorers(self, specs: list[IgnoreSpecType] | None) -> IgnoreClauses:
-        tables, enums, clauses = [], [], []
+        tables, enums, clauses, includes = [], [], [], []
 
         for spec in specs or []:
             if isinstance(spec, TableIgnoreSpec):
@@ -78,11 +117,152 @@ class BaseInspector(abc.ABC, metaclass=BaseInspectorMeta):
                     clauses.append(spec)
             elif isinstance(spec, EnumIgnoreSpec):
                 enums.append(spec.name)
+            elif isinstance(spec, TableIncludeSpec):
+                includes.append(spec.pattern)
+            elif (
+                isinstance(spec, OneSidedTableSpec | TemplateTableSpec | UnsampledTableSpec)
+                and not self.db_level
+            ):
+                tables.append(spec.table_name)
 
-        return IgnoreClauses(tables, enums, clauses)
+        return IgnoreClauses(tables, enums, clauses, includes)
 
     def _get_inspector(self, engine: Engine) -> Inspector:
         inspector = inspect(engine)
         if not self._is_supported(inspector):
             raise InspectorNotSupported(f"{self.key} are not supported on this database")
-        return inspector
+        if current_strategy.get() != PER_TABLE:
+            inspector = get_bulk_inspector(inspector)
+        return get_schema_inspector(inspector)
+
+    def _inspect_tables(
+        self,
+        inspector: Inspector,
+        ignore_clauses: IgnoreClauses,
+        inspect_table: Callable[[str], Any],
+    ) -> dict:
+        """Call `inspect_table` for each table that is not ignored.
+
+        Returns a dict with the table names as keys and the results of `inspect_table` as values.
+
+        `inspect_table` is retried on transient errors, and the result of each table is saved in
+        the current checkpoint, if any, where it is reused from when the inspection is resumed
+        (see :mod:`sqlalchemydiff.inspection.checkpoint`).
+
+        Once the current deadline, if any, is past, the tables that are left are not inspected,
+        and are recorded in the deadline (see :mod:`sqlalchemydiff.inspection.deadline`).
+
+        Within the current contention, if any, a table that is locked by another transaction is
+        inspected again after the other tables, and recorded in the contention if it is still
+        locked (see :mod:`sqlalchemydiff.inspection.contention`).
+        """
+        checkpoint = current_checkpoint.get()
+        deadline = current_deadline.get()
+        contention = current_contention.get()
+        table_names = self._get_table_names(inspector, ignore_clauses)
+        result = {}
+        # The tables left to inspect, with whether they were found locked already
+        pending = deque((table_name, False) for table_name in table_names)
+        deferred = False
+        while pending:
+            table_name, locked = pending.popleft()
+            if self.compact and self.interner is not None:
+                table_name = self.interner(table_name)
+
+            if checkpoint is not None and table_name in checkpoint.tables:
+                result[table_name] = checkpoint.tables[table_name]
+                continue
+
+            if deadline is not None and deadline.expired:
+                deadline.uncovered_tables.append(table_name)
+                deadline.uncovered_tables.extend(name for name, _ in pending)
+                break
+
+            try:
+                with (
+                    span("inspect_table", inspector=self.key, table=table_name),
+                    savepoint(inspector) if contention is not None else nullcontext(),
+                ):
+                    result[table_name] = self._to_records(
+                        call_with_retries(inspect_table, table_name)
+                    )
+            except DBAPIError as error:
+                if deadline is not None and deadline.expired:
+                    deadline.uncovered_tables.append(table_name)
+                    deadline.uncovered_tables.extend(name for name, _ in pending)
+                    break
+                if contention is None or not is_lock_contention(error):
+                    raise
+                if locked:
+                    contention.unavailable_tables.append(table_name)
+                else:
+                    pending.append((table_name, True))
+                    deferred = True
+                continue
+
+            if checkpoint is not None:
+                checkpoint.put_table(table_name, result[table_name])
+
+        if deferred:
+            order = {table_name: index for index, table_name in enumerate(table_names)}
+            result = dict(sorted(result.items(), key=lambda item: order[item[0]]))
+        return result
+
+    def _get_table_names(self, inspector: Inspector, ignore_clauses: IgnoreClauses) -> list[str]:
+        """Return the names of the tables that are not ignored, nor collapsed partitions.
+
+        When any table is left out, such as the tables that are not sampled, or those found in
+        one database only, the bulk backend, if any, only reflects the other tables. Nor does it
+        reflect the tables saved in the current checkpoint, if any, since they are not reflected
+        again.
+        """
+        partitions = current_partitions.get() or {}
+        checkpoint = current_checkpoint.get()
+        saved_tables = checkpoint.tables if checkpoint is not None else {}
+        all_table_names = inspector.get_table_names()
+        table_names = [
+            table_name
+            for table_name in all_table_names
+            if not ignore_clauses.is_table_ignored(table_name) and table_name not in partitions
+        ]
+        reflected_names = [name for name in table_names if name not in saved_tables]
+        if len(reflected_names) < len(all_table_names) and hasattr(inspector, "set_filter_names"):
+            inspector.set_filter_names(reflected_names)
+        return table_names
+
+    def _query_tables(
+        self,
+        inspector: Inspector,
+        statement: TextClause,
+        table_names: list[str],
+        params: dict | None = None,
+    ) -> dict[str, list[tuple]]:
+        """Run `statement` for each table, and return its rows by table name.
+
+        The queries run through the connection `inspector` reflects through, if it has one, so
+        that they see the same snapshot. Along with the ``:table_name`` of each table, the
+        reflected schema is bound to ``:schema``. The queries are pipelined where the driver
+        supports it (see :mod:`sqlalchemydiff.inspection.pipeline`).
+        """
+        bind = inspector.bind
+        schema = current_schema.get() or inspector.default_schema_name
+        params = {"schema": schema, **(params or {})}
+        if isinstance(bind, Connection):
+            return query_tables(bind, statement, table_names, params)
+        with bind.connect() as connection:
+            return query_tables(connection, statement, table_names, params)
+
+    def _to_records(self, items: Any) -> Any:
+        """Convert a reflected item, or a list of them, into records, in compact mode."""
+        if not self.compact or self.record_class is None:
+            return items
+        record_class, interner = self.record_class, self.interner
+
+        def to_record(item: Mapping) -> Record:
+            if interner is None:
+                return record_class(item)
+            return interner(record_class(item, interner))
+
+        if isinstance(items, Mapping):
+            return to_record(items)
+        return [to_record(item) for item in items]
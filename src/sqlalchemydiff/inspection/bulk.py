@@ -0,0 +1,250 @@
+"""Bulk reflection backends.
+
+The inspectors reflect the schema one table at a time, which issues a few queries per table.
+On the databases that have a bulk backend, the inspector they are given serves those per-table
+calls from queries that cover all the tables at once, so the number of queries does not grow
+with the number of tables.
+
+Backends are registered by dialect name in :data:`backends`. Remove a dialect from it to go
+back to the per-table reflection for that dialect.
+"""
+
+import copy
+import inspect
+from contextlib import nullcontext
+from typing import Any
+
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import DBAPIError
+
+from .compat import Inspector
+from .contention import current_contention, is_lock_contention, savepoint
+
+
+class BulkInspector:
+    """Wrap an inspector, serving the per-table methods from the bulk `get_multi_*` methods.
+
+    On PostgreSQL, each `get_multi_*` method of the SQLAlchemy 2.0 inspector runs one set-based
+    query on ``pg_catalog`` for all the tables of the schema, and the per-table methods are
+    implemented on top of them, so the reflected dicts are exactly the same.
+
+    The results of a bulk method are fetched the first time one of its per-table methods is
+    called, and each table is then handed out once: a table that is not in the prefetched
+    results, or that is asked for again, is reflected on its own. After
+    :meth:`set_filter_names`, only the given tables are fetched.
+
+    Within a contention (see :mod:`sqlalchemydiff.inspection.contention`), when a bulk method
+    fails because a table is locked, the tables are reflected on their own instead, so that only
+    the locked table is skipped.
+
+    Any other attribute is looked up on the wrapped inspector.
+    """
+
+    methods = {
+        "get_table_comment": "get_multi_table_comment",
+        "get_columns": "get_multi_columns",
+        "get_pk_constraint": "get_multi_pk_constraint",
+        "get_foreign_keys": "get_multi_foreign_keys",
+        "get_indexes": "get_multi_indexes",
+        "get_unique_constraints": "get_multi_unique_constraints",
+        "get_check_constraints": "get_multi_check_constraints",
+    }
+
+    def __init__(self, inspector: Inspector):
+        self.inspector = inspector
+        self.filter_names: list[str] | None = None
+        self._prefetched: dict[str, dict] = {}
+
+    @classmethod
+    def is_supported(cls, inspector: Inspector) -> bool:
+        return hasattr(inspector, "get_multi_columns")
+
+    def __getattr__(self, name: str) -> Any:
+        method = getattr(self.inspector, name)
+        if name not in self.methods:
+            return method
+
+        def get(table_name: str, schema: str | None = None, **kw: Any) -> Any:
+            if kw:
+                return method(table_name, schema=schema, **kw)
+
+            try:
+                prefetched = self._prefetch(name, schema)
+            except DBAPIError as error:
+                if current_contention.get() is None or not is_lock_contention(error):
+                    raise
+                # A table is locked: reflect the tables one at a time, to only skip that one
+                prefetched = self._prefetched[f"{name}:{schema}"] = {}
+            try:
+                return prefetched.pop((schema, table_name))
+            except KeyError:
+                return method(table_name, schema=schema)
+
+        return get
+
+    def set_filter_names(self, filter_names: list[str]) -> None:
+        """Only fetch the tables named in `filter_names`."""
+        self.filter_names = filter_names
+
+    def _prefetch(self, name: str, schema: str | None) -> dict:
+        key = f"{name}:{schema}"
+        if key not in self._prefetched:
+            get_multi = getattr(self.inspector, self.methods[name])
+            with (
+                savepoint(self.inspector) if current_contention.get() is not None else nullcontext()
+            ):
+                self._prefetched[key] = dict(
+                    get_multi(schema=schema, filter_names=self.filter_names)
+                )
+        return self._prefetched[key]
+
+
+class SQLiteBulkInspector:
+    """Wrap an inspector, serving the pragmas of the SQLite dialect from bulk queries.
+
+    The SQLite dialect reflects a table by running ``PRAGMA table_xinfo``, ``index_list``,
+    ``index_info`` and ``foreign_key_list`` on it, and by reading its definition from
+    ``sqlite_master``. The wrapped inspector is given a copy of the dialect where these are
+    served from a join of ``sqlite_master`` with the table-valued function of each pragma (for
+    example ``pragma_table_xinfo``), which is run once for the ``main`` and ``temp`` schemas the
+    first time the pragma is needed. The rows, and so the reflected dicts, are exactly the same.
+
+    When a schema is given, only that schema is queried, as the dialect does. After
+    :meth:`set_filter_names`, only the given tables and their indexes are queried. Objects that
+    are not in the prefetched results are reflected by the dialect as usual, and so is the
+    predicate of partial indexes.
+
+    The methods of the dialect that are replaced are private: if they are missing, or their
+    parameters are not the expected ones, the tables are reflected one at a time instead.
+
+    Any other attribute is looked up on the wrapped inspector.
+    """
+
+    # Pragmas served in bulk, with the type of the objects they are called with, and the
+    # columns that order their rows as the pragma does
+    pragmas = {
+        "table_info": ("table", ("cid",)),
+        "table_xinfo": ("table", ("cid",)),
+        "index_list": ("table", ("seq",)),
+        "foreign_key_list": ("table", ("id", "seq")),
+        "index_info": ("index", ("seqno",)),
+        "index_xinfo": ("index", ("seqno",)),
+    }
+
+    # Private methods of the dialect served in bulk, with their expected parameters
+    dialect_methods = {
+        "_get_table_pragma": ("connection", "pragma", "table_name", "schema"),
+        "_get_table_sql": ("connection", "table_name", "schema", "kw"),
+    }
+
+    # Schemas the dialect looks into when no schema is given
+    default_schemas = ("main", "temp")
+
+    def __init__(self, inspector: Inspector):
+        self.inspector = inspector
+        self._dialect = inspector.dialect
+        self.filter_names: list[str] | None = None
+        self._pragmas: dict[tuple[str, str | None], list[dict[str, list[tuple]]]] = {}
+        self._table_sql: dict[str | None, dict[str, str]] = {}
+
+        dialect = copy.copy(self._dialect)
+        dialect._get_table_pragma = self._get_table_pragma
+        dialect._get_table_sql = self._get_table_sql
+        inspector.dialect = dialect
+
+    @classmethod
+    def is_supported(cls, inspector: Inspector) -> bool:
+        for name, parameters in cls.dialect_methods.items():
+            method = getattr(inspector.dialect, name, None)
+            if method is None or tuple(inspect.signature(method).parameters) != parameters:
+                return False
+        return True
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.inspector, name)
+
+    def set_filter_names(self, filter_names: list[str]) -> None:
+        """Only query the pragmas of the tables named in `filter_names`, and of their indexes."""
+        self.filter_names = filter_names
+
+    def _get_table_pragma(
+        self, connection: Connection, pragma: str, table_name: str, schema: str | None = None
+    ) -> list:
+        if pragma in self.pragmas:
+            key = (pragma, schema)
+            if key not in self._pragmas:
+                self._pragmas[key] = [
+                    self._prefetch_pragma(connection, pragma, schema_name)
+                    for schema_name in ((schema,) if schema else self.default_schemas)
+                ]
+
+            # Like the dialect, look in the temp schema when there are no rows in the main one
+            found = False
+            for rows_by_name in self._pragmas[key]:
+                if table_name in rows_by_name:
+                    found = True
+                    if rows_by_name[table_name]:
+                        return rows_by_name[table_name]
+            if found:
+                return []
+
+        return self._dialect._get_table_pragma(connection, pragma, table_name, schema=schema)
+
+    def _prefetch_pragma(
+        self, connection: Connection, pragma: str, schema: str
+    ) -> dict[str, list[tuple]]:
+        # The first column of each pragma is never null, so it is null only for the objects
+        # the pragma returns no rows for
+        object_type, order = self.pragmas[pragma]
+        statement = (
+            f"SELECT m.name, p.* FROM {self._quote(schema)}.sqlite_master AS m "
+            f"LEFT JOIN pragma_{pragma}(m.name, ?) AS p "
+            f"WHERE m.type = '{object_type}'"
+        )
+        params: tuple = (schema,)
+        if self.filter_names is not None:
+            statement += f" AND m.tbl_name IN ({', '.join('?' * len(self.filter_names))})"
+            params += tuple(self.filter_names)
+        statement += f" ORDER BY m.name, {', '.join(f'p.{column}' for column in order)}"
+        rows = connection.exec_driver_sql(statement, params)
+        rows_by_name: dict[str, list[tuple]] = {}
+        for row in rows:
+            name_rows = rows_by_name.setdefault(row[0], [])
+            if row[1] is not None:
+                name_rows.append(tuple(row)[1:])
+        return rows_by_name
+
+    def _get_table_sql(
+        self, connection: Connection, table_name: str, schema: str | None = None, **kw: Any
+    ) -> str | None:
+        if schema not in self._table_sql:
+            if schema:
+                source = f"{self._quote(schema)}.sqlite_master"
+            else:
+                source = "(SELECT * FROM sqlite_master UNION ALL SELECT * FROM sqlite_temp_master)"
+            rows = connection.exec_driver_sql(
+                f"SELECT name, sql FROM {source} WHERE type in ('table', 'view')"
+            )
+            table_sql = self._table_sql[schema] = {}
+            for name, sql in rows:
+                table_sql.setdefault(name, sql)
+
+        if table_name in self._table_sql[schema]:
+            return self._table_sql[schema][table_name]
+
+        return self._dialect._get_table_sql(connection, table_name, schema=schema, **kw)
+
+    def _quote(self, schema: str) -> str:
+        return self._dialect.identifier_preparer.quote_identifier(schema)
+
+
+# Bulk backends, by dialect name
+backends: dict[str, type] = {"postgresql": BulkInspector, "sqlite": SQLiteBulkInspector}
+
+
+def get_bulk_inspector(inspector: Inspector) -> Inspector:
+    """Return a bulk inspector wrapping `inspector`, if its dialect has a bulk backend."""
+    backend = backends.get(inspector.dialect.name)
+    if backend is None or not backend.is_supported(inspector):
+        return inspector
+    return backend(inspector)
@@ -0,0 +1,271 @@
+"""Resume interrupted comparisons from on-disk checkpoints.
+
+A :class:`Checkpoint` is a directory where the results of the inspections are saved as they
+complete: the result of each inspector on each database once it is done, and before that the
+result of each table, in :data:`current_checkpoint`, as soon as it is reflected. When a
+comparison is restarted with the same checkpoint, the saved results are reused, and only what is
+missing is reflected. The checkpoint is cleared once the comparison completes.
+
+Results are saved as JSON, where the tuples, frozen values and records of the results are tagged
+with their type, so that they are loaded back as they were saved.
+
+Within :func:`retrying`, the reflection of a table is also retried with an exponential backoff
+when it fails with a transient error, a dropped connection or a serialization failure, rather than
+aborting the whole comparison.
+"""
+
+import hashlib
+import json
+import os
+import time
+from collections.abc import Callable, Hashable, Iterator, Mapping
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, BinaryIO, NamedTuple
+
+from sqlalchemy.exc import DBAPIError
+
+from .contention import current_contention, is_lock_contention
+from .deadline import current_deadline
+from .records import FrozenDict, FrozenList, Record
+
+
+class InspectionCheckpoint:
+    """The saved results of an inspector on a database.
+
+    `completed` tells if the inspection was completed, with `info` as its result. Otherwise,
+    `tables` has the results of the tables that were reflected, by table name.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.tables_path = path.with_suffix(".tables")
+        self.completed = False
+        self.info: Any = None
+        self.tables: dict[str, Any] = {}
+        self._tables_file: BinaryIO | None = None
+
+        if path.exists():
+            with open(path, "rb") as stream:
+                self.info = _loads(stream.read())
+            self.completed = True
+        elif self.tables_path.exists():
+            self._load_tables()
+
+    def _load_tables(self) -> None:
+        """Load the results of the tables, up to the last one that was completely saved."""
+        offset = 0
+        with open(self.tables_path, "rb") as stream:
+            for line in stream:
+                # A line is only complete once its newline is written
+                if not line.endswith(b"\n"):
+                    break
+                table_name, result = _loads(line)
+                self.tables[table_name] = result
+                offset += len(line)
+        os.truncate(self.tables_path, offset)
+
+    def put_table(self, table_name: str, result: Any) -> None:
+        """Save the result of a table, on a line of its own."""
+        if self._tables_file is None:
+            self._tables_file = open(self.tables_path, "ab")
+        self._tables_file.write(_dumps([table_name, result]) + b"\n")
+        self._tables_file.flush()
+
+    def complete(self, info: Any) -> None:
+        """Save the result of the inspection, which replaces the results of its tables."""
+        self.close()
+        temporary_path = self.path.with_suffix(".tmp")
+        with open(temporary_path, "wb") as stream:
+            stream.write(_dumps(info))
+        os.replace(temporary_path, self.path)
+        self.tables_path.unlink(missing_ok=True)
+        self.completed, self.info = True, info
+
+    def close(self) -> None:
+        if self._tables_file is not None:
+            self._tables_file.close()
+            self._tables_file = None
+
+
+# The key of the objects that stand for a value of another type than a JSON one, in a checkpoint
+TYPE_KEY = "__type__"
+
+
+def _dumps(value: Any) -> bytes:
+    return json.dumps(_encode(value), default=str).encode()
+
+
+def _loads(data: bytes) -> Any:
+    return json.loads(data, object_hook=_decode)
+
+
+def _encode(value: Any) -> Any:
+    """Return `value` with its tuples, frozen values and records tagged with their type.
+
+    Values of other types than the JSON ones are saved as strings, as in snapshots.
+    """
+    if isinstance(value, Record):
+        record_class = type(value)
+        return {
+            TYPE_KEY: "record",
+            "class": f"{record_class.__module__}.{record_class.__qualname__}",
+            "values": _encode(value.as_dict()),
+        }
+    if isinstance(value, FrozenDict):
+        return {TYPE_KEY: "frozendict", "items": [_encode(list(item)) for item in value]}
+    if isinstance(value, FrozenList):
+        return {TYPE_KEY: "frozenlist", "items": [_encode(item) for item in value]}
+    if isinstance(value, tuple):
+        return {TYPE_KEY: "tuple", "items": [_encode(item) for item in value]}
+    if isinstance(value, list):
+        return [_encode(item) for item in value]
+    if isinstance(value, Mapping):
+        if all(isinstance(key, str) for key in value) and TYPE_KEY not in value:
+            return {key: _encode(item) for key, item in value.items()}
+        return {TYPE_KEY: "dict", "items": [_encode([key, item]) for key, item in value.items()]}
+    return value
+
+
+def _decode(value: dict) -> Any:
+    """Return the value a JSON object of :func:`_encode` stands for."""
+    kind = value.get(TYPE_KEY)
+    if kind is None:
+        return value
+    if kind == "record":
+        return _get_record_classes()[value["class"]](value["values"])
+    if kind == "frozendict":
+        return FrozenDict((key, item) for key, item in value["items"])
+    if kind == "frozenlist":
+        return FrozenList(value["items"])
+    if kind == "tuple":
+        return tuple(value["items"])
+    return dict(value["items"])
+
+
+def _get_record_classes() -> dict[str, type[Record]]:
+    """Return the record classes, including those of custom inspectors, by qualified name."""
+    classes = {}
+    pending = [Record]
+    while pending:
+        record_class = pending.pop()
+        classes[f"{record_class.__module__}.{record_class.__qualname__}"] = record_class
+        pending.extend(record_class.__subclasses__())
+    return classes
+
+
+class Checkpoint:
+    """A directory where the results of the inspections of a comparison are saved."""
+
+    def __init__(self, directory: str | os.PathLike):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    @contextmanager
+    def resume(self, key: Hashable) -> Iterator[InspectionCheckpoint]:
+        """Resume the inspection identified by `key`, saving its tables in the current context.
+
+        `key` must identify the inspector, the database and everything that changes the result
+        of the inspection, so that the results of another comparison are never reused.
+        """
+        digest = hashlib.sha256(repr(key).encode()).hexdigest()
+        inspection = InspectionCheckpoint(self.directory / f"{digest}.json")
+        token = current_checkpoint.set(inspection)
+        try:
+            yield inspection
+        finally:
+            current_checkpoint.reset(token)
+            inspection.close()
+
+    def clear(self) -> None:
+        """Remove the saved results."""
+        for path in self.directory.glob("*.json"):
+            path.unlink()
+        for path in self.directory.glob("*.tables"):
+            path.unlink()
+
+
+# The checkpoint of the inspection run in the current context
+current_checkpoint: ContextVar[InspectionCheckpoint | None] = ContextVar(
+    "current_checkpoint", default=None
+)
+
+
+class RetryPolicy(NamedTuple):
+    """Retry a failed reflection up to `retries` times, waiting `backoff` seconds at first.
+
+    The wait doubles after each attempt, up to `max_backoff` seconds.
+    """
+
+    retries: int = 0
+    backoff: float = 0.5
+    max_backoff: float = 30.0
+
+
+# The retry policy of the reflection of the tables, in the current context
+current_retry_policy: ContextVar[RetryPolicy | None] = ContextVar(
+    "current_retry_policy", default=None
+)
+
+
+# The SQLSTATEs of the errors that may not happen again: the class of the connection exceptions,
+# the serialization failures, the deadlocks and the statements cancelled, such as by a statement
+# timeout
+TRANSIENT_SQLSTATES = ("08", "40001", "40P01", "57014")
+
+
+@contextmanager
+def retrying(policy: RetryPolicy | None) -> Iterator[None]:
+    """Retry the reflection of the tables with `policy`, in the current context.
+
+    Without a policy, a reflection is not retried.
+    """
+    token = current_retry_policy.set(policy)
+    try:
+        yield
+    finally:
+        current_retry_policy.reset(token)
+
+
+def is_transient(error: Exception) -> bool:
+    """Tell if `error` may not happen again: a lost connection, a serialization failure, or a
+    cancelled statement."""
+    if not isinstance(error, DBAPIError):
+        return False
+    # psycopg2 and psycopg 3 name the SQLSTATE differently
+    code = getattr(error.orig, "pgcode", None) or getattr(error.orig, "sqlstate", None)
+    return error.connection_invalidated or (
+        code is not None and code.startswith(TRANSIENT_SQLSTATES)
+    )
+
+
+def call_with_retries(function: Callable[..., Any], *args: Any) -> Any:
+    """Call `function`, retrying it on transient errors with the current retry policy.
+
+    It is not retried once the current deadline, if any, is past, nor on lock contention within
+    the current contention, if any, since the table is then inspected again later. The wait
+    before a retry does not go past the deadline either.
+    """
+    policy = current_retry_policy.get() or RetryPolicy()
+    deadline = current_deadline.get()
+    contention = current_contention.get()
+    attempt = 0
+    while True:
+        try:
+            return function(*args)
+        except DBAPIError as error:
+            if (
+                attempt >= policy.retries
+                or not is_transient(error)
+                or (deadline is not None and deadline.expired)
+                or (contention is not None and is_lock_contention(error))
+            ):
+                raise
+            wait = min(policy.backoff * 2**attempt, policy.max_backoff)
+            if deadline is not None:
+                wait = min(wait, deadline.remaining)
+            time.sleep(wait)
+            if deadline is not None and deadline.expired:
+                raise
+        attempt += 1
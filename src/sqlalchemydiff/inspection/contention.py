@@ -0,0 +1,63 @@
+"""Carry on when the reflection of a table is blocked by locks.
+
+With a short ``lock_timeout`` (see :class:`~sqlalchemydiff.inspection.throttle.Throttle`), a
+catalog query that waits for a lock, such as one held by a long migration, fails at once rather
+than stalling the comparison. Within :func:`skipping_contention`, the inspectors then put the
+table aside, reflect the other ones, and try it again once they are done. A table that is still
+locked is recorded in the :class:`Contention` as unavailable, and left out of the comparison.
+
+In a transaction, such as the one of a consistent comparison, each table is reflected in a
+savepoint, so that a query that fails does not abort the transaction.
+"""
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import DBAPIError
+
+from .compat import Inspector
+
+
+# The SQLSTATE of the errors raised when a lock cannot be acquired in time
+LOCK_NOT_AVAILABLE = "55P03"
+
+
+class Contention:
+    """The tables of an inspection that could not be reflected because of locks."""
+
+    def __init__(self):
+        self.unavailable_tables: list[str] = []
+
+
+# The contention of the inspection run in the current context
+current_contention: ContextVar[Contention | None] = ContextVar("current_contention", default=None)
+
+
+@contextmanager
+def skipping_contention(contention: Contention | None) -> Iterator[None]:
+    """Skip the tables locked by other transactions, in the current context."""
+    token = current_contention.set(contention)
+    try:
+        yield
+    finally:
+        current_contention.reset(token)
+
+
+def is_lock_contention(error: DBAPIError) -> bool:
+    """Tell if `error` was raised because a lock could not be acquired in time."""
+    # psycopg2 and psycopg 3 name the SQLSTATE differently
+    code = getattr(error.orig, "pgcode", None) or getattr(error.orig, "sqlstate", None)
+    return code == LOCK_NOT_AVAILABLE
+
+
+@contextmanager
+def savepoint(inspector: Inspector) -> Iterator[None]:
+    """Run in a savepoint, if `inspector` reflects through a connection in a transaction."""
+    bind = getattr(inspector, "bind", None)
+    if isinstance(bind, Connection) and bind.in_transaction():
+        with bind.begin_nested():
+            yield
+    else:
+        yield
@@ -0,0 +1,135 @@
+"""Bound the time spent inspecting the databases.
+
+A :class:`Budget` has an overall timeout for a comparison, and optional timeouts for each
+inspector. Each inspection runs with a :class:`Deadline`, the earliest of the two, in
+:data:`current_deadline`:
+
+- On PostgreSQL, each transaction sets its ``statement_timeout`` to the time left, so that a
+  catalog query that would run past the deadline is cancelled by the database.
+- The inspectors stop reflecting tables once the deadline is past, and record the tables they
+  did not reflect, while an inspection that cannot complete at all is skipped.
+
+The comparison then completes with partial results, rather than running past the deadline.
+
+Only the inspections are bounded. The phases that run before them, and that decide what is
+compared, are not: checking the replicas, finding the identical tables, counting the tables,
+and finding the partitions and the templates. They each run a few queries, whatever the number
+of tables.
+"""
+
+import time
+from collections.abc import Iterable, Iterator, Mapping
+from contextlib import contextmanager
+from contextvars import ContextVar
+from math import ceil
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine
+
+
+class Deadline:
+    """The time an inspection must end by, as a :func:`time.monotonic` value.
+
+    `skipped` tells if the inspection could not complete, and `uncovered_tables` has the tables
+    it did not reflect.
+    """
+
+    def __init__(self, expires_at: float):
+        self.expires_at = expires_at
+        self.skipped = False
+        self.uncovered_tables: list[str] = []
+
+    @property
+    def remaining(self) -> float:
+        """The time left, in seconds."""
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+
+# The execution option of the statements that set up a session, which are not throttled
+SESSION_SETUP = "sqlalchemydiff_session_setup"
+
+
+# The deadline of the inspection run in the current context
+current_deadline: ContextVar[Deadline | None] = ContextVar("current_deadline", default=None)
+
+
+@contextmanager
+def within(deadline: Deadline | None) -> Iterator[None]:
+    """Run the inspection in the current context until `deadline`, if any."""
+    token = current_deadline.set(deadline)
+    try:
+        yield
+    finally:
+        current_deadline.reset(token)
+
+
+def set_statement_timeout(connection: Connection) -> None:
+    """Limit the statements of the transaction to the time left before the current deadline."""
+    deadline = current_deadline.get()
+    if deadline is not None:
+        timeout = max(ceil(deadline.remaining * 1000), 1)
+        connection.exec_driver_sql(
+            f"SET LOCAL statement_timeout = {timeout}", execution_options={SESSION_SETUP: True}
+        )
+
+
+class Budget:
+    """The time budget of a comparison.
+
+    The comparison must end `timeout` seconds after the budget is created, and each inspection
+    must end `inspector_timeouts[key]` seconds after it starts, for the inspectors whose key is
+    in `inspector_timeouts`.
+    """
+
+    def __init__(
+        self, timeout: float | None = None, inspector_timeouts: Mapping[str, float] | None = None
+    ):
+        self.expires_at = None if timeout is None else time.monotonic() + timeout
+        self.inspector_timeouts = dict(inspector_timeouts or {})
+        self.deadlines: dict[tuple[str, str], Deadline] = {}
+
+    def start(self, inspector_key: str, alias: str) -> Deadline | None:
+        """Return the deadline of the inspection of `alias` by an inspector, starting now."""
+        candidates = [] if self.expires_at is None else [self.expires_at]
+        if inspector_key in self.inspector_timeouts:
+            candidates.append(time.monotonic() + self.inspector_timeouts[inspector_key])
+        if not candidates:
+            return None
+
+        deadline = Deadline(min(candidates))
+        self.deadlines[inspector_key, alias] = deadline
+        return deadline
+
+    def get_uncovered(self, inspector_key: str, aliases: Iterable[str]) -> list[str] | None:
+        """Return the tables an inspector did not reflect in any of the databases.
+
+        Returns `None` if the inspection of one of the databases was skipped.
+        """
+        deadlines = [
+            self.deadlines[inspector_key, alias]
+            for alias in aliases
+            if (inspector_key, alias) in self.deadlines
+        ]
+        if any(deadline.skipped for deadline in deadlines):
+            return None
+        return sorted({table for deadline in deadlines for table in deadline.uncovered_tables})
+
+    @contextmanager
+    def listen(self, engines: Iterable[Engine]) -> Iterator[None]:
+        """Set the statement timeout of the transactions on the PostgreSQL `engines`."""
+        engines = [
+            engine
+            for engine in {id(engine): engine for engine in engines}.values()
+            if engine.dialect.name == "postgresql"
+        ]
+        for engine in engines:
+            event.listen(engine, "begin", set_statement_timeout)
+        try:
+            yield
+        finally:
+            for engine in engines:
+                event.remove(engine, "begin", set_statement_timeout)
@@ -1,4 +1,5 @@
 from dataclasses import dataclass, field
+from fnmatch import fnmatchcase
 from typing import NamedTuple
 
 
@@ -12,7 +13,39 @@ class EnumIgnoreSpec(NamedTuple):
     name: str
 
 
-IgnoreSpecType = TableIgnoreSpec | EnumIgnoreSpec
+class TableIncludeSpec(NamedTuple):
+    """Restrict the comparison to the tables matching `pattern`, a name or a glob pattern."""
+
+    pattern: str
+
+
+class OneSidedTableSpec(NamedTuple):
+    """A table found in one database only, whose objects are not reflected."""
+
+    table_name: str
+
+
+class TemplateTableSpec(NamedTuple):
+    """A table that matches `template`, the table made from the same template it stands for."""
+
+    table_name: str
+    template: str
+
+
+class UnsampledTableSpec(NamedTuple):
+    """A table left out of the sample of the compared tables, whose objects are not reflected."""
+
+    table_name: str
+
+
+IgnoreSpecType = (
+    TableIgnoreSpec
+    | EnumIgnoreSpec
+    | TableIncludeSpec
+    | OneSidedTableSpec
+    | TemplateTableSpec
+    | UnsampledTableSpec
+)
 
 
 class IgnoreSpecFactory:
@@ -61,6 +94,15 @@ class IgnoreClauses:
     tables: list[str] = field(default_factory=list)
     enums: list[str] = field(default_factory=list)
     clauses: list[IgnoreSpecType] = field(default_factory=list)
+    includes: list[str] = field(default_factory=list)
+
+    def is_table_ignored(self, table_name: str) -> bool:
+        """Tell if `table_name` is ignored, or not included when there are include patterns."""
+        if table_name in self.tables:
+            return True
+        return bool(self.includes) and not any(
+            fnmatchcase(table_name, pattern) for pattern in self.includes
+        )
 
     def is_clause(self, table_name: str, inspector_key: str, object_name: str | None) -> bool:
         clause = TableIgnoreSpec(table_name, inspector_key, object_name)
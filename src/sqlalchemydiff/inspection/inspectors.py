@@ -1,18 +1,36 @@
-from typing import cast
+from typing import Any, cast
 
-from sqlalchemy.engine import Engine
+from sqlalchemy.engine import Dialect, Engine
+from sqlalchemy.types import TypeEngine
 
 from .base import BaseInspector
 from .compat import Inspector
 from .ignore import IgnoreSpecType
 from .mixins import DiffMixin
+from .partitions import get_mismatched_partitions
+from .records import (
+    CheckConstraintRecord,
+    ColumnRecord,
+    EnumRecord,
+    ForeignKeyRecord,
+    IndexRecord,
+    PrimaryKeyRecord,
+    TableRecord,
+    UniqueConstraintRecord,
+)
 
 
 class TablesInspector(BaseInspector, DiffMixin):
-    """Inspect the tables of a database."""
+    """Inspect the tables of a database.
+
+    When partitions are collapsed (see :mod:`sqlalchemydiff.inspection.partitions`), each
+    partitioned table also has the `mismatched_partitions` that do not match its structure, which
+    are none when it has no partitions.
+    """
 
     key = "tables"
     db_level = True
+    record_class = TableRecord
 
     def inspect(self, engine: Engine, ignore_specs: list[IgnoreSpecType] | None = None) -> dict:
         ignore_clauses = self._filter_ignorers(ignore_specs)
@@ -24,17 +42,28 @@ class TablesInspector(BaseInspector, DiffMixin):
             except NotImplementedError:
                 return
 
-        return {
-            table_name: self._format_table(table_name, get_comment(table_name))
-            for table_name in inspector.get_table_names()
-            if table_name not in ignore_clauses.tables
-        }
+        mismatched_partitions = get_mismatched_partitions()
+
+        def inspect_table(table_name: str) -> dict:
+            return self._format_table(
+                table_name, get_comment(table_name), mismatched_partitions.get(table_name)
+            )
+
+        return self._inspect_tables(inspector, ignore_clauses, inspect_table)
 
-    def _format_table(self, table_name: str, comment: str | None = None) -> dict:
-        return {
+    def _format_table(
+        self,
+        table_name: str,
+        comment: str | None = None,
+        mismatched_partitions: list[str] | None = None,
+    ) -> dict:
+        table = {
             "name": table_name,
             "comment": comment or "",
         }
+        if mismatched_partitions is not None:
+            table["mismatched_partitions"] = mismatched_partitions
+        return table
 
     def diff(self, one: dict, two: dict) -> dict:
         return self._itemsdiff(list(one.values()), list(two.values()))
@@ -47,26 +76,28 @@ class ColumnsInspector(BaseInspector, DiffMixin):
     """Inspect the columns of a database."""
 
     key = "columns"
+    record_class = ColumnRecord
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        # Compiled column types, for the comparison this inspector belongs to, see `_compile_type`
+        self._compiled_types: dict[tuple, str] = {}
 
     def inspect(self, engine: Engine, ignore_specs: list[IgnoreSpecType] | None = None) -> dict:
         ignore_clauses = self._filter_ignorers(ignore_specs)
 
         inspector = self._get_inspector(engine)
-        table_names = inspector.get_table_names()
-
-        result = {}
-        for table_name in table_names:
-            if table_name in ignore_clauses.tables:
-                continue
 
-            result[table_name] = [
+        def inspect_table(table_name: str) -> list[dict]:
+            columns = [
                 column_item
                 for column_item in inspector.get_columns(table_name)
                 if not ignore_clauses.is_clause(table_name, self.key, column_item["name"])
             ]
-            self._process_types(result[table_name], engine)
+            self._process_types(columns, engine)
+            return columns
 
-        return result
+        return self._inspect_tables(inspector, ignore_clauses, inspect_table)
 
     def diff(self, one: dict, two: dict) -> dict:
         return self._listdiff(one, two)
@@ -79,7 +110,32 @@ class ColumnsInspector(BaseInspector, DiffMixin):
         meaning as it would be used for a SQL clause.
         """
         for column in column_dict:
-            column["type"] = column["type"].compile(dialect=engine.dialect)
+            column["type"] = self._compile_type(column["type"], engine.dialect)
+
+    def _compile_type(self, type_: TypeEngine, dialect: Dialect) -> str:
+        """Compile ``type_``, reusing the result for types equal to one already compiled.
+
+        Types are equal when they have the same class and attributes, and are compiled by the
+        same dialect class for the same server version. Types that cannot be cached, because
+        some of their attributes are not hashable, are compiled every time.
+        """
+        try:
+            key = (dialect.__class__, dialect.server_version_info, self._get_type_key(type_))
+            return self._compiled_types[key]
+        except KeyError:
+            compiled = self._compiled_types[key] = type_.compile(dialect=dialect)
+            return compiled
+        except TypeError:
+            return type_.compile(dialect=dialect)
+
+    def _get_type_key(self, value: Any) -> Any:
+        if isinstance(value, TypeEngine):
+            return (value.__class__, self._get_type_key(vars(value)))
+        if isinstance(value, dict):
+            return frozenset((key, self._get_type_key(item)) for key, item in value.items())
+        if isinstance(value, (list, tuple)):
+            return tuple(self._get_type_key(item) for item in value)
+        return value
 
     def _is_supported(self, inspector: Inspector) -> bool:
         return hasattr(inspector, "get_columns")
@@ -89,25 +145,21 @@ class PrimaryKeysInspector(BaseInspector, DiffMixin):
     """Inspect the primary keys of a database."""
 
     key = "primary_keys"
+    record_class = PrimaryKeyRecord
 
     def inspect(self, engine: Engine, ignore_specs: list[IgnoreSpecType] | None = None) -> dict:
         ignore_clauses = self._filter_ignorers(ignore_specs)
 
         inspector = self._get_inspector(engine)
-        table_names = inspector.get_table_names()
-        result = {}
 
-        for table_name in table_names:
-            if table_name in ignore_clauses.tables:
-                continue
+        def inspect_table(table_name: str) -> dict:
             inspection_result = inspector.get_pk_constraint(table_name)
 
             if not ignore_clauses.is_clause(table_name, self.key, inspection_result["name"]):
-                result[table_name] = inspection_result
-            else:
-                result[table_name] = {}
+                return inspection_result
+            return {}
 
-        return result
+        return self._inspect_tables(inspector, ignore_clauses, inspect_table)
 
     def diff(self, one: dict, two: dict) -> dict:
         return self._dictdiff(one, two)
@@ -120,23 +172,21 @@ class ForeignKeysInspector(BaseInspector, DiffMixin):
     """Inspect the foreign keys of a database."""
 
     key = "foreign_keys"
+    record_class = ForeignKeyRecord
 
     def inspect(self, engine: Engine, ignore_specs: list[IgnoreSpecType] | None = None) -> dict:
         ignore_clauses = self._filter_ignorers(ignore_specs)
 
         inspector = self._get_inspector(engine)
-        table_names = inspector.get_table_names()
-        result = {}
-        for table_name in table_names:
-            if table_name in ignore_clauses.tables:
-                continue
 
-            result[table_name] = [
+        def inspect_table(table_name: str) -> list[dict]:
+            return [
                 self._get_fk_identifier(fk)
                 for fk in inspector.get_foreign_keys(table_name)
                 if not ignore_clauses.is_clause(table_name, self.key, fk["name"])
             ]
-        return result
+
+        return self._inspect_tables(inspector, ignore_clauses, inspect_table)
 
     def diff(self, one: dict, two: dict) -> dict:
         return self._listdiff(one, two)
@@ -154,22 +204,20 @@ class IndexesInspector(BaseInspector, DiffMixin):
     """Inspect the indexes of a database."""
 
     key = "indexes"
+    record_class = IndexRecord
 
     def inspect(self, engine: Engine, ignore_specs: list[IgnoreSpecType] | None = None) -> dict:
         ignore_clauses = self._filter_ignorers(ignore_specs)
         inspector = self._get_inspector(engine)
-        table_names = inspector.get_table_names()
-        result = {}
-        for table_name in table_names:
-            if table_name in ignore_clauses.tables:
-                continue
 
-            result[table_name] = [
+        def inspect_table(table_name: str) -> list[dict]:
+            return [
                 index
                 for index in inspector.get_indexes(table_name)
                 if not ignore_clauses.is_clause(table_name, self.key, index["name"])
             ]
-        return result
+
+        return self._inspect_tables(inspector, ignore_clauses, inspect_table)
 
     def diff(self, one: dict, two: dict) -> dict:
         return self._listdiff(one, two)
@@ -182,22 +230,20 @@ class UniqueConstraintsInspector(BaseInspector, DiffMixin):
     """Inspect the unique constraints of a database."""
 
     key = "unique_constraints"
+    record_class = UniqueConstraintRecord
 
     def inspect(self, engine: Engine, ignore_specs: list[IgnoreSpecType] | None = None) -> dict:
         ignore_clauses = self._filter_ignorers(ignore_specs)
         inspector = self._get_inspector(engine)
-        table_names = inspector.get_table_names()
-        result = {}
-        for table_name in table_names:
-            if table_name in ignore_clauses.tables:
-                continue
 
-            result[table_name] = [
+        def inspect_table(table_name: str) -> list[dict]:
+            return [
                 uc
                 for uc in self._format_unique_constraint(inspector, table_name)
                 if not ignore_clauses.is_clause(table_name, self.key, uc["name"])
             ]
-        return result
+
+        return self._inspect_tables(inspector, ignore_clauses, inspect_table)
 
     def diff(self, one: dict, two: dict) -> dict:
         return self._listdiff(one, two)
@@ -219,22 +265,20 @@ class CheckConstraintsInspector(BaseInspector, DiffMixin):
     """Inspect the check constraints of a database."""
 
     key = "check_constraints"
+    record_class = CheckConstraintRecord
 
     def inspect(self, engine: Engine, ignore_specs: list[IgnoreSpecType] | None = None) -> dict:
         ignore_clauses = self._filter_ignorers(ignore_specs)
         inspector = self._get_inspector(engine)
-        table_names = inspector.get_table_names()
-        result = {}
-        for table_name in table_names:
-            if table_name in ignore_clauses.tables:
-                continue
 
-            result[table_name] = [
+        def inspect_table(table_name: str) -> list[dict]:
+            return [
                 cc
                 for cc in inspector.get_check_constraints(table_name)
                 if not ignore_clauses.is_clause(table_name, self.key, cc["name"])
             ]
-        return result
+
+        return self._inspect_tables(inspector, ignore_clauses, inspect_table)
 
     def diff(self, one: dict, two: dict) -> dict:
         return self._listdiff(one, two)
@@ -248,6 +292,7 @@ class EnumsInspector(BaseInspector, DiffMixin):
 
     key = "enums"
     db_level = True
+    record_class = EnumRecord
 
     def inspect(
         self, engine: Engine, ignore_specs: list[IgnoreSpecType] | None = None
@@ -256,7 +301,9 @@ class EnumsInspector(BaseInspector, DiffMixin):
 
         ignore_clauses = self._filter_ignorers(ignore_specs)
         enums = getattr(inspector, "get_enums", lambda: [])() or []
-        return [enum for enum in enums if enum["name"] not in ignore_clauses.enums]
+        return self._to_records(
+            [enum for enum in enums if enum["name"] not in ignore_clauses.enums]
+        )
 
     def diff(self, one: dict, two: dict) -> dict:
         return self._itemsdiff(one, two)
@@ -0,0 +1,184 @@
+"""Collapse the partitions of partitioned tables.
+
+A partitioned table can have thousands of partitions, which have the structure of their parent
+by construction. Within :func:`collapse_partitions`, the inspectors leave the partitions out,
+so that only the partitioned tables are reflected and diffed in full, and the tables inspector
+reports, for each partitioned table, the partitions whose structure does not match it. A
+partitioned table that has no partitions reports none, so that it does not differ from its
+counterpart only in having no partitions, while a partitioned table differs from a table that is
+not partitioned.
+
+Partitions and partitioned tables are found by dialect name, with the finders registered in
+:data:`finders` and :data:`partitioned_finders`. On the other dialects, no table is found to be a
+partition, nor a partitioned table.
+"""
+
+from collections.abc import Callable, Collection, Iterator, Mapping
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import NamedTuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+
+class Partition(NamedTuple):
+    """A partition, with the partitioned table at the root of its tree of partitions."""
+
+    parent: str
+    matches: bool
+
+
+# The partitions of the database inspected in the current context, by table name
+current_partitions: ContextVar[Mapping[str, Partition] | None] = ContextVar(
+    "current_partitions", default=None
+)
+
+# The partitioned tables of the database inspected in the current context
+current_partitioned: ContextVar[Collection[str]] = ContextVar("current_partitioned", default=())
+
+
+@contextmanager
+def collapse_partitions(
+    partitions: Mapping[str, Partition] | None, partitioned: Collection[str] = ()
+) -> Iterator[None]:
+    """Leave the tables of `partitions` out of the inspections, in the current context.
+
+    The tables in `partitioned` are reported as partitioned tables, even when none of
+    `partitions` belongs to them.
+    """
+    token = current_partitions.set(partitions)
+    partitioned_token = current_partitioned.set(partitioned)
+    try:
+        yield
+    finally:
+        current_partitioned.reset(partitioned_token)
+        current_partitions.reset(token)
+
+
+POSTGRESQL_PARTITIONS = r"""
+WITH RECURSIVE partitions AS (
+    SELECT i.inhrelid AS oid, i.inhparent AS root
+    FROM pg_catalog.pg_inherits AS i
+    JOIN pg_catalog.pg_class AS c ON c.oid = i.inhparent
+    JOIN pg_catalog.pg_namespace AS n ON n.oid = c.relnamespace
+    WHERE c.relkind = 'p' AND NOT c.relispartition AND n.nspname = :schema
+    UNION ALL
+    SELECT i.inhrelid, p.root
+    FROM pg_catalog.pg_inherits AS i
+    JOIN partitions AS p ON p.oid = i.inhparent
+),
+columns AS (
+    SELECT a.attrelid AS oid, md5(string_agg(
+        concat_ws(
+            ' ', a.attname, pg_catalog.format_type(a.atttypid, a.atttypmod), a.attnotnull,
+            pg_catalog.pg_get_expr(d.adbin, d.adrelid)
+        ),
+        E'\n' ORDER BY a.attname
+    )) AS digest
+    FROM pg_catalog.pg_attribute AS a
+    LEFT JOIN pg_catalog.pg_attrdef AS d ON d.adrelid = a.attrelid AND d.adnum = a.attnum
+    WHERE a.attrelid IN (SELECT oid FROM partitions UNION SELECT root FROM partitions)
+        AND a.attnum > 0 AND NOT a.attisdropped
+    GROUP BY a.attrelid
+)
+SELECT c.relname AS name, r.relname AS parent, (
+    cc.digest = rc.digest
+    AND NOT EXISTS (
+        SELECT 1 FROM pg_catalog.pg_constraint AS con
+        WHERE con.conrelid = c.oid AND con.conparentid = 0 AND con.coninhcount = 0
+    )
+    AND NOT EXISTS (
+        SELECT 1 FROM pg_catalog.pg_index AS ix
+        WHERE ix.indrelid = c.oid
+            AND NOT EXISTS (SELECT 1 FROM pg_catalog.pg_inherits WHERE inhrelid = ix.indexrelid)
+    )
+) AS matches
+FROM partitions AS p
+JOIN pg_catalog.pg_class AS c ON c.oid = p.oid
+JOIN pg_catalog.pg_class AS r ON r.oid = p.root
+JOIN columns AS cc ON cc.oid = p.oid
+JOIN columns AS rc ON rc.oid = p.root
+WHERE c.relnamespace = r.relnamespace
+"""
+
+
+def find_postgresql_partitions(connection: Connection, schema: str | None) -> dict[str, Partition]:
+    """Find the partitions of the partitioned tables of a PostgreSQL schema.
+
+    Partitions of partitions are collapsed into the partitioned table at the root of the tree.
+    A partition matches that table when a digest of its columns (with their types, defaults
+    and whether they are nullable) is the same as the digest of the columns of the table, and
+    when it has no constraints or indexes of its own, besides the ones of the table.
+    """
+    rows = connection.execute(
+        text(POSTGRESQL_PARTITIONS),
+        {"schema": schema or connection.dialect.default_schema_name},
+    )
+    return {name: Partition(parent, matches) for name, parent, matches in rows}
+
+
+POSTGRESQL_PARTITIONED_TABLES = """
+SELECT c.relname
+FROM pg_catalog.pg_class AS c
+JOIN pg_catalog.pg_namespace AS n ON n.oid = c.relnamespace
+WHERE c.relkind = 'p' AND NOT c.relispartition AND n.nspname = :schema
+"""
+
+
+def find_postgresql_partitioned_tables(connection: Connection, schema: str | None) -> set[str]:
+    """Find the partitioned tables of a PostgreSQL schema, with or without partitions.
+
+    Partitioned partitions are left out, as they are collapsed into the table at the root of
+    their tree.
+    """
+    rows = connection.execute(
+        text(POSTGRESQL_PARTITIONED_TABLES),
+        {"schema": schema or connection.dialect.default_schema_name},
+    )
+    return {name for (name,) in rows}
+
+
+# Partition finders, by dialect name
+finders: dict[str, Callable[[Connection, str | None], dict[str, Partition]]] = {
+    "postgresql": find_postgresql_partitions,
+}
+
+# Partitioned table finders, by dialect name
+partitioned_finders: dict[str, Callable[[Connection, str | None], set[str]]] = {
+    "postgresql": find_postgresql_partitioned_tables,
+}
+
+
+def find_partitions(connection: Connection, schema: str | None) -> dict[str, Partition]:
+    """Return the partitions of the partitioned tables of `schema`, by table name."""
+    finder = finders.get(connection.dialect.name)
+    if finder is None:
+        return {}
+    return finder(connection, schema)
+
+
+def find_partitioned_tables(connection: Connection, schema: str | None) -> set[str]:
+    """Return the names of the partitioned tables of `schema`."""
+    finder = partitioned_finders.get(connection.dialect.name)
+    if finder is None:
+        return set()
+    return finder(connection, schema)
+
+
+def get_mismatched_partitions() -> dict[str, list[str]]:
+    """Return the partitions that do not match their partitioned table, in the current context.
+
+    The result is keyed by the name of each partitioned table, and its partitions that do not
+    match it are sorted by name. The partitioned tables of the database inspected in the current
+    context that have no partitions have none that do not match.
+    """
+    partitions = current_partitions.get()
+    if partitions is None:
+        return {}
+    mismatched: dict[str, list[str]] = {name: [] for name in current_partitioned.get()}
+    for name, partition in sorted(partitions.items()):
+        tables = mismatched.setdefault(partition.parent, [])
+        if not partition.matches:
+            tables.append(name)
+    return mismatched
@@ -0,0 +1,82 @@
+"""Pipelined per-table queries.
+
+Custom inspectors that run their own catalog query for each table pay one round trip per table.
+:func:`query_tables` runs such a query for many tables at once: with psycopg 3, in pipeline
+mode, all the queries are sent without waiting for their results, which are then collected
+together, so the round trip is paid once for all the tables. With the other drivers, the
+queries are run one after the other.
+
+The queries run on the given connection, in its transaction, so that they see the same snapshot
+as the reflection, and the session settings of its transaction, such as the statement timeout,
+apply to them. The cursor events of the connection are dispatched for each query, so that they
+are throttled and recorded in the statistics like any other.
+"""
+
+from collections.abc import Iterable
+from typing import Any
+
+from sqlalchemy.engine import Connection
+from sqlalchemy.sql.elements import TextClause
+
+
+def get_pipeline_connection(connection: Connection) -> Any | None:
+    """Return the driver connection of `connection`, if it supports pipeline mode."""
+    driver_connection = connection.connection.driver_connection
+    if hasattr(driver_connection, "pipeline"):
+        return driver_connection
+    return None
+
+
+def query_tables(
+    connection: Connection,
+    statement: TextClause,
+    table_names: Iterable[str],
+    params: dict | None = None,
+) -> dict[str, list[tuple]]:
+    """Run `statement` for each table, and return its rows by table name.
+
+    The name of the table is bound to the ``:table_name`` parameter of `statement`, along with
+    `params`.
+    """
+    table_names = list(table_names)
+    params = params or {}
+
+    pipeline_connection = get_pipeline_connection(connection)
+    if pipeline_connection is None:
+        return {
+            table_name: [
+                tuple(row)
+                for row in connection.execute(statement, {**params, "table_name": table_name})
+            ]
+            for table_name in table_names
+        }
+
+    # The queries bypass the execution of `connection`, so its transaction is begun first, as
+    # the execution would, for its listeners to set up the transaction
+    if not connection.in_transaction():
+        connection.begin()
+    compiled = statement.compile(dialect=connection.dialect)
+    cursors, queries = [], []
+    try:
+        with pipeline_connection.pipeline():
+            for table_name in table_names:
+                cursor = pipeline_connection.cursor()
+                cursors.append(cursor)
+                query = compiled.string
+                parameters = compiled.construct_params({**params, "table_name": table_name})
+                for listener in connection.dispatch.before_cursor_execute:
+                    query, parameters = listener(connection, cursor, query, parameters, None, False)
+                cursor.execute(query, parameters)
+                queries.append((query, parameters))
+
+        rows = {}
+        for table_name, cursor, (query, parameters) in zip(
+            table_names, cursors, queries, strict=True
+        ):
+            rows[table_name] = [tuple(row) for row in cursor.fetchall()]
+            for listener in connection.dispatch.after_cursor_execute:
+                listener(connection, cursor, query, parameters, None, False)
+        return rows
+    finally:
+        for cursor in cursors:
+            cursor.close()
@@ -0,0 +1,277 @@
+"""Compact representation of the reflected schema objects.
+
+Inspectors return the dicts produced by the SQLAlchemy inspector. When the comparison is run in
+compact mode, each of those dicts is converted into an immutable record, which uses less memory
+and can be hashed and compared cheaply. Records behave like read-only mappings, so the
+:class:`~sqlalchemydiff.inspection.mixins.DiffMixin` can diff them directly, and they are
+converted back to dicts with :func:`to_builtin` when the result is output.
+
+Records can also be built with an :class:`Interner`, which shares equal strings, frozen values and
+records, so that a value repeated across tables, or across both databases, is only stored once.
+"""
+
+import sys
+from collections.abc import Callable, Iterator, Mapping
+from typing import Any
+
+
+class _Missing:
+    """Marker for the fields that were not in the reflected dict."""
+
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return "MISSING"
+
+    def __reduce__(self) -> str:
+        return "MISSING"
+
+
+MISSING = _Missing()
+
+
+class FrozenList(tuple):
+    """Immutable version of a list."""
+
+    __slots__ = ()
+
+
+class FrozenDict(frozenset):
+    """Immutable version of a dict, stored as a set of its items."""
+
+    __slots__ = ()
+
+    @classmethod
+    def from_dict(cls, value: Mapping, intern: Callable[[Any], Any] | None = None) -> "FrozenDict":
+        if not value:
+            return EMPTY
+        result = cls((freeze(key, intern), freeze(item, intern)) for key, item in value.items())
+        return intern(result) if intern is not None else result
+
+
+EMPTY = FrozenDict()
+
+
+class Interner:
+    """Share equal immutable values.
+
+    Strings are interned with :func:`sys.intern`, while frozen values and records are kept in
+    a pool, and an equal value that was seen before is returned in place of a new one.
+
+    Values are pooled by value, and a pooled value is only returned if it has the same types,
+    down to the values it contains, so that, for example, a :class:`FrozenList` is never replaced
+    by a tuple, nor ``(1,)`` by ``(True,)``. The values equal to a pooled value, but of other
+    types, are pooled apart.
+
+    Sharing values saves memory, and lets the comparison of two equal values short-circuit on
+    their identity.
+    """
+
+    def __init__(self):
+        self._pool: dict[Any, Any] = {}
+        self._other_types: dict[Any, list] = {}
+
+    def __call__(self, value: Any) -> Any:
+        if type(value) is str:
+            return sys.intern(value)
+        try:
+            pooled = self._pool.setdefault(value, value)
+        except TypeError:
+            return value
+        if _same_types(pooled, value):
+            return pooled
+        others = self._other_types.setdefault(value, [])
+        for other in others:
+            if _same_types(other, value):
+                return other
+        others.append(value)
+        return value
+
+    def __len__(self) -> int:
+        return len(self._pool) + sum(len(others) for others in self._other_types.values())
+
+
+def _same_types(one: Any, other: Any) -> bool:
+    """Return whether the equal `one` and `other` have the same types, down to their values."""
+    if one is other:
+        return True
+    if type(one) is not type(other):
+        return False
+    if isinstance(one, Record):
+        return _same_types(one._values(), other._values())
+    if isinstance(one, frozenset):
+        items = {item: item for item in other}
+        return all(_same_types(item, items[item]) for item in one)
+    if isinstance(one, tuple):
+        return all(map(_same_types, one, other))
+    return True
+
+
+def freeze(value: Any, intern: Callable[[Any], Any] | None = None) -> Any:
+    """Return an immutable, hashable version of `value`.
+
+    If `intern` is given, the strings and frozen values are passed through it, so they can be
+    shared.
+    """
+    if isinstance(value, Record):
+        return value
+    if isinstance(value, str):
+        return intern(value) if intern is not None else value
+    if isinstance(value, Mapping):
+        return FrozenDict.from_dict(value, intern)
+    if isinstance(value, list):
+        result = FrozenList(freeze(item, intern) for item in value)
+    elif isinstance(value, tuple):
+        result = tuple(freeze(item, intern) for item in value)
+    else:
+        return value
+    return intern(result) if intern is not None else result
+
+
+def to_builtin(value: Any) -> Any:
+    """Convert records and frozen values in `value` back to dicts and lists."""
+    if isinstance(value, Record):
+        return value.as_dict()
+    if isinstance(value, FrozenDict):
+        return {key: to_builtin(item) for key, item in value}
+    if isinstance(value, FrozenList):
+        return [to_builtin(item) for item in value]
+    if isinstance(value, dict):
+        return {key: to_builtin(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [to_builtin(item) for item in value]
+    if isinstance(value, tuple):
+        return tuple(to_builtin(item) for item in value)
+    return value
+
+
+class Record(Mapping):
+    """Base class for the records of a kind of schema object.
+
+    Subclasses list their `fields`, which are stored in slots, while any other key is kept in
+    `extra`. Keys that were not in the original dict are not part of the mapping, so that
+    converting a record back with :meth:`as_dict` gives a dict equal to the original one.
+
+    If `intern` is given, the values of the record are frozen with it (see :func:`freeze`).
+    """
+
+    __slots__ = ("extra", "_hash")
+
+    fields: tuple[str, ...] = ()
+
+    def __init__(self, values: Mapping[str, Any], intern: Callable[[Any], Any] | None = None):
+        extra = dict(values)
+        for field in self.fields:
+            object.__setattr__(self, field, freeze(extra.pop(field, MISSING), intern))
+        object.__setattr__(self, "extra", FrozenDict.from_dict(extra, intern))
+        object.__setattr__(self, "_hash", None)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def _values(self) -> tuple:
+        return tuple(getattr(self, field) for field in self.fields) + (self.extra,)
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self.fields:
+            value = getattr(self, key)
+            if value is not MISSING:
+                return value
+        else:
+            for extra_key, value in self.extra:
+                if extra_key == key:
+                    return value
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        for field in self.fields:
+            if getattr(self, field) is not MISSING:
+                yield field
+        for key, _ in self.extra:
+            yield key
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Record):
+            return type(self) is type(other) and (
+                self is other or self._values() == other._values()
+            )
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        if self._hash is None:
+            object.__setattr__(self, "_hash", hash((type(self), self._values())))
+        return self._hash
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.as_dict()!r})"
+
+    def __deepcopy__(self, memo: dict) -> "Record":
+        return self
+
+    def __reduce__(self) -> tuple:
+        return type(self), (self.as_dict(),)
+
+    def as_dict(self) -> dict:
+        return {key: to_builtin(self[key]) for key in self}
+
+
+class TableRecord(Record):
+    __slots__ = fields = ("name", "comment")
+
+
+class ColumnRecord(Record):
+    __slots__ = fields = (
+        "name",
+        "type",
+        "nullable",
+        "default",
+        "autoincrement",
+        "comment",
+        "computed",
+        "identity",
+        "dialect_options",
+    )
+
+
+class PrimaryKeyRecord(Record):
+    __slots__ = fields = ("name", "constrained_columns", "comment", "dialect_options")
+
+
+class ForeignKeyRecord(Record):
+    __slots__ = fields = (
+        "name",
+        "constrained_columns",
+        "referred_schema",
+        "referred_table",
+        "referred_columns",
+        "options",
+        "comment",
+    )
+
+
+class IndexRecord(Record):
+    __slots__ = fields = (
+        "name",
+        "column_names",
+        "unique",
+        "expressions",
+        "include_columns",
+        "column_sorting",
+        "duplicates_constraint",
+        "dialect_options",
+    )
+
+
+class UniqueConstraintRecord(Record):
+    __slots__ = fields = ("name", "column_names", "comment", "duplicates_index", "dialect_options")
+
+
+class CheckConstraintRecord(Record):
+    __slots__ = fields = ("name", "sqltext", "comment", "dialect_options")
+
+
+class EnumRecord(Record):
+    __slots__ = fields = ("name", "schema", "visible", "labels")
@@ -0,0 +1,107 @@
+"""Reflection of a schema other than the default one.
+
+The inspectors reflect the default schema of the engine they are given. Within
+:func:`reflect_schema`, the inspector they get from
+:meth:`~sqlalchemydiff.inspection.base.BaseInspector._get_inspector` reflects another schema
+instead, as if it were the default one, so that two schemas of the same database can be
+compared.
+"""
+
+import inspect
+import re
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+from .compat import Inspector
+
+
+# The schema reflected in the current context, `None` for the default schema
+current_schema: ContextVar[str | None] = ContextVar("current_schema", default=None)
+
+
+@contextmanager
+def reflect_schema(schema: str | None) -> Iterator[None]:
+    """Reflect `schema` rather than the default schema, in the current context."""
+    token = current_schema.set(schema)
+    try:
+        yield
+    finally:
+        current_schema.reset(token)
+
+
+def get_qualifier_pattern(quoted_schema: str) -> str:
+    """Return a regular expression matching `quoted_schema` where it qualifies a name.
+
+    The expression is valid both in Python and in PostgreSQL, and the qualifier is removed by
+    replacing its matches with the first group.
+    """
+    return rf'(^|[^\w."]){re.escape(quoted_schema)}\.'
+
+
+class SchemaInspector:
+    """Wrap an inspector, reflecting the objects of `schema` as if it were the default schema.
+
+    `schema` is passed to each `get_*` method that takes one, unless it is given explicitly.
+    The objects of `schema` are then reflected as they would be in the default schema:
+
+    - foreign keys referring to tables of `schema` have no `referred_schema`;
+    - column types defined in `schema` have no schema, and names of `schema` in column defaults
+      (for example the sequence of a serial column) are not qualified;
+    - enums defined in `schema` are visible, in the default schema.
+
+    Any other attribute is looked up on the wrapped inspector.
+    """
+
+    normalisers = {
+        "get_columns": "_normalise_columns",
+        "get_foreign_keys": "_normalise_foreign_keys",
+        "get_enums": "_normalise_enums",
+    }
+
+    def __init__(self, inspector: Inspector, schema: str):
+        self.inspector = inspector
+        self.schema = schema
+
+    def __getattr__(self, name: str) -> Any:
+        method = getattr(self.inspector, name)
+        if not name.startswith("get_") or "schema" not in inspect.signature(method).parameters:
+            return method
+
+        def get(*args: Any, **kw: Any) -> Any:
+            kw.setdefault("schema", self.schema)
+            result = method(*args, **kw)
+            if kw["schema"] == self.schema and name in self.normalisers:
+                getattr(self, self.normalisers[name])(result)
+            return result
+
+        return get
+
+    def _normalise_columns(self, columns: list[dict]) -> None:
+        quoted_schema = self.inspector.dialect.identifier_preparer.quote(self.schema)
+        pattern = re.compile(get_qualifier_pattern(quoted_schema))
+        for column in columns:
+            if getattr(column["type"], "schema", None) == self.schema:
+                column["type"].schema = None
+            if isinstance(column.get("default"), str):
+                column["default"] = pattern.sub(r"\1", column["default"])
+
+    def _normalise_foreign_keys(self, foreign_keys: list[dict]) -> None:
+        for fk in foreign_keys:
+            if fk["referred_schema"] == self.schema:
+                fk["referred_schema"] = None
+
+    def _normalise_enums(self, enums: list[dict]) -> None:
+        for enum in enums:
+            if enum["schema"] == self.schema:
+                enum["schema"] = self.inspector.default_schema_name
+                enum["visible"] = True
+
+
+def get_schema_inspector(inspector: Inspector) -> Inspector:
+    """Return a schema inspector wrapping `inspector`, if a schema is reflected."""
+    schema = current_schema.get()
+    if schema is None:
+        return inspector
+    return SchemaInspector(inspector, schema)
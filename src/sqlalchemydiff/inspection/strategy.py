@@ -0,0 +1,66 @@
+"""Choose how the tables of each database are reflected.
+
+The bulk backends (see :mod:`sqlalchemydiff.inspection.bulk`) run a few queries that cover all
+the tables at once, which is the fastest on large schemas, but on a schema of a few tables
+reflecting one table at a time runs fewer and cheaper queries. The strategies are:
+
+- ``bulk``: the bulk backend of the database, the default where there is one.
+- ``per_table``: one table at a time.
+- ``snapshot``: the side is a snapshot, and nothing is reflected.
+
+With the ``auto`` strategy, the tables of each database are counted first, and the bulk backend
+is only used from :data:`BULK_THRESHOLD` tables on. Within :func:`reflecting`, the inspectors
+reflect the tables with the given strategy.
+"""
+
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import inspect
+from sqlalchemy.engine import Connection
+
+from .bulk import backends
+
+
+AUTO = "auto"
+BULK = "bulk"
+PER_TABLE = "per_table"
+SNAPSHOT = "snapshot"
+
+STRATEGIES = (AUTO, BULK, PER_TABLE)
+
+# The number of tables from which the bulk backend is used, with the auto strategy
+BULK_THRESHOLD = 20
+
+
+# The strategy of the inspection run in the current context
+current_strategy: ContextVar[str | None] = ContextVar("current_strategy", default=None)
+
+
+@contextmanager
+def reflecting(strategy: str | None) -> Iterator[None]:
+    """Reflect the tables with `strategy`, in the current context."""
+    token = current_strategy.set(strategy)
+    try:
+        yield
+    finally:
+        current_strategy.reset(token)
+
+
+def count_tables(connection: Connection, schema: str | None) -> int:
+    """Return the number of tables of `schema`, the default one if `None`."""
+    return len(inspect(connection).get_table_names(schema=schema))
+
+
+def choose_strategy(strategy: str, dialect_name: str, get_table_count: Callable[[], int]) -> str:
+    """Return the strategy to reflect a database with, resolving the ``auto`` strategy.
+
+    `get_table_count` is only called for the ``auto`` strategy, on a database that has a bulk
+    backend.
+    """
+    if strategy == PER_TABLE or dialect_name not in backends:
+        return PER_TABLE
+    if strategy == BULK or get_table_count() >= BULK_THRESHOLD:
+        return BULK
+    return PER_TABLE
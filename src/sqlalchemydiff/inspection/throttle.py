@@ -0,0 +1,168 @@
+"""Throttle the reflection, to keep its load low on busy databases.
+
+A :class:`Throttle` limits the statements run on each engine to `max_qps` per second, spacing
+them evenly, and the inspections run at the same time on each engine to `max_connections`, each
+of which uses one connection at a time.
+
+On PostgreSQL, the connections also set their ``statement_timeout``, ``lock_timeout`` and
+``application_name``, so that a catalog query gives up rather than waiting behind the locks of
+production traffic, or running for long, and so that the reflection can be told apart, for
+example in ``pg_stat_activity``. A statement that runs past its timeout fails with a transient
+error, so that it is retried with the `retries` of the comparison, while a table that stays
+locked is skipped (see :mod:`sqlalchemydiff.inspection.contention`).
+
+The settings are set with a single statement, once per connection, when it is first checked
+out from the pool. Only the statement timeout of the transactions run before a deadline is then
+lowered, to the time left. These statements are not throttled, and the connections are recycled
+once the throttle is no longer listening, so that the settings do not outlive it.
+"""
+
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+from math import ceil
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine
+
+from .deadline import SESSION_SETUP, current_deadline
+
+
+class Throttle:
+    """The limits of the reflection on each engine.
+
+    `statement_timeout` and `lock_timeout` are in seconds. Each limit is off when `None`.
+    """
+
+    def __init__(
+        self,
+        max_qps: float | None = None,
+        max_connections: int | None = None,
+        statement_timeout: float | None = None,
+        lock_timeout: float | None = None,
+        application_name: str | None = None,
+    ):
+        if max_qps is not None and max_qps <= 0:
+            raise ValueError("max_qps must be positive")
+        if max_connections is not None and max_connections < 1:
+            raise ValueError("max_connections must be a positive integer")
+        self.max_qps = max_qps
+        self.max_connections = max_connections
+        self.statement_timeout = statement_timeout
+        self.lock_timeout = lock_timeout
+        self.application_name = application_name
+        self._lock = threading.Lock()
+        self._next_statement: dict[int, float] = {}
+        self._semaphores: dict[int, threading.Semaphore] = {}
+
+    @contextmanager
+    def connection(self, engine: Engine) -> Iterator[None]:
+        """Wait until an inspection can run on `engine`, and hold its place while it runs."""
+        if self.max_connections is None:
+            yield
+            return
+
+        with self._lock:
+            semaphore = self._semaphores.setdefault(
+                id(engine), threading.Semaphore(self.max_connections)
+            )
+        with semaphore:
+            yield
+
+    @contextmanager
+    def listen(self, engines: Iterable[Engine]) -> Iterator[None]:
+        """Throttle the statements, and set the session settings, on `engines`."""
+        engines = list({id(engine): engine for engine in engines}.values())
+        listeners = []
+        if self.max_qps is not None:
+            listeners += [(engine, "before_cursor_execute", self._wait) for engine in engines]
+        # The records of the connections the settings were set on
+        configured: list = []
+        for engine in engines:
+            if engine.dialect.name != "postgresql":
+                continue
+            statement = self._get_settings_statement()
+            if statement is not None:
+                listeners.append((engine, "checkout", self._make_configure(statement, configured)))
+            if self.statement_timeout is not None:
+                listeners.append((engine, "begin", self._set_statement_timeout))
+        for engine, name, listener in listeners:
+            event.listen(engine, name, listener)
+        try:
+            yield
+        finally:
+            for engine, name, listener in listeners:
+                event.remove(engine, name, listener)
+            for connection_record in configured:
+                connection_record.invalidate(soft=True)
+
+    def _wait(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        """Wait for the next slot of the engine, so that its statements are evenly spaced."""
+        if context is not None and context.execution_options.get(SESSION_SETUP):
+            return
+        key = id(conn.engine)
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_statement.get(key, now))
+            self._next_statement[key] = slot + 1 / self.max_qps
+        if slot > now:
+            time.sleep(slot - now)
+
+    def _get_settings_statement(self) -> str | None:
+        """Return the statement that sets the session settings, `None` if there are none."""
+        settings = {
+            "statement_timeout": _to_milliseconds(self.statement_timeout),
+            "lock_timeout": _to_milliseconds(self.lock_timeout),
+            "application_name": self.application_name,
+        }
+        # The statement is run without parameters, since their style depends on the driver, and
+        # so without escaping percent signs
+        calls = [
+            f"set_config('{name}', {_quote(str(value))}, false)"
+            for name, value in settings.items()
+            if value is not None
+        ]
+        return f"SELECT {', '.join(calls)}" if calls else None
+
+    def _make_configure(self, statement: str, configured: list) -> Callable[..., None]:
+        """Return a listener that runs `statement` on each connection, once."""
+
+        def configure(dbapi_connection, connection_record, connection_proxy) -> None:
+            if connection_record.info.get("sqlalchemydiff_throttle") is self:
+                return
+            # On the DBAPI connection, so that the statement is neither throttled nor recorded
+            cursor = dbapi_connection.cursor()
+            try:
+                cursor.execute(statement)
+            finally:
+                cursor.close()
+            dbapi_connection.commit()
+            connection_record.info["sqlalchemydiff_throttle"] = self
+            configured.append(connection_record)
+
+        return configure
+
+    def _set_statement_timeout(self, connection: Connection) -> None:
+        """Lower the statement timeout of the transaction to the time left before the deadline.
+
+        The statement timeout of the session is kept when there is no current deadline.
+        """
+        deadline = current_deadline.get()
+        if deadline is None:
+            return
+        timeout = _to_milliseconds(min(self.statement_timeout, deadline.remaining))
+        # SET, unlike a query, can run before SET TRANSACTION SNAPSHOT
+        connection.exec_driver_sql(
+            f"SET LOCAL statement_timeout = {timeout}", execution_options={SESSION_SETUP: True}
+        )
+
+
+def _to_milliseconds(seconds: float | None) -> int | None:
+    """Return a timeout in whole milliseconds, of at least one, since zero turns it off."""
+    return None if seconds is None else max(ceil(seconds * 1000), 1)
+
+
+def _quote(value: str) -> str:
+    """Quote `value` as a string literal."""
+    return "'" + value.replace("'", "''") + "'"
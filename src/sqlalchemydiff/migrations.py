@@ -0,0 +1,96 @@
+"""Find the tables touched by a range of Alembic migrations.
+
+The upgrade of each migration in the range is run in offline mode (as ``alembic upgrade --sql``
+would), and the tables each of its operations is about are recorded. The comparison can then be
+restricted to these tables, with the `include` parameter of
+:meth:`~sqlalchemydiff.comparer.Comparer.compare`.
+
+This needs Alembic to be installed, for example with ``pip install sqlalchemy-diff[alembic]``.
+"""
+
+import io
+import os
+from typing import Any
+
+from alembic.config import Config
+from alembic.operations import Operations
+from alembic.operations.ops import BulkInsertOp, MigrateOperation
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from alembic.util import CommandError
+
+
+# Attributes of the operations that name the tables they change
+TABLE_ATTRIBUTES = ("table_name", "new_table_name", "source_table")
+
+
+class TableRecorder:
+    """Record the names of the tables changed by the operations run through `operations`.
+
+    `tables` is `None` once an operation was run whose tables cannot be known, for example
+    ``op.execute``, or ``op.drop_index`` without a table name.
+    """
+
+    def __init__(self, operations: Operations):
+        self.tables: set[str] | None = set()
+        invoke, batch_alter_table = operations.invoke, operations.batch_alter_table
+
+        def record_invoke(operation: MigrateOperation) -> Any:
+            self.record(operation)
+            return invoke(operation)
+
+        def record_batch_alter_table(table_name: str, *args: Any, **kw: Any) -> Any:
+            self.add_tables([table_name])
+            return batch_alter_table(table_name, *args, **kw)
+
+        operations.invoke = record_invoke
+        operations.batch_alter_table = record_batch_alter_table
+
+    def record(self, operation: MigrateOperation) -> None:
+        tables = [
+            value
+            for value in (getattr(operation, name, None) for name in TABLE_ATTRIBUTES)
+            if isinstance(value, str)
+        ]
+        if not tables and not isinstance(operation, BulkInsertOp):
+            self.tables = None
+        self.add_tables(tables)
+
+    def add_tables(self, tables: list[str]) -> None:
+        if self.tables is not None:
+            self.tables.update(tables)
+
+
+def get_migration_tables(
+    config: Config | str | os.PathLike,
+    base: str = "base",
+    head: str = "heads",
+    dialect_name: str = "postgresql",
+) -> set[str] | None:
+    """Return the names of the tables changed by the migrations after `base`, up to `head`.
+
+    `config` is an Alembic config, or the path to its ``alembic.ini``. The migrations are run in
+    offline mode for `dialect_name`.
+
+    Returns `None` if some of the tables cannot be known, in which case the whole schema should
+    be compared. This is also the case if an operation cannot be run offline for `dialect_name`,
+    such as ``op.create_foreign_key``, or a batch operation without ``copy_from``, on SQLite.
+    """
+    if not isinstance(config, Config):
+        config = Config(config)
+    script_directory = ScriptDirectory.from_config(config)
+
+    migration_context = MigrationContext.configure(
+        dialect_name=dialect_name, opts={"as_sql": True, "output_buffer": io.StringIO()}
+    )
+    scripts = reversed(list(script_directory.iterate_revisions(head, base)))
+
+    with Operations.context(migration_context) as operations:
+        recorder = TableRecorder(operations)
+        try:
+            for script in scripts:
+                script.module.upgrade()
+        except (NotImplementedError, CommandError):
+            return None
+
+    return recorder.tables
@@ -0,0 +1,69 @@
+"""Compare a sample of the tables, for quick approximate drift checks.
+
+The tables found in both databases are ranked by a hash of their name and of a seed, and only
+the first ones are reflected by the table level inspectors. The sample is pseudo-random, but
+deterministic: the same seed always samples the same tables, and a table stays in the sample
+when other tables are added or dropped. The tables found in one database only are always
+compared, since their names already differ.
+
+From the number of sampled tables that differ, an upper bound on the number of tables that
+differ in the whole schema is computed, with the hypergeometric distribution of the tables that
+differ in a sample drawn without replacement.
+"""
+
+import hashlib
+from collections.abc import Iterable
+from math import comb
+from typing import NamedTuple
+
+
+class SampleResult(NamedTuple):
+    """The result of comparing a sample of the tables found in both databases.
+
+    With the given `confidence`, at most `max_drifted` of these `tables` differ, knowing that
+    `drifted` of the `sampled` tables do.
+    """
+
+    tables: int
+    sampled: int
+    drifted: int
+    confidence: float
+    max_drifted: int
+
+    @property
+    def max_drift_rate(self) -> float:
+        """The upper bound on the proportion of the tables that differ."""
+        return self.max_drifted / self.tables if self.tables else 0.0
+
+
+def sample_tables(tables: Iterable[str], size: int, seed: int | str = 0) -> set[str]:
+    """Return `size` of `tables`, picked deterministically from `seed`."""
+    ranked = sorted(tables, key=lambda name: hashlib.sha256(f"{seed}:{name}".encode()).digest())
+    return set(ranked[:size])
+
+
+def get_max_drifted(tables: int, sampled: int, drifted: int, confidence: float) -> int:
+    """Return the upper bound on the tables that differ, out of `tables`, with `confidence`.
+
+    This is the largest number of tables that differ for which finding at most `drifted` of them
+    in a sample of `sampled` tables has a probability greater than ``1 - confidence``.
+    """
+    total = comb(tables, sampled)
+
+    def probability(max_drifted: int) -> float:
+        return (
+            sum(
+                comb(max_drifted, found) * comb(tables - max_drifted, sampled - found)
+                for found in range(drifted + 1)
+            )
+            / total
+        )
+
+    low, high = drifted, drifted + tables - sampled
+    while low < high:
+        middle = (low + high + 1) // 2
+        if probability(middle) > 1 - confidence:
+            low = middle
+        else:
+            high = middle - 1
+    return low
@@ -0,0 +1,73 @@
+"""Order the inspectors to find the first difference as soon as possible.
+
+An :class:`InspectorHistory` is a JSON file where the cost of each inspector, the time it takes
+to inspect both databases and diff them, and how often it finds differences are recorded across
+comparisons. Older comparisons weigh less than recent ones, so that the history follows the
+schemas as they change.
+
+When the inspectors are run until the first one that finds differences, the expected time to the
+first difference is the shortest when they are run by increasing ratio of their cost to their
+probability of finding differences. The probability of an inspector is estimated from its
+history, starting from one half for an inspector that was never run, which is then run first.
+"""
+
+import json
+import os
+from collections.abc import Iterable
+from pathlib import Path
+
+
+class InspectorHistory:
+    """The cost and the mismatch frequency of the inspectors, saved in the JSON file `path`.
+
+    At each comparison, the recorded counts are multiplied by `decay` before the new ones are
+    added.
+    """
+
+    def __init__(self, path: str | os.PathLike, decay: float = 0.9):
+        self.path = Path(path)
+        self.decay = decay
+        self.inspectors: dict[str, dict[str, float]] = {}
+        if self.path.exists():
+            with open(self.path) as stream:
+                self.inspectors = json.load(stream)
+
+    def get_mismatch_rate(self, inspector_key: str) -> float:
+        """Return the estimated probability that an inspector finds differences."""
+        history = self.inspectors.get(inspector_key, {})
+        return (history.get("mismatches", 0.0) + 1) / (history.get("runs", 0.0) + 2)
+
+    def get_cost(self, inspector_key: str) -> float:
+        """Return the average time an inspector takes, in seconds, or zero if it was never run."""
+        history = self.inspectors.get(inspector_key, {})
+        return history["seconds"] / history["runs"] if history.get("runs") else 0.0
+
+    def order(self, inspector_keys: Iterable[str]) -> list[str]:
+        """Return `inspector_keys` by increasing expected cost of finding a difference.
+
+        Inspectors with the same expected cost are kept in their order.
+        """
+        return sorted(
+            inspector_keys, key=lambda key: self.get_cost(key) / self.get_mismatch_rate(key)
+        )
+
+    def record(self, runs: dict[str, tuple[float, bool]]) -> None:
+        """Record a comparison, with the time taken and if differences were found, by inspector."""
+        for history in self.inspectors.values():
+            for name in history:
+                history[name] *= self.decay
+        for key, (seconds, mismatched) in runs.items():
+            history = self.inspectors.setdefault(
+                key, {"runs": 0.0, "seconds": 0.0, "mismatches": 0.0}
+            )
+            history["runs"] += 1
+            history["seconds"] += seconds
+            history["mismatches"] += mismatched
+
+    def save(self) -> None:
+        """Save the history, replacing the file at once."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temporary_path = self.path.with_suffix(".tmp")
+        with open(temporary_path, "w") as stream:
+            json.dump(self.inspectors, stream, indent=4, sort_keys=True)
+        os.replace(temporary_path, self.path)
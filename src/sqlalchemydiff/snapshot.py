@@ -0,0 +1,175 @@
+import hashlib
+import json
+import logging
+import os
+import time
+from collections.abc import Iterable, Mapping
+from typing import Any
+
+from sqlalchemy.engine import Engine, make_url
+
+from .inspection import register
+from .inspection.base import BaseInspector
+from .inspection.exceptions import InspectorNotSupported, UnknownInspector
+from .inspection.ignore import IgnoreSpecType
+from .inspection.records import Record
+
+
+logger = logging.getLogger(__name__)
+
+
+class Snapshot:
+    """A point-in-time capture of the inspection results of a database.
+
+    A snapshot can be dumped to a JSON file and loaded back later, and it can be used in place
+    of an engine on either side of a :class:`~sqlalchemydiff.comparer.Comparer`.
+
+    Snapshots are taken without applying any ignore clauses, so that the same snapshot can be
+    reused with different ignores: these are applied when the comparer reads from it.
+
+    :attribute info: The inspection results, keyed by inspector key.
+    :attribute dialect: The name of the dialect of the database the snapshot was taken from.
+    """
+
+    format_version = 1
+
+    def __init__(self, info: dict[str, Any], dialect: str = ""):
+        self.info = info
+        self.dialect = dialect
+
+    @classmethod
+    def take(cls, engine: Engine, ignore_inspectors: Iterable[str] | None = None) -> "Snapshot":
+        """Inspect `engine` with all the registered inspectors and capture the results."""
+        ignore_inspectors = set(ignore_inspectors or set())
+        if not ignore_inspectors <= register.keys():
+            unknown_inspectors = ignore_inspectors - register.keys()
+            raise UnknownInspector(f"Unknown inspector: {', '.join(sorted(unknown_inspectors))}")
+
+        info = {}
+        for key, (_, inspector_class) in register.items():
+            if key in ignore_inspectors:
+                continue
+            try:
+                info[key] = inspector_class().inspect(engine)
+            except InspectorNotSupported as e:
+                logger.warning({"engine": engine, "inspector": key, "error": e.message})
+
+        return cls(cls.normalise(info), dialect=engine.dialect.name)
+
+    @staticmethod
+    def normalise(data: Any) -> Any:
+        """Return `data` as it would look after a round trip through JSON.
+
+        Inspectors may return tuples where a loaded snapshot has lists, so live inspection
+        results are normalised before being compared against a snapshot.
+        """
+        return json.loads(json.dumps(data, default=_to_json))
+
+    def get_info(
+        self, inspector: BaseInspector, ignore_specs: list[IgnoreSpecType] | None = None
+    ) -> Any | None:
+        """Return the captured results for `inspector`, filtered by `ignore_specs`.
+
+        Returns `None` if the inspector was not captured, for example because it was not
+        supported by the database the snapshot was taken from.
+        """
+        if inspector.key not in self.info:
+            return None
+
+        info = self.info[inspector.key]
+        ignore_clauses = inspector._filter_ignorers(ignore_specs)
+
+        if inspector.db_level:
+            if isinstance(info, Mapping):
+                return {
+                    name: item
+                    for name, item in info.items()
+                    if not ignore_clauses.is_table_ignored(name)
+                }
+            return [item for item in info if item["name"] not in ignore_clauses.enums]
+
+        result = {}
+        for table_name, items in info.items():
+            if ignore_clauses.is_table_ignored(table_name):
+                continue
+
+            if isinstance(items, Mapping):
+                if ignore_clauses.is_clause(table_name, inspector.key, items.get("name")):
+                    items = {}
+                result[table_name] = items
+            else:
+                result[table_name] = [
+                    item
+                    for item in items
+                    if not ignore_clauses.is_clause(table_name, inspector.key, item["name"])
+                ]
+        return result
+
+    def dump(self, filename: str | os.PathLike) -> None:
+        """Dump the snapshot to a JSON file."""
+        data = {
+            "format_version": self.format_version,
+            "dialect": self.dialect,
+            "info": self.info,
+        }
+        with open(filename, "w") as stream:
+            json.dump(data, stream, indent=4, sort_keys=True)
+
+    @classmethod
+    def load(cls, filename: str | os.PathLike) -> "Snapshot":
+        """Load a snapshot previously written with :meth:`dump`."""
+        with open(filename) as stream:
+            data = json.load(stream)
+
+        if data.get("format_version") != cls.format_version:
+            raise ValueError(f"Unsupported snapshot format: '{filename}'")
+
+        return cls(data["info"], dialect=data.get("dialect", ""))
+
+
+def _to_json(value: Any) -> Any:
+    if isinstance(value, Record):
+        return value.as_dict()
+    return str(value)
+
+
+# The maximum age of a cached snapshot, in seconds, by default
+DEFAULT_CACHE_TTL = 3600.0
+
+
+class SnapshotCache:
+    """Cache snapshots on disk, keyed by database URL.
+
+    Passwords are not part of the cache key. Cached snapshots older than `ttl` seconds, an hour
+    by default, are considered stale and ignored, unless `ttl` is `None`. Each cached snapshot
+    that is used is logged, with its age, since it does not reflect the later schema changes,
+    and its age, in seconds, is kept in `ages`, by URL.
+    """
+
+    def __init__(self, directory: str | os.PathLike, ttl: float | None = DEFAULT_CACHE_TTL):
+        self.directory = directory
+        self.ttl = ttl
+        self.ages: dict[str, float] = {}
+
+    def get(self, uri: str) -> Snapshot | None:
+        path = self._get_path(uri)
+        if not os.path.exists(path):
+            return None
+
+        age = time.time() - os.path.getmtime(path)
+        if self.ttl is not None and age > self.ttl:
+            return None
+
+        url = make_url(uri).render_as_string(hide_password=True)
+        logger.warning({"url": url, "cached_snapshot_age": round(age, 1)})
+        self.ages[uri] = age
+        return Snapshot.load(path)
+
+    def put(self, uri: str, snapshot: Snapshot) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        snapshot.dump(self._get_path(uri))
+
+    def _get_path(self, uri: str) -> str:
+        url = make_url(uri).render_as_string(hide_password=True)
+        digest = hashlib.sha256(url.encode()).hexdigest()
+        return os.path.join(self.directory, f"{digest}.json")
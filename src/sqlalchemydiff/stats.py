@@ -0,0 +1,116 @@
+import time
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+@dataclass
+class InspectionStats:
+    """Statistics of running one inspector against one database.
+
+    `rows` is the number of rows returned by the statements, as reported by the DBAPI cursor:
+    drivers that do not report it (like sqlite3) leave it at zero.
+    """
+
+    wall_time: float = 0.0
+    query_time: float = 0.0
+    statements: int = 0
+    rows: int = 0
+
+
+@dataclass
+class InspectorStats:
+    """Statistics of one inspector, keyed by database alias."""
+
+    inspection: dict[str, InspectionStats] = field(default_factory=dict)
+    diff_time: float = 0.0
+
+
+@dataclass
+class CompareStats:
+    """Statistics of a comparison, keyed by inspector key."""
+
+    inspectors: dict[str, InspectorStats] = field(default_factory=dict)
+    wall_time: float = 0.0
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+_current_stats: ContextVar[InspectionStats | None] = ContextVar("current_stats", default=None)
+
+
+class StatsRecorder:
+    """Record the statistics of a comparison.
+
+    Statements are attributed to the inspection that is running in the current context, so
+    that inspections running concurrently on the same engine are told apart.
+    """
+
+    def __init__(self):
+        self.stats = CompareStats()
+
+    @contextmanager
+    def listen(self, engines: Iterable[Engine]) -> Iterator[None]:
+        """Listen to the statements executed on `engines`."""
+        engines = list({id(engine): engine for engine in engines}.values())
+        for engine in engines:
+            event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+            event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+        try:
+            yield
+        finally:
+            for engine in engines:
+                event.remove(engine, "before_cursor_execute", self._before_cursor_execute)
+                event.remove(engine, "after_cursor_execute", self._after_cursor_execute)
+
+    @contextmanager
+    def time_comparison(self) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stats.wall_time = time.perf_counter() - start
+
+    @contextmanager
+    def time_inspection(self, inspector_key: str, alias: str) -> Iterator[None]:
+        inspection_stats = InspectionStats()
+        self._get_inspector_stats(inspector_key).inspection[alias] = inspection_stats
+
+        token = _current_stats.set(inspection_stats)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            inspection_stats.wall_time = time.perf_counter() - start
+            _current_stats.reset(token)
+
+    @contextmanager
+    def time_diff(self, inspector_key: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._get_inspector_stats(inspector_key).diff_time = time.perf_counter() - start
+
+    def _get_inspector_stats(self, inspector_key: str) -> InspectorStats:
+        return self.stats.inspectors.setdefault(inspector_key, InspectorStats())
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if _current_stats.get() is not None:
+            conn.info.setdefault("sqlalchemydiff_query_start", []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        inspection_stats = _current_stats.get()
+        if inspection_stats is None:
+            return
+
+        start = conn.info["sqlalchemydiff_query_start"].pop()
+        inspection_stats.query_time += time.perf_counter() - start
+        inspection_stats.statements += 1
+        if cursor.rowcount > 0:
+            inspection_stats.rows += cursor.rowcount
@@ -0,0 +1,148 @@
+"""Compare the tables made from the same template against a single representative.
+
+Some schemas have many tables with the same structure, for example the per-tenant tables
+``tenant_0001_orders`` and ``tenant_0002_orders``. Given a naming rule, a regular expression
+whose first group captures the name of the template (``orders``, with ``tenant_\\d+_(\\w+)``),
+the tables whose names match it are grouped by template, and the definition of each of them is
+read from the catalog and hashed. The names of the table and of the other tables with the same
+rest of the name (``tenant_0001_``) are replaced by their template in its definition first, so
+that the names of its constraints and indexes, and its references to the other tables of the
+same tenant, match the ones of the other tables, while its columns keep their names.
+
+The table with the smallest name of each template, among the ones in both databases, is its
+representative. The tables with the same digest as the representative, in each database they
+are in, are then left out of the table level inspectors, so that only the representatives and
+the outliers are reflected and diffed in full.
+
+Definitions are read by dialect name, with the readers registered in :data:`finders`. On the
+other dialects, no table is grouped.
+"""
+
+import hashlib
+import re
+from collections.abc import Callable, Iterable, Mapping
+from typing import NamedTuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from .identical import POSTGRESQL_DEFINITIONS
+from .inspection.schema import get_qualifier_pattern
+
+
+class TemplateTable(NamedTuple):
+    """A table matching the naming rule, with its template and the digest of its definition."""
+
+    template: str
+    digest: str
+
+
+def get_sqlite_definitions(connection: Connection, schema: str | None) -> dict[str, list[str]]:
+    """Return the SQL each table of a SQLite database and its indexes were created with."""
+    quote = connection.dialect.identifier_preparer.quote_identifier
+    rows = connection.exec_driver_sql(
+        f"SELECT tbl_name, sql FROM {quote(schema or 'main')}.sqlite_master "
+        "WHERE type IN ('table', 'index') AND sql IS NOT NULL "
+        "AND tbl_name NOT LIKE 'sqlite~_%' ESCAPE '~'"
+    )
+    definitions: dict[str, list[str]] = {}
+    for name, sql in rows:
+        definitions.setdefault(name, []).append(sql)
+    return definitions
+
+
+def get_postgresql_definitions(connection: Connection, schema: str | None) -> dict[str, list[str]]:
+    """Return the definitions of the tables of a PostgreSQL schema, one line per object.
+
+    These are the definitions :mod:`sqlalchemydiff.identical` compares, with the columns,
+    constraints and indexes of each table.
+    """
+    schema = schema or connection.dialect.default_schema_name
+    pattern = get_qualifier_pattern(connection.dialect.identifier_preparer.quote(schema))
+    rows = connection.execute(
+        text(POSTGRESQL_DEFINITIONS + "SELECT name, definition FROM definitions"),
+        {
+            "one_schema": schema,
+            "two_schema": schema,
+            "one_pattern": pattern,
+            "two_pattern": pattern,
+        },
+    )
+    return {name: definition.split("\n") for name, definition in rows}
+
+
+# Table definition readers, by dialect name
+finders: dict[str, Callable[[Connection, str | None], dict[str, list[str]]]] = {
+    "sqlite": get_sqlite_definitions,
+    "postgresql": get_postgresql_definitions,
+}
+
+
+def get_definitions(connection: Connection, schema: str | None) -> dict[str, list[str]]:
+    """Return the definitions of the tables of `schema`, by table name."""
+    finder = finders.get(connection.dialect.name)
+    if finder is None:
+        return {}
+    return finder(connection, schema)
+
+
+def get_template_tables(
+    definitions: Mapping[str, Iterable[str]], pattern: re.Pattern
+) -> dict[str, TemplateTable]:
+    """Return the tables of `definitions` whose whole name matches `pattern`, by table name.
+
+    In the definition of each table, its own name and the names of the tables with the same
+    rest of the name, such as the tables of the same tenant, are replaced by their template.
+    The rest of the name is left as is anywhere else, for example in the names of columns.
+    """
+    templates = {}
+    siblings: dict[tuple[str, str], list[str]] = {}
+    for name in definitions:
+        match = pattern.fullmatch(name)
+        if match is None or match.group(1) is None:
+            continue
+        templates[name] = match.group(1)
+        siblings.setdefault((name[: match.start(1)], name[match.end(1) :]), []).append(name)
+
+    tables = {}
+    for names in siblings.values():
+        # The longest names first, so that a name is not replaced within a longer one
+        names = sorted(names, key=len, reverse=True)
+        for name in names:
+            normalised = []
+            for line in definitions[name]:
+                for sibling in names:
+                    line = line.replace(sibling, f"\0{templates[sibling]}\0")
+                normalised.append(line)
+
+            digest = hashlib.sha256("\n".join(sorted(normalised)).encode()).hexdigest()
+            tables[name] = TemplateTable(templates[name], digest)
+    return tables
+
+
+def find_template_tables(tables: list[Mapping[str, TemplateTable]]) -> dict[str, str]:
+    """Return the tables that match the representative of their template in each database.
+
+    `tables` has the template tables of each database. The result maps the name of each table
+    that matches its representative, in each database it is in, to the representative.
+    """
+    templates: dict[str, set[str]] = {}
+    for database_tables in tables:
+        for name, table in database_tables.items():
+            templates.setdefault(table.template, set()).add(name)
+
+    matching = {}
+    for names in templates.values():
+        common = [name for name in names if all(name in database for database in tables)]
+        representative = min(common or names)
+        for name in sorted(names - {representative}):
+            if all(
+                name not in database
+                or (
+                    representative in database
+                    and database[name].digest == database[representative].digest
+                )
+                for database in tables
+            ):
+                matching[name] = representative
+    return matching
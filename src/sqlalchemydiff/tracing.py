@@ -0,0 +1,116 @@
+"""Tracing hooks around the phases of a comparison.
+
+Register a :class:`Tracer` with :func:`add_tracer` to be notified at the start and end of each
+phase. The phases, with the attributes they are traced with, are:
+
+- ``check_replicas``: ``database``.
+- ``find_identical``.
+- ``count_tables``.
+- ``find_partitions``.
+- ``find_templates``: ``database``.
+- ``connect``: ``database``.
+- ``inspect``: ``inspector``, ``database``.
+- ``inspect_table``: ``inspector``, ``table``.
+- ``diff``: ``inspector``.
+- ``compile_errors``.
+- ``dump``: ``filename``.
+
+When no tracer is registered, tracing is a no-op.
+"""
+
+import logging
+import time
+from collections.abc import Iterator
+from contextlib import AbstractContextManager, ExitStack, contextmanager, nullcontext
+from typing import Any
+
+
+logger = logging.getLogger(__name__)
+
+
+class Tracer:
+    """Base class for tracers.
+
+    Override :meth:`start` and :meth:`end`, or override :meth:`span` to wrap each phase in
+    a context manager of your own (for example an OpenTelemetry span).
+    """
+
+    @contextmanager
+    def span(self, phase: str, attributes: dict[str, Any]) -> Iterator[None]:
+        self.start(phase, attributes)
+        try:
+            yield
+        except BaseException as e:
+            self.end(phase, attributes, e)
+            raise
+        self.end(phase, attributes, None)
+
+    def start(self, phase: str, attributes: dict[str, Any]) -> None:
+        """Called when a phase starts."""
+
+    def end(self, phase: str, attributes: dict[str, Any], error: BaseException | None) -> None:
+        """Called when a phase ends, with the exception that ended it, if any."""
+
+
+class LoggingTracer(Tracer):
+    """Log the duration of each phase."""
+
+    def __init__(self, level: int = logging.DEBUG):
+        self.level = level
+
+    @contextmanager
+    def span(self, phase: str, attributes: dict[str, Any]) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            logger.log(
+                self.level,
+                {"phase": phase, **attributes, "duration": time.perf_counter() - start},
+            )
+
+
+class RecordingTracer(Tracer):
+    """Record the start and end of each phase in memory.
+
+    :attribute events: A list of ``(event, phase, attributes)`` tuples, where ``event`` is
+        either ``"start"`` or ``"end"``.
+    """
+
+    def __init__(self):
+        self.events: list[tuple[str, str, dict[str, Any]]] = []
+
+    def start(self, phase: str, attributes: dict[str, Any]) -> None:
+        self.events.append(("start", phase, attributes))
+
+    def end(self, phase: str, attributes: dict[str, Any], error: BaseException | None) -> None:
+        self.events.append(("end", phase, attributes))
+
+
+# Registered tracers
+tracers: list[Tracer] = []
+
+_no_span = nullcontext()
+
+
+def add_tracer(tracer: Tracer) -> None:
+    tracers.append(tracer)
+
+
+def remove_tracer(tracer: Tracer) -> None:
+    tracers.remove(tracer)
+
+
+def span(phase: str, **attributes: Any) -> AbstractContextManager:
+    """Trace `phase` with all the registered tracers."""
+    if not tracers:
+        return _no_span
+    return _span(phase, attributes)
+
+
+@contextmanager
+def _span(phase: str, attributes: dict[str, Any]) -> Iterator[None]:
+    with ExitStack() as stack:
+        for tracer in list(tracers):
+            stack.enter_context(tracer.span(phase, attributes))
+        yield
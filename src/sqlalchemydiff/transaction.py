@@ -0,0 +1,44 @@
+"""Consistent reflection of a PostgreSQL database from several connections.
+
+A ``REPEATABLE READ`` transaction sees the database as it was when the transaction started.
+:func:`export_snapshot` starts such a transaction, and exports its snapshot, which other
+transactions can then import with :func:`import_snapshot`, to see the database exactly as the
+first one does. As long as the exporting transaction is open, all the connections that import
+its snapshot reflect the same schema, even if a migration is committed in the meantime.
+"""
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+
+SNAPSHOT_EXECUTION_OPTIONS = {"isolation_level": "REPEATABLE READ", "postgresql_readonly": True}
+
+
+def is_supported(engine: Engine) -> bool:
+    return engine.dialect.name == "postgresql"
+
+
+@contextmanager
+def export_snapshot(engine: Engine) -> Iterator[str]:
+    """Start a read only ``REPEATABLE READ`` transaction, and yield the id of its snapshot.
+
+    The transaction is kept open, and the snapshot can be imported, until the context is exited.
+    """
+    with engine.connect() as connection:
+        connection = connection.execution_options(**SNAPSHOT_EXECUTION_OPTIONS)
+        with connection.begin():
+            yield connection.execute(text("SELECT pg_export_snapshot()")).scalar_one()
+
+
+@contextmanager
+def import_snapshot(engine: Engine, snapshot_id: str) -> Iterator[Connection]:
+    """Yield a connection in a read only transaction that imported the snapshot `snapshot_id`."""
+    with engine.connect() as connection:
+        connection = connection.execution_options(**SNAPSHOT_EXECUTION_OPTIONS)
+        with connection.begin():
+            # SET does not take bound parameters, and snapshot ids are made of hex digits and dashes
+            connection.exec_driver_sql(f"SET TRANSACTION SNAPSHOT '{snapshot_id}'")
+            yield connection
@@ -0,0 +1,428 @@
+import io
+import json
+import os
+from unittest.mock import patch
+
+import pytest
+
+from sqlalchemydiff.cli import (
+    EXIT_DIFFERENT,
+    EXIT_ERROR,
+    EXIT_MATCH,
+    EXIT_PARTIAL,
+    get_side,
+    main,
+    write_result,
+)
+from sqlalchemydiff.comparer import CompareResult
+from sqlalchemydiff.inspection.base import BaseInspector
+from sqlalchemydiff.migrations import get_migration_tables
+from sqlalchemydiff.snapshot import DEFAULT_CACHE_TTL, Snapshot, SnapshotCache
+from tests.test_inspectors.test_contention import make_lock_error
+from tests.test_migrations import make_alembic_config
+from tests.util import get_engine, prepare_schema_from_models
+
+from .models.models_one import Base as BaseOne
+from .models.models_two import Base as BaseTwo
+
+
+class TestCli:
+    @pytest.fixture
+    def uri_one(self, tmp_path):
+        uri = f"sqlite:///{tmp_path / 'one.db'}"
+        prepare_schema_from_models(get_engine(uri), BaseOne)
+        return uri
+
+    @pytest.fixture
+    def uri_two(self, tmp_path):
+        uri = f"sqlite:///{tmp_path / 'two.db'}"
+        prepare_schema_from_models(get_engine(uri), BaseTwo)
+        return uri
+
+    def test_summary_match(self, uri_one, capsys):
+        assert main([uri_one, uri_one]) == EXIT_MATCH
+        assert capsys.readouterr().out == "Schemas match.\n"
+
+    def test_summary_differ(self, uri_one, uri_two, capsys):
+        assert main([uri_one, uri_two]) == EXIT_DIFFERENT
+
+        lines = capsys.readouterr().out.splitlines()
+        assert lines[-1] == "Schemas differ."
+        assert "columns: 20 difference(s)" in lines
+
+    def test_json(self, uri_one, uri_two, compare_errors_sqlite, capsys):
+        assert main([uri_one, uri_two, "--format", "json"]) == EXIT_DIFFERENT
+        assert json.loads(capsys.readouterr().out) == compare_errors_sqlite
+
+    def test_json_compact(self, uri_one, uri_two, compare_errors_sqlite, capsys):
+        assert main([uri_one, uri_two, "--format", "json", "--compact"]) == EXIT_DIFFERENT
+        assert json.loads(capsys.readouterr().out) == compare_errors_sqlite
+
+    def test_jsonl(self, uri_one, uri_two, capsys):
+        assert main([uri_one, uri_two, "-f", "jsonl", "--ignore-inspector", "columns"]) == 1
+
+        records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+        assert {record["inspector"] for record in records} == {
+            "tables",
+            "primary_keys",
+            "foreign_keys",
+            "indexes",
+            "unique_constraints",
+            "check_constraints",
+        }
+        assert {
+            "inspector": "primary_keys",
+            "table": "tenures",
+            "kind": "one_only",
+            "item": {"constrained_columns": ["employee_id", "company_id"], "name": None},
+        } in records
+
+    def test_jsonl_status(self, uri_one, uri_two, capsys):
+        args = [uri_one, uri_two, "-f", "jsonl"]
+
+        # A complete comparison has no status record
+        assert main(args) == EXIT_DIFFERENT
+        assert all("inspector" in json.loads(line) for line in capsys.readouterr().out.splitlines())
+
+        assert main([*args, "--timeout=0"]) == EXIT_PARTIAL
+        assert [json.loads(line) for line in capsys.readouterr().out.splitlines()] == [
+            {
+                "status": "partial",
+                "uncovered": dict.fromkeys(
+                    [
+                        "tables",
+                        "columns",
+                        "primary_keys",
+                        "foreign_keys",
+                        "indexes",
+                        "unique_constraints",
+                        "check_constraints",
+                        "enums",
+                    ]
+                ),
+                "unavailable": {},
+                "sample": None,
+                "cached": {},
+            }
+        ]
+
+        assert main([*args, "--sample=2", "--sample-seed=seed"]) == EXIT_DIFFERENT
+        status = json.loads(capsys.readouterr().out.splitlines()[-1])
+        assert status["status"] == "sampled"
+        assert status["sample"]["sampled"] == 2
+        assert status["sample"]["tables"] == 5
+
+    def test_json_status(self, uri_one, uri_two, compare_errors_sqlite, capsys):
+        args = [uri_one, uri_two, "-f", "json"]
+
+        # A complete comparison has no status
+        assert main(args) == EXIT_DIFFERENT
+        assert json.loads(capsys.readouterr().out) == compare_errors_sqlite
+
+        assert main([*args, "--timeout=0"]) == EXIT_PARTIAL
+        output = json.loads(capsys.readouterr().out)
+        assert output["status"]["status"] == "partial"
+        assert output["status"]["uncovered"]["columns"] is None
+
+        assert main([*args, "--sample=2", "--sample-seed=seed"]) == EXIT_DIFFERENT
+        output = json.loads(capsys.readouterr().out)
+        assert output["status"]["status"] == "sampled"
+        assert output["status"]["sample"]["sampled"] == 2
+
+    def test_include(self, uri_one, uri_two, capsys):
+        args = [uri_one, uri_two, "-f", "jsonl", "--include", "employees", "--include", "role*"]
+        assert main(args) == EXIT_DIFFERENT
+
+        records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+        assert {record["table"] for record in records} == {"employees", "roles"}
+
+    def test_alembic_range(self, uri_one, uri_two, tmp_path, capsys):
+        config_path = str(make_alembic_config(tmp_path / "alembic"))
+        args = [uri_one, uri_two, "-f", "jsonl", "--alembic-config", config_path]
+
+        def get_tables(alembic_range):
+            assert main([*args, "--alembic-range", alembic_range]) == EXIT_DIFFERENT
+            lines = capsys.readouterr().out.splitlines()
+            return {json.loads(line)["table"] for line in lines}
+
+        tables = get_tables("base:r1")
+        assert tables == {"employees"}
+
+        # The tables changed by op.execute cannot be known, so all the tables are compared
+        assert get_tables("r2:r3") > tables
+        # Nor can those of operations that cannot be run offline on SQLite
+        assert get_tables("r1:r2") == get_tables("r2:r3")
+
+    def test_alembic_dialect(self, uri_one, uri_two, tmp_path, capsys):
+        config_path = str(make_alembic_config(tmp_path / "alembic"))
+        snapshot = str(tmp_path / "one.json")
+        Snapshot.take(get_engine(uri_one)).dump(snapshot)
+
+        # The migrations are run for the dialect of the first database, or of its snapshot
+        for one in (uri_one, snapshot):
+            with patch(
+                "sqlalchemydiff.migrations.get_migration_tables", wraps=get_migration_tables
+            ) as get_tables:
+                args = [one, uri_two, "--alembic-config", config_path, "--alembic-range", "r1:r2"]
+                assert main(args) == EXIT_DIFFERENT
+            get_tables.assert_called_once_with(config_path, "r1", "r2", "sqlite")
+
+    def test_one_sided_names_only(self, uri_one, uri_two, compare_errors_sqlite, capsys):
+        assert main([uri_one, uri_two, "-f", "jsonl", "--one-sided-names-only"]) == 1
+
+        records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+        tables = compare_errors_sqlite["tables"]
+        one_sided = {table["name"] for table in tables["one_only"] + tables["two_only"]}
+        assert {record["item"]["name"] for record in records if record["table"] is None} == (
+            one_sided
+        )
+        assert not any(record["table"] in one_sided for record in records)
+
+    def test_collapse_partitions(self, uri_one, uri_two, capsys):
+        assert main([uri_one, uri_two, "--collapse-partitions"]) == EXIT_DIFFERENT
+        assert capsys.readouterr().out.splitlines()[-1] == "Schemas differ."
+
+    def test_template_pattern(self, uri_one, uri_two, capsys):
+        assert main([uri_one, uri_two, r"--template-pattern=(\w+)s"]) == EXIT_DIFFERENT
+        assert capsys.readouterr().out.splitlines()[-1] == "Schemas differ."
+
+    def test_sample(self, uri_one, uri_two, capsys):
+        assert main([uri_one, uri_two, "--sample=100", "--sample-seed=seed"]) == EXIT_DIFFERENT
+
+        lines = capsys.readouterr().out.splitlines()
+        assert (
+            lines[-2] == "Sampled 5 of 5 table(s), 5 differ: at most 5 differ with 95% confidence."
+        )
+
+    def test_sample_match(self, uri_one, capsys):
+        # The sampled tables match, but the other tables may differ
+        assert main([uri_one, uri_one, "--sample=2", "--sample-seed=seed"]) == EXIT_PARTIAL
+        assert capsys.readouterr().out.splitlines()[-2:] == [
+            "Sampled 2 of 6 table(s), 0 differ: at most 4 differ with 95% confidence.",
+            "No differences found in the sampled tables.",
+        ]
+
+        # A sample of all the tables is a complete comparison
+        assert main([uri_one, uri_one, "--sample=100"]) == EXIT_MATCH
+        assert capsys.readouterr().out.splitlines()[-1] == "Schemas match."
+
+        assert main([uri_one, uri_one, "--sample=2", "-f", "json"]) == EXIT_PARTIAL
+        assert json.loads(capsys.readouterr().out)["status"]["status"] == "sampled"
+
+    def test_checkpoint_dir(self, uri_one, uri_two, tmp_path, capsys):
+        checkpoint_dir = tmp_path / "checkpoint"
+        args = [uri_one, uri_two, f"--checkpoint-dir={checkpoint_dir}", "--retries=2"]
+
+        assert main(args) == EXIT_DIFFERENT
+        assert os.listdir(checkpoint_dir) == []
+
+    def test_timeout(self, uri_one, uri_two, capsys):
+        args = [uri_one, uri_two, "--timeout=0", "--inspector-timeout=columns=30"]
+
+        # Nothing was compared, so the schemas, which differ, are not reported as matching
+        assert main(args) == EXIT_PARTIAL
+        assert capsys.readouterr().out.splitlines() == [
+            "Partial comparison, not compared: tables, columns, primary_keys, foreign_keys, "
+            "indexes, unique_constraints, check_constraints, enums.",
+            "No differences found in what was compared.",
+        ]
+
+    def test_fail_fast(self, uri_one, uri_two, tmp_path, capsys):
+        history = tmp_path / "history.json"
+        args = [uri_one, uri_two, f"--history={history}", "--fail-fast"]
+
+        assert main(args) == EXIT_DIFFERENT
+        lines = capsys.readouterr().out.splitlines()
+        assert lines[-2].startswith("Partial comparison, not compared: columns, ")
+        assert lines[-1] == "Schemas differ."
+        assert history.exists()
+
+    def test_reflection(self, uri_one, uri_two, capsys):
+        assert main([uri_one, uri_two, "--reflection=auto"]) == EXIT_DIFFERENT
+        assert capsys.readouterr().out.splitlines()[-1] == "Schemas differ."
+
+    def test_throttle(self, uri_one, uri_two, capsys):
+        args = [uri_one, uri_two, "--max-qps=10000", "--max-connections=1", "--jobs=2"]
+
+        assert main(args) == EXIT_DIFFERENT
+        assert capsys.readouterr().out.splitlines()[-1] == "Schemas differ."
+
+    def test_replicas(self, uri_one, uri_two, tmp_path, capsys):
+        replica = f"sqlite:///{tmp_path / 'replica.db'}"
+        prepare_schema_from_models(get_engine(replica), BaseOne)
+        args = [uri_one, uri_two, "--one-replica", replica, "--max-replica-lag=10"]
+
+        assert main(args) == EXIT_DIFFERENT
+        assert capsys.readouterr().out.splitlines()[-1] == "Schemas differ."
+
+        # The snapshot of a database with replicas is taken from a replica
+        snapshot = tmp_path / "one.json"
+        assert main([*args, "--save-one", str(snapshot)]) == EXIT_DIFFERENT
+        assert Snapshot.load(snapshot).info == Snapshot.take(get_engine(replica)).info
+
+    def test_replicas_of_snapshot(self, uri_one, tmp_path, capsys):
+        snapshot = str(tmp_path / "one.json")
+        Snapshot.take(get_engine(uri_one)).dump(snapshot)
+
+        assert main([snapshot, uri_one, "--one-replica", uri_one]) == EXIT_ERROR
+        assert capsys.readouterr().err == (
+            f"sqlalchemy-diff: error: Replicas need a database URL, not a snapshot: '{snapshot}'\n"
+        )
+
+    def test_locked_tables(self, uri_one, capsys, monkeypatch):
+        inspect_tables = BaseInspector._inspect_tables
+
+        def _inspect_tables(inspector, sqlalchemy_inspector, ignore_clauses, inspect_table):
+            def inspect_unless_locked(table_name):
+                if table_name == "roles":
+                    raise make_lock_error()
+                return inspect_table(table_name)
+
+            return inspect_tables(
+                inspector, sqlalchemy_inspector, ignore_clauses, inspect_unless_locked
+            )
+
+        monkeypatch.setattr(BaseInspector, "_inspect_tables", _inspect_tables)
+
+        # The locked table was not compared, so the schemas are not reported as matching
+        assert main([uri_one, uri_one, "--lock-timeout=0.1"]) == EXIT_PARTIAL
+        assert capsys.readouterr().out.splitlines() == [
+            "Tables locked by other transactions, not compared: roles.",
+            "No differences found in what was compared.",
+        ]
+
+    def test_partial_summary(self):
+        result = CompareResult(
+            {"columns": {}},
+            uncovered={"columns": ["roles", "skills"], "enums": None},
+            unavailable={"columns": ["employees"], "indexes": ["employees", "tenures"]},
+        )
+        stream = io.StringIO()
+
+        write_result(result, "summary", stream)
+        assert stream.getvalue().splitlines()[:2] == [
+            "Partial comparison, not compared: columns (2 table(s)), enums.",
+            "Tables locked by other transactions, not compared: employees, tenures.",
+        ]
+
+    def test_output_file_and_options(self, uri_one, uri_two, compare_errors_sqlite, tmp_path):
+        output = tmp_path / "errors.json"
+        exit_code = main(
+            [
+                uri_one,
+                uri_two,
+                "--format=json",
+                f"--output={output}",
+                "--jobs=2",
+                "--ignore=employees",
+                "--ignore=skills.columns.description",
+                "--one-alias=production",
+                "--two-alias=staging",
+            ]
+        )
+        assert exit_code == EXIT_DIFFERENT
+
+        with open(output) as stream:
+            errors = json.load(stream)
+
+        assert "employees" not in errors["columns"]
+        assert errors["columns"]["skills"]["staging_only"] == [
+            compare_errors_sqlite["columns"]["skills"]["two_only"][0]
+        ]
+
+    def test_save_and_load_snapshots(self, uri_one, uri_two, compare_errors_sqlite, tmp_path):
+        snapshot_one = tmp_path / "one.json"
+        snapshot_two = tmp_path / "two.json"
+
+        exit_code = main(
+            [uri_one, uri_two, "--save-one", str(snapshot_one), "--save-two", str(snapshot_two)]
+        )
+        assert exit_code == EXIT_DIFFERENT
+
+        output = tmp_path / "errors.json"
+        exit_code = main([str(snapshot_one), uri_two, "-f", "json", "-o", str(output)])
+        assert exit_code == EXIT_DIFFERENT
+        with open(output) as stream:
+            assert json.load(stream) == compare_errors_sqlite
+
+        assert main([str(snapshot_two), str(snapshot_two)]) == EXIT_MATCH
+
+    def test_cache(self, uri_one, tmp_path, caplog, capsys):
+        cache_dir = tmp_path / "cache"
+
+        with patch.object(Snapshot, "take", wraps=Snapshot.take) as take:
+            assert main([uri_one, uri_one, "--cache-dir", str(cache_dir)]) == EXIT_MATCH
+            assert main([uri_one, uri_one, "--cache-dir", str(cache_dir)]) == EXIT_MATCH
+
+        assert take.call_count == 1
+        assert len(os.listdir(cache_dir)) == 1
+        # The use of a cached snapshot is logged, with its age
+        assert "cached_snapshot_age" in caplog.text
+
+        # And reported in the status, by alias
+        capsys.readouterr()
+        args = [uri_one, uri_one, "--cache-dir", str(cache_dir), "--two-alias", "other"]
+        assert main([*args, "-f", "json"]) == EXIT_MATCH
+        status = json.loads(capsys.readouterr().out)["status"]
+        assert main([*args, "-f", "jsonl"]) == EXIT_MATCH
+        assert json.loads(capsys.readouterr().out).keys() == status.keys()
+        assert status["status"] == "cached"
+        assert set(status["cached"]) == {"one", "other"}
+        assert all(0 <= age < 60 for age in status["cached"].values())
+
+    def test_cache_ttl(self, uri_one, tmp_path):
+        cache = SnapshotCache(tmp_path / "cache", ttl=60)
+
+        with patch.object(Snapshot, "take", wraps=Snapshot.take) as take:
+            get_side(uri_one, cache)
+            get_side(uri_one, cache)
+            assert take.call_count == 1
+
+            path = cache._get_path(uri_one)
+            os.utime(path, (os.path.getatime(path), os.path.getmtime(path) - 120))
+            get_side(uri_one, cache)
+            assert take.call_count == 2
+
+            # By default, a snapshot is stale after an hour, and without a TTL it never is
+            age = 2 * DEFAULT_CACHE_TTL
+            os.utime(path, (os.path.getatime(path), os.path.getmtime(path) - age))
+            get_side(uri_one, SnapshotCache(tmp_path / "cache"))
+            assert take.call_count == 3
+
+            os.utime(path, (os.path.getatime(path), os.path.getmtime(path) - age))
+            get_side(uri_one, SnapshotCache(tmp_path / "cache", ttl=None))
+            assert take.call_count == 3
+
+    @pytest.mark.parametrize(
+        "args, message",
+        [
+            (["--ignore-inspector", "unknown"], "Unknown inspector: unknown"),
+            (["--ignore", "a.b"], "Invalid ignore clause format: 'a.b'"),
+            (["--jobs", "0"], "jobs must be a positive integer"),
+            (["--retries", "-1"], "retries must not be negative"),
+            (["--max-qps", "0"], "max_qps must be positive"),
+            (
+                ["--inspector-timeout", "columns"],
+                "Invalid inspector timeout, expected KEY=SECONDS: 'columns'",
+            ),
+            (
+                ["--inspector-timeout", "=1"],
+                "Invalid inspector timeout, expected KEY=SECONDS: '=1'",
+            ),
+            (
+                ["--inspector-timeout", "columns=x"],
+                "Invalid inspector timeout, expected KEY=SECONDS: 'columns=x'",
+            ),
+            (["--inspector-timeout", "unknown=1"], "Unknown inspector: unknown"),
+            (["--consistent"], "consistent reflection is only supported on PostgreSQL"),
+            (["--alembic-range", "r1"], "Invalid Alembic range, expected BASE:HEAD: 'r1'"),
+            (["--template-pattern", "(orders"], "missing ), unterminated subpattern at position 0"),
+        ],
+    )
+    def test_errors(self, uri_one, args, message, capsys):
+        assert main([uri_one, uri_one, *args]) == EXIT_ERROR
+        assert capsys.readouterr().err == f"sqlalchemy-diff: error: {message}\n"
+
+    def test_missing_snapshot(self, uri_one, tmp_path, capsys):
+        assert main([uri_one, str(tmp_path / "missing.json")]) == EXIT_ERROR
+        assert "No such file or directory" in capsys.readouterr().err
@@ -3,13 +3,16 @@ import logging
 from unittest.mock import patch
 
 import pytest
+from sqlalchemy import inspect
 
-from sqlalchemydiff.comparer import Comparer, CompareResult
+from sqlalchemydiff.comparer import CompareOptions, Comparer, CompareResult
 from sqlalchemydiff.inspection import register
 from sqlalchemydiff.inspection.base import BaseInspector
 from sqlalchemydiff.inspection.exceptions import InspectorNotSupported, UnknownInspector
+from sqlalchemydiff.sampling import SampleResult
+from sqlalchemydiff.snapshot import Snapshot
 from tests.base import BaseTest
-from tests.util import get_engine, prepare_schema_from_models
+from tests.util import get_engine, prepare_schema_from_models, record_bulk_tables
 
 from .models.models_one import Base as BaseOne
 from .models.models_two import Base as BaseTwo
@@ -36,12 +39,34 @@ class TestCompareResult(BaseTest):
         assert compare_result.result == result
         assert compare_result.errors == {}
         assert compare_result.is_match
+        assert not compare_result.has_differences
+
+    def test_compare_result_partial(self):
+        compare_result = CompareResult({"columns": {}}, uncovered={"columns": ["roles"]})
+
+        assert not compare_result.has_differences
+        assert compare_result.is_partial
+        assert not compare_result.is_match
+
+    def test_compare_result_sampled(self):
+        compare_result = CompareResult({"columns": {}}, sample=SampleResult(5, 2, 0, 0.95, 3))
+
+        assert not compare_result.has_differences
+        assert compare_result.is_sampled
+        assert compare_result.is_partial
+        assert not compare_result.is_match
+
+        # A sample of all the tables compares them all
+        compare_result = CompareResult({"columns": {}}, sample=SampleResult(5, 5, 0, 0.95, 0))
+        assert not compare_result.is_sampled
+        assert compare_result.is_match
 
     @pytest.mark.usefixtures("setup_db_one", "setup_db_two")
     def test_compare_not_match(self, db_engine_one, db_engine_two):
         comparer = Comparer(db_engine_one, db_engine_two)
         result = comparer.compare()
         assert not result.is_match
+        assert result.has_differences
 
     @pytest.mark.usefixtures("setup_db_one")
     def test_compare_is_match(self, db_engine_one):
@@ -138,6 +163,67 @@ class TestComparer(BaseTest):
             mock_begin_one.assert_called_once_with()
             mock_begin_two.assert_called_once_with()
 
+    @pytest.mark.usefixtures("setup_db_one", "setup_db_two")
+    def test_compare_with_jobs(self, db_engine_one, db_engine_two, compare_result, compare_errors):
+        comparer = Comparer(db_engine_one, db_engine_two)
+        result = comparer.compare(jobs=4)
+        assert result.result == compare_result
+        assert result.errors == compare_errors
+
+    @pytest.mark.usefixtures("setup_db_one", "setup_db_two")
+    @pytest.mark.parametrize("ignore_inspectors", [None, ["tables"]])
+    def test_compare_one_sided_names_only(
+        self, db_engine_one, db_engine_two, compare_result, ignore_inspectors
+    ):
+        comparer = Comparer(db_engine_one, db_engine_two)
+        result = comparer.compare(
+            ignore_inspectors=ignore_inspectors, one_sided_names_only=True, jobs=2
+        ).result
+
+        tables = compare_result["tables"]
+        one_sided = {table["name"] for table in tables["one_only"] + tables["two_only"]}
+        assert one_sided
+        if ignore_inspectors:
+            assert "tables" not in result
+        else:
+            assert result["tables"] == tables
+
+        for key in ("columns", "primary_keys", "foreign_keys", "indexes", "unique_constraints"):
+            assert result[key] == {
+                table_name: table_result
+                for table_name, table_result in compare_result[key].items()
+                if table_name not in one_sided
+            }
+
+    @pytest.mark.usefixtures("setup_db_one", "setup_db_two")
+    def test_compare_one_sided_names_only_without_tables(self, db_engine_one, db_engine_two):
+        snapshot = Snapshot.take(db_engine_one, ignore_inspectors=["tables"])
+        comparer = Comparer(snapshot, db_engine_two)
+
+        assert comparer.compare(one_sided_names_only=True).result == comparer.compare().result
+
+    def test_compare_with_invalid_jobs(self, db_engine_one, db_engine_two):
+        comparer = Comparer(db_engine_one, db_engine_two)
+
+        with pytest.raises(ValueError, match="jobs must be a positive integer"):
+            comparer.compare(jobs=0)
+        with pytest.raises(ValueError, match="jobs must be a positive integer"):
+            CompareOptions(jobs=0)
+
+    @pytest.mark.usefixtures("setup_db_one", "setup_db_two")
+    def test_compare_with_options(self, db_engine_one, db_engine_two, compare_result):
+        comparer = Comparer(db_engine_one, db_engine_two)
+        options = CompareOptions(include=["employees"], jobs=2)
+
+        result = comparer.compare(options=options)
+        assert set(result.result["columns"]) == {"employees"}
+
+        # The keyword arguments override the options
+        result = comparer.compare(options=options, include=None)
+        assert result.result == compare_result
+        with pytest.raises(TypeError):
+            comparer.compare(options=options, unknown=True)
+
     @pytest.mark.usefixtures("setup_db_one", "setup_db_two")
     def test_dump_result(
         self, db_engine_one, db_engine_two, compare_result, compare_errors, tmp_path
@@ -200,6 +286,130 @@ class TestComparerSqlite(BaseTest):
         assert result.result == compare_result_sqlite
         assert result.errors == compare_errors_sqlite
 
+    @pytest.mark.usefixtures("setup_db_one", "setup_db_two")
+    def test_compare_with_include(self, sqlite_db_engine_one, sqlite_db_engine_two):
+        comparer = Comparer(sqlite_db_engine_one, sqlite_db_engine_two)
+        table_names = set(inspect(sqlite_db_engine_one).get_table_names())
+        table_names |= set(inspect(sqlite_db_engine_two).get_table_names())
+        ignores = sorted(table_names - {"employees", "roles"})
+
+        result = comparer.compare(include=["employees", "role*"])
+        assert set(result.result["indexes"]) == {"employees", "roles"}
+        assert result.result == comparer.compare(ignores=ignores).result
+
+    @pytest.mark.usefixtures("setup_db_one", "setup_db_two")
+    def test_compare_one_sided_names_only(self, sqlite_db_engine_one, sqlite_db_engine_two):
+        comparer = Comparer(sqlite_db_engine_one, sqlite_db_engine_two)
+        tables_one = set(inspect(sqlite_db_engine_one).get_table_names())
+        tables_two = set(inspect(sqlite_db_engine_two).get_table_names())
+        assert tables_one != tables_two
+        queried = record_bulk_tables(sqlite_db_engine_one)
+
+        result = comparer.compare(one_sided_names_only=True)
+
+        assert set(result.result["columns"]) == tables_one & tables_two
+        # The tables found in one database only are not reflected by the bulk queries
+        assert queried
+        assert all(tables == tables_one & tables_two for tables in queried)
+
+
+class TestComparerSchemas(BaseTest):
+    @pytest.fixture
+    def setup_schemas(self, setup_db_one, db_engine_one):
+        with db_engine_one.begin() as conn:
+            conn.exec_driver_sql("CREATE SCHEMA staging")
+            conn.exec_driver_sql("CREATE SCHEMA green")
+        for schema, base in (("staging", BaseTwo), ("green", BaseOne)):
+            base.metadata.create_all(
+                db_engine_one.execution_options(schema_translate_map={None: schema})
+            )
+        yield
+        db_engine_one.dispose()
+
+    @pytest.mark.usefixtures("setup_schemas")
+    def test_compare(self, db_engine_one, compare_result, compare_errors):
+        comparer = Comparer(db_engine_one, db_engine_one, two_schema="staging")
+        result = comparer.compare(jobs=4)
+
+        assert result.result == compare_result
+        assert result.errors == compare_errors
+
+    @pytest.mark.usefixtures("setup_schemas")
+    def test_compare_identical_schemas(self, db_engine_one):
+        comparer = Comparer(db_engine_one, db_engine_one, one_schema="green")
+
+        assert comparer.compare().is_match
+        assert comparer.compare(skip_identical=True).result["columns"] == {}
+
+    @pytest.mark.usefixtures("setup_schemas")
+    def test_compare_skip_identical(self, db_engine_one, compare_errors):
+        comparer = Comparer(db_engine_one, db_engine_one, two_schema="staging")
+        result = comparer.compare(skip_identical=True)
+
+        assert result.errors == compare_errors
+
+
+class TestComparerSqliteFiles:
+    @pytest.fixture
+    def db_one_path(self, tmp_path):
+        path = str(tmp_path / "one.db")
+        prepare_schema_from_models(get_engine(f"sqlite:///{path}"), BaseOne)
+        return path
+
+    @pytest.fixture
+    def db_two_path(self, tmp_path):
+        path = str(tmp_path / "two.db")
+        prepare_schema_from_models(get_engine(f"sqlite:///{path}"), BaseTwo)
+        return path
+
+    @pytest.mark.parametrize("jobs", [1, 4])
+    def test_compare(
+        self, db_one_path, db_two_path, compare_result_sqlite, compare_errors_sqlite, jobs
+    ):
+        comparer = Comparer.from_sqlite_files(db_one_path, db_two_path)
+        result = comparer.compare(jobs=jobs)
+
+        assert comparer.db_one_engine is comparer.db_two_engine
+        assert result.result == compare_result_sqlite
+        assert result.errors == compare_errors_sqlite
+
+    def test_compare_skip_identical(self, db_one_path, compare_errors_sqlite, tmp_path):
+        db_two_path = str(tmp_path / "two.db")
+        engine = get_engine(f"sqlite:///{db_two_path}")
+        prepare_schema_from_models(engine, BaseOne)
+        with engine.begin() as conn:
+            conn.exec_driver_sql("DROP INDEX ix_employees_name")
+
+        comparer = Comparer.from_sqlite_files(db_one_path, db_two_path)
+        result = comparer.compare(skip_identical=True)
+
+        assert sorted(result.result["columns"]) == [
+            "employees",
+            "mobile_numbers",
+            "skills",
+            "tenures",
+        ]
+        assert {key: errors for key, errors in result.errors.items() if errors} == {
+            "indexes": {
+                "employees": {
+                    "one_only": [
+                        {
+                            "column_names": ["name"],
+                            "dialect_options": {},
+                            "name": "ix_employees_name",
+                            "unique": 1,
+                        }
+                    ]
+                }
+            }
+        }
+
+    def test_compare_skip_identical_different_databases(self, db_one_path, db_two_path):
+        comparer = Comparer.from_params(f"sqlite:///{db_one_path}", f"sqlite:///{db_two_path}")
+
+        with pytest.raises(ValueError, match="both sides to be in the same database"):
+            comparer.compare(skip_identical=True)
+
 
 class TestInspectorUnsupported(BaseTest):
     @pytest.fixture
@@ -0,0 +1,159 @@
+import shutil
+from collections import Counter
+
+import pytest
+from sqlalchemy import event
+
+from sqlalchemydiff import connection as connection_module
+from sqlalchemydiff.comparer import Comparer
+from sqlalchemydiff.connection import DBConnectionFactory, EngineGroup, get_replica_lag
+from tests.base import BaseTest
+from tests.models.models_one import Base as BaseOne
+from tests.models.models_two import Base as BaseTwo
+from tests.util import get_engine, prepare_schema_from_models
+
+
+@pytest.fixture
+def db_one_path(tmp_path):
+    path = tmp_path / "one.db"
+    prepare_schema_from_models(get_engine(f"sqlite:///{path}"), BaseOne)
+    return path
+
+
+@pytest.fixture
+def replica_paths(db_one_path, tmp_path):
+    """Copies of the first database, as its replicas."""
+    paths = [tmp_path / "replica_1.db", tmp_path / "replica_2.db"]
+    for path in paths:
+        shutil.copy(db_one_path, path)
+    return paths
+
+
+# A replica that cannot be connected to, since its directory does not exist
+UNREACHABLE = "sqlite:////nonexistent/replica.db"
+
+
+class TestEngineGroup:
+    def test_get_engines(self, db_one_path, replica_paths, caplog):
+        primary = get_engine(f"sqlite:///{db_one_path}")
+        replica = get_engine(f"sqlite:///{replica_paths[0]}")
+        unreachable = get_engine(UNREACHABLE)
+
+        assert EngineGroup(primary, [replica, unreachable]).get_engines() == [replica]
+        assert EngineGroup(primary, [unreachable]).get_engines() == [primary]
+        assert EngineGroup(primary).get_engines() == [primary]
+        assert "unable to open database file" in caplog.text
+
+    @pytest.mark.parametrize("lag, usable", [(0.5, True), (5, False), (None, False)])
+    def test_max_lag(self, db_one_path, replica_paths, monkeypatch, lag, usable):
+        monkeypatch.setattr(connection_module, "get_replica_lag", lambda connection: lag)
+        primary = get_engine(f"sqlite:///{db_one_path}")
+        replica = get_engine(f"sqlite:///{replica_paths[0]}")
+
+        engines = EngineGroup(primary, [replica], max_lag=1).get_engines()
+
+        assert engines == ([replica] if usable else [primary])
+
+    def test_get_replica_lag(self, db_one_path):
+        with get_engine(f"sqlite:///{db_one_path}").connect() as connection:
+            assert get_replica_lag(connection) == 0
+
+    def test_create_engine_group(self, db_one_path, replica_paths):
+        group = DBConnectionFactory.create_engine_group(
+            f"sqlite:///{db_one_path}",
+            [f"sqlite:///{path}" for path in replica_paths],
+            max_lag=1,
+            echo=True,
+        )
+
+        assert group.url == group.primary.url
+        assert [str(replica.url) for replica in group.replicas] == [
+            f"sqlite:///{path}" for path in replica_paths
+        ]
+        assert group.max_lag == 1
+        assert all(engine.echo for engine in [group.primary, *group.replicas])
+
+
+class TestCompareReplicas:
+    @pytest.fixture
+    def db_two_engine(self, tmp_path):
+        engine = get_engine(f"sqlite:///{tmp_path / 'two.db'}")
+        prepare_schema_from_models(engine, BaseTwo)
+        return engine
+
+    def count_statements(self, engines):
+        """Count the statements run on each engine, by URL."""
+        counts = Counter()
+
+        def count(conn, cursor, statement, parameters, context, executemany):
+            counts[str(conn.engine.url)] += 1
+
+        for engine in engines:
+            event.listen(engine, "before_cursor_execute", count)
+        return counts
+
+    def test_compare(self, db_one_path, replica_paths, db_two_engine, tmp_path):
+        primary = get_engine(f"sqlite:///{db_one_path}")
+        replicas = [get_engine(f"sqlite:///{path}") for path in replica_paths]
+        expected = Comparer(primary, db_two_engine).compare(jobs=2)
+        counts = self.count_statements([primary, *replicas])
+
+        result = Comparer(EngineGroup(primary, replicas), db_two_engine).compare(
+            jobs=2, checkpoint=tmp_path / "checkpoint"
+        )
+
+        assert result.result == expected.result
+        assert result.routes == {"one": [f"sqlite:///{path}" for path in replica_paths]}
+        # The inspectors are spread across the replicas, and none runs on the primary
+        assert set(counts) == {f"sqlite:///{path}" for path in replica_paths}
+
+    def test_fallback(self, db_one_path, db_two_engine):
+        primary = get_engine(f"sqlite:///{db_one_path}")
+        expected = Comparer(primary, db_two_engine).compare()
+
+        result = Comparer(EngineGroup(primary, [get_engine(UNREACHABLE)]), db_two_engine).compare()
+
+        assert result.result == expected.result
+        assert result.routes == {"one": [f"sqlite:///{db_one_path}"]}
+
+    def test_same_group(self, db_one_path, replica_paths):
+        group = EngineGroup(
+            get_engine(f"sqlite:///{db_one_path}"),
+            [get_engine(f"sqlite:///{path}") for path in replica_paths],
+        )
+
+        result = Comparer(group, group).compare()
+
+        assert result.is_match
+        assert result.routes["one"] == result.routes["two"]
+
+    def test_from_params(self, db_one_path, replica_paths, db_two_engine):
+        comparer = Comparer.from_params(
+            f"sqlite:///{db_one_path}",
+            str(db_two_engine.url),
+            db_one_replica_uris=[f"sqlite:///{path}" for path in replica_paths],
+            max_replica_lag=1,
+        )
+
+        assert isinstance(comparer.db_one_engine, EngineGroup)
+        assert comparer.db_one_engine.max_lag == 1
+        assert not isinstance(comparer.db_two_engine, EngineGroup)
+
+
+class TestReplicaLag(BaseTest):
+    @pytest.mark.usefixtures("setup_db_one")
+    def test_primary(self, db_engine_one):
+        with db_engine_one.connect() as connection:
+            assert get_replica_lag(connection) == 0
+
+    @pytest.mark.usefixtures("setup_db_one", "setup_db_two")
+    def test_compare_consistent(self, db_uri_one, db_engine_one, db_engine_two, compare_result):
+        replicas = [get_engine(db_uri_one), get_engine(db_uri_one)]
+
+        result = Comparer(EngineGroup(db_engine_one, replicas, max_lag=10), db_engine_two).compare(
+            consistent=True, jobs=4
+        )
+
+        assert result.result == compare_result
+        # A snapshot can only be imported on the server it was exported from
+        assert len(result.routes["one"]) == 1
@@ -0,0 +1,106 @@
+import pytest
+from sqlalchemy import inspect
+
+from sqlalchemydiff import identical
+from sqlalchemydiff.connection import DBConnectionFactory
+from sqlalchemydiff.identical import find_identical_tables
+from tests.base import BaseTest
+from tests.models.models_one import Base as BaseOne
+from tests.util import get_engine
+
+
+SCHEMA = [
+    "CREATE TABLE companies (id INTEGER PRIMARY KEY, name TEXT)",
+    "CREATE TABLE employees (id INTEGER PRIMARY KEY, company_id INTEGER REFERENCES companies)",
+    "CREATE TABLE skills (id INTEGER PRIMARY KEY, employee_id INTEGER REFERENCES EMPLOYEES(id))",
+    "CREATE TABLE roles (id INTEGER PRIMARY KEY, name TEXT)",
+    "CREATE INDEX ix_roles_name ON roles (name)",
+    "CREATE TABLE tags (id INTEGER PRIMARY KEY, name TEXT UNIQUE)",
+]
+
+
+class TestFindIdenticalTables:
+    @pytest.fixture
+    def engine(self, tmp_path):
+        paths = [str(tmp_path / "one.db"), str(tmp_path / "two.db")]
+        for path in paths:
+            with get_engine(f"sqlite:///{path}").begin() as conn:
+                for statement in SCHEMA:
+                    conn.exec_driver_sql(statement)
+
+        engine = get_engine(f"sqlite:///{paths[0]}")
+        DBConnectionFactory.attach_sqlite_database(engine, paths[1], "two")
+        return engine
+
+    def find(self, engine, *statements):
+        with engine.begin() as conn:
+            for statement in statements:
+                conn.exec_driver_sql(statement)
+            return find_identical_tables(conn, None, "two")
+
+    def test_identical(self, engine):
+        assert self.find(engine) == {"companies", "employees", "skills", "roles", "tags"}
+
+    def test_different_table(self, engine):
+        identical = self.find(engine, "ALTER TABLE two.tags ADD COLUMN color TEXT")
+
+        assert identical == {"companies", "employees", "skills", "roles"}
+
+    def test_different_indexes(self, engine):
+        assert "roles" not in self.find(engine, "DROP INDEX two.ix_roles_name")
+        assert "roles" not in self.find(engine, "CREATE INDEX ix_roles_id ON roles (id)")
+
+    def test_referred_table_is_different(self, engine):
+        identical = self.find(engine, "ALTER TABLE companies ADD COLUMN address TEXT")
+
+        assert identical == {"roles", "tags"}
+
+    def test_table_only_in_one(self, engine):
+        assert "extra" not in self.find(engine, "CREATE TABLE extra (id INTEGER)")
+
+    def test_no_finder(self, engine, monkeypatch):
+        monkeypatch.delitem(identical.finders, "sqlite")
+
+        with engine.connect() as conn:
+            assert find_identical_tables(conn, None, "two") == set()
+
+
+class TestFindPostgresqlIdenticalTables(BaseTest):
+    @pytest.fixture
+    def engine(self, setup_db_one, db_engine_one):
+        with db_engine_one.begin() as conn:
+            conn.exec_driver_sql("CREATE SCHEMA green")
+        BaseOne.metadata.create_all(
+            db_engine_one.execution_options(schema_translate_map={None: "green"})
+        )
+        yield db_engine_one
+        db_engine_one.dispose()
+
+    def find(self, engine, *statements):
+        with engine.begin() as conn:
+            for statement in statements:
+                conn.exec_driver_sql(statement)
+            return find_identical_tables(conn, None, "green")
+
+    def test_identical(self, engine):
+        assert self.find(engine) == set(inspect(engine).get_table_names())
+
+    @pytest.mark.parametrize(
+        "statement",
+        [
+            "ALTER TABLE green.roles ADD COLUMN notes TEXT",
+            "ALTER TABLE green.roles ALTER COLUMN name DROP NOT NULL",
+            "ALTER TABLE green.roles ADD CONSTRAINT ck_roles_name CHECK (name <> '')",
+            "CREATE INDEX ix_roles_name ON green.roles (name)",
+            "COMMENT ON COLUMN green.roles.name IS 'name'",
+            "COMMENT ON TABLE green.roles IS 'roles'",
+        ],
+    )
+    def test_different(self, engine, statement):
+        identical = self.find(engine, statement)
+
+        assert "roles" not in identical
+        assert "companies" in identical
+
+    def test_table_only_in_one(self, engine):
+        assert "extra" not in self.find(engine, "CREATE TABLE extra (id INTEGER)")
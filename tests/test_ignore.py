@@ -6,7 +6,11 @@ from sqlalchemydiff.inspection.ignore import (
     EnumIgnoreSpec,
     IgnoreClauses,
     IgnoreSpecFactory,
+    OneSidedTableSpec,
     TableIgnoreSpec,
+    TableIncludeSpec,
+    TemplateTableSpec,
+    UnsampledTableSpec,
 )
 
 
@@ -52,6 +56,40 @@ class TestFilterIgnorers:
             ],
         )
 
+    def test_base_inspector_filter_includes(self, inspector):
+        ignore_specs = [TableIncludeSpec("employees"), TableIncludeSpec("role*")]
+
+        assert inspector._filter_ignorers(ignore_specs) == IgnoreClauses(
+            includes=["employees", "role*"]
+        )
+
+    @pytest.mark.parametrize(
+        "spec",
+        [
+            OneSidedTableSpec("employees"),
+            TemplateTableSpec("employees", "employees_1"),
+            UnsampledTableSpec("employees"),
+        ],
+    )
+    def test_base_inspector_filter_table_level(self, inspector, monkeypatch, spec):
+        ignore_specs = [spec]
+        assert inspector._filter_ignorers(ignore_specs) == IgnoreClauses(tables=["employees"])
+
+        monkeypatch.setattr(inspector, "db_level", True)
+        assert inspector._filter_ignorers(ignore_specs) == IgnoreClauses()
+
+
+def test_is_table_ignored():
+    assert not IgnoreClauses().is_table_ignored("employees")
+    assert IgnoreClauses(tables=["employees"]).is_table_ignored("employees")
+
+    ignore_clauses = IgnoreClauses(tables=["roles_archive"], includes=["employees", "role*"])
+    assert not ignore_clauses.is_table_ignored("employees")
+    assert not ignore_clauses.is_table_ignored("roles")
+    assert ignore_clauses.is_table_ignored("roles_archive")
+    assert ignore_clauses.is_table_ignored("companies")
+    assert ignore_clauses.is_table_ignored("Employees")
+
 
 def test_ignores_validator():
     ignores = [f"table.{key}.name" for key in register.keys()]
@@ -0,0 +1,268 @@
+import json
+
+import pytest
+from sqlalchemy import event, inspect, text
+from sqlalchemy.exc import OperationalError, ProgrammingError
+
+from sqlalchemydiff.inspection import bulk, register
+from sqlalchemydiff.inspection.bulk import BulkInspector, SQLiteBulkInspector, get_bulk_inspector
+from sqlalchemydiff.inspection.contention import Contention, skipping_contention
+from sqlalchemydiff.inspection.exceptions import InspectorNotSupported
+from sqlalchemydiff.inspection.throttle import Throttle
+from tests.base import BaseTest
+from tests.models.models_one import Base as BaseOne
+from tests.util import get_engine, prepare_schema_from_models
+
+
+def count_statements(engine):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    return statements
+
+
+def dump(value):
+    # Partial indexes are reflected with a text clause, which is not comparable
+    return json.dumps(value, default=str, sort_keys=True)
+
+
+class TestBulkInspector(BaseTest):
+    @pytest.mark.usefixtures("setup_db_one")
+    def test_inspect(self, db_engine_one, monkeypatch):
+        bulk_info = {key: cls().inspect(db_engine_one) for key, (_, cls) in register.items()}
+
+        monkeypatch.delitem(bulk.backends, "postgresql")
+        for key, (_, inspector_class) in register.items():
+            assert bulk_info[key] == inspector_class().inspect(db_engine_one)
+
+    @pytest.mark.usefixtures("setup_db_one")
+    def test_statements_do_not_grow_with_tables(self, db_engine_one):
+        statements = count_statements(db_engine_one)
+        table_names = inspect(db_engine_one).get_table_names()
+
+        def reflect(table_names):
+            inspector = get_bulk_inspector(inspect(db_engine_one))
+            statements.clear()
+            for table_name in table_names:
+                inspector.get_columns(table_name)
+                inspector.get_indexes(table_name)
+            return len(statements)
+
+        assert len(table_names) > 3
+        assert reflect(table_names) == reflect(table_names[:1])
+
+    @pytest.mark.usefixtures("setup_db_one")
+    def test_fallbacks(self, db_engine_one):
+        inspector = get_bulk_inspector(inspect(db_engine_one))
+        assert isinstance(inspector, BulkInspector)
+
+        def get_column_names(**kw):
+            return [column["name"] for column in inspector.get_columns("employees", **kw)]
+
+        column_names = get_column_names()
+        assert get_column_names() == column_names
+        assert get_column_names(schema="public") == column_names
+        assert inspector.get_foreign_keys(
+            "employees", postgresql_ignore_search_path=False
+        ) == inspector.inspector.get_foreign_keys("employees")
+        assert inspector.get_table_names() == inspector.inspector.get_table_names()
+
+    @pytest.mark.usefixtures("setup_db_one")
+    def test_filter_names(self, db_engine_one):
+        inspector = get_bulk_inspector(inspect(db_engine_one))
+        inspector.set_filter_names(["employees"])
+
+        assert inspector.get_indexes("employees") == inspector.inspector.get_indexes("employees")
+        assert inspector._prefetched == {"get_indexes:None": {}}
+
+    @pytest.mark.usefixtures("setup_db_one")
+    def test_lock_contention(self, db_engine_one):
+        with (
+            db_engine_one.connect() as connection,
+            connection.begin(),
+            Throttle(lock_timeout=0.1).listen([db_engine_one]),
+            skipping_contention(Contention()),
+        ):
+            connection.exec_driver_sql("LOCK TABLE roles IN ACCESS EXCLUSIVE MODE")
+            inspector = get_bulk_inspector(inspect(db_engine_one))
+
+            # The tables that are not locked are reflected one at a time
+            assert inspector.get_check_constraints("employees") == (
+                inspector.inspector.get_check_constraints("employees")
+            )
+            assert inspector._prefetched == {"get_check_constraints:None": {}}
+            with pytest.raises(OperationalError, match="lock timeout"):
+                inspector.get_check_constraints("roles")
+
+    def test_bulk_error(self, monkeypatch):
+        monkeypatch.setitem(bulk.backends, "sqlite", BulkInspector)
+        inspector = get_bulk_inspector(inspect(get_engine("sqlite://")))
+
+        def get_multi_columns(*args, **kw):
+            raise ProgrammingError("SELECT 1", {}, Exception())
+
+        monkeypatch.setattr(inspector.inspector, "get_multi_columns", get_multi_columns)
+        with skipping_contention(Contention()), pytest.raises(ProgrammingError):
+            inspector.get_columns("employees")
+
+    def test_no_backend(self, monkeypatch):
+        monkeypatch.delitem(bulk.backends, "sqlite")
+        inspector = inspect(get_engine("sqlite://"))
+
+        assert get_bulk_inspector(inspector) is inspector
+
+    def test_not_supported(self, monkeypatch):
+        monkeypatch.setitem(bulk.backends, "sqlite", BulkInspector)
+        inspector = inspect(get_engine("sqlite://"))
+        monkeypatch.delattr(type(inspector), "get_multi_columns")
+
+        assert get_bulk_inspector(inspector) is inspector
+
+
+class TestSQLiteBulkInspector:
+    @pytest.fixture
+    def engine(self):
+        engine = get_engine("sqlite://")
+        prepare_schema_from_models(engine, BaseOne)
+        with engine.begin() as conn:
+            conn.execute(text("CREATE INDEX ix_partial ON employees (name) WHERE age > 18"))
+            conn.execute(text("CREATE VIEW adults AS SELECT name FROM employees WHERE age > 18"))
+            conn.execute(text("CREATE TEMP TABLE scratch (id INTEGER PRIMARY KEY, name TEXT)"))
+            conn.execute(text("CREATE INDEX temp.ix_scratch_name ON scratch (name)"))
+            conn.execute(text("CREATE TEMP TABLE companies (id INTEGER, tag TEXT UNIQUE)"))
+        return engine
+
+    def reflect(self, engine):
+        info = {}
+        for key, (_, inspector_class) in register.items():
+            try:
+                info[key] = inspector_class().inspect(engine)
+            except InspectorNotSupported:
+                pass
+        return info
+
+    def test_inspect(self, engine, monkeypatch):
+        bulk_info = self.reflect(engine)
+
+        monkeypatch.delitem(bulk.backends, "sqlite")
+        assert dump(bulk_info) == dump(self.reflect(engine))
+        assert "columns" in bulk_info
+
+    def test_statements_do_not_grow_with_tables(self, engine):
+        # The predicate of a partial index is looked up on its own
+        with engine.begin() as conn:
+            conn.execute(text("DROP INDEX ix_partial"))
+        statements = count_statements(engine)
+        table_names = inspect(engine).get_table_names()
+
+        def reflect(table_names):
+            inspector = get_bulk_inspector(inspect(engine))
+            statements.clear()
+            for table_name in table_names:
+                inspector.get_columns(table_name)
+                inspector.get_pk_constraint(table_name)
+                inspector.get_foreign_keys(table_name)
+                inspector.get_indexes(table_name)
+                inspector.get_unique_constraints(table_name)
+                inspector.get_check_constraints(table_name)
+            return len(statements)
+
+        assert len(table_names) > 3
+        assert reflect(table_names) == reflect(table_names[:1])
+
+    def test_order(self, engine):
+        with engine.begin() as conn:
+            conn.execute(text("CREATE TABLE parents (a INTEGER, b INTEGER, PRIMARY KEY (b, a))"))
+            conn.execute(
+                text(
+                    "CREATE TABLE children (z INTEGER, y INTEGER, x INTEGER, "
+                    "FOREIGN KEY (y, z) REFERENCES parents (b, a), "
+                    "FOREIGN KEY (x) REFERENCES employees (id))"
+                )
+            )
+            conn.execute(text("CREATE INDEX ix_children ON children (x, z, y)"))
+        statements = count_statements(engine)
+        inspector = get_bulk_inspector(inspect(engine))
+        plain_inspector = inspect(engine)
+
+        for method in ("get_columns", "get_pk_constraint", "get_foreign_keys", "get_indexes"):
+            for table_name in ("children", "parents"):
+                assert dump(getattr(inspector, method)(table_name)) == dump(
+                    getattr(plain_inspector, method)(table_name)
+                )
+        # The rows are ordered as the pragmas return them
+        bulk_statements = [
+            statement for statement in statements if "LEFT JOIN pragma_" in statement
+        ]
+        assert bulk_statements
+        assert all(" ORDER BY m.name, p." in statement for statement in bulk_statements)
+
+    @pytest.mark.parametrize(
+        "name, method",
+        [
+            ("_get_table_pragma", None),
+            ("_get_table_pragma", lambda connection, pragma, table_name, **kw: []),
+            ("_get_table_sql", lambda connection, table_name: None),
+        ],
+    )
+    def test_dialect_not_supported(self, engine, monkeypatch, name, method):
+        inspector = inspect(engine)
+        monkeypatch.setattr(inspector.dialect, name, method)
+
+        # The private methods of the dialect changed: the tables are reflected one at a time
+        assert get_bulk_inspector(inspector) is inspector
+
+    def test_filter_names(self, engine):
+        with engine.connect() as conn:
+            rows = conn.exec_driver_sql(
+                "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'employees'"
+            ).all()
+        inspector = get_bulk_inspector(inspect(engine))
+        inspector.set_filter_names(["employees"])
+
+        assert dump(inspector.get_indexes("employees")) == dump(
+            inspect(engine).get_indexes("employees")
+        )
+        assert {
+            name
+            for rows_by_name in inspector._pragmas[("index_list", None)]
+            for name in rows_by_name
+        } == {"employees"}
+        assert {
+            name
+            for rows_by_name in inspector._pragmas[("index_info", None)]
+            for name in rows_by_name
+        } == {name for (name,) in rows}
+
+    def test_other_objects(self, engine):
+        inspector = get_bulk_inspector(inspect(engine))
+        plain_inspector = inspect(engine)
+        assert isinstance(inspector, SQLiteBulkInspector)
+
+        for table_name in ("scratch", "companies", "adults", "sqlite_master"):
+            assert [column["name"] for column in inspector.get_columns(table_name)] == [
+                column["name"] for column in plain_inspector.get_columns(table_name)
+            ]
+        assert inspector.get_indexes("scratch") == plain_inspector.get_indexes("scratch")
+        assert dump(inspector.get_indexes("employees", schema="main")) == dump(
+            plain_inspector.get_indexes("employees")
+        )
+        assert inspector.get_pk_constraint("sqlite_master") == plain_inspector.get_pk_constraint(
+            "sqlite_master"
+        )
+        assert inspector.get_pk_constraint(
+            "employees", schema="main"
+        ) == plain_inspector.get_pk_constraint("employees")
+        assert inspector.get_table_names() == plain_inspector.get_table_names()
+
+        # Pragmas that are not served in bulk are run by the dialect
+        with engine.connect() as conn:
+            assert (
+                inspector.dialect._get_table_pragma(
+                    conn, "foreign_key_check", "employees", schema="main"
+                )
+                == []
+            )
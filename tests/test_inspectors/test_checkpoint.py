@@ -0,0 +1,276 @@
+import json
+import os
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import inspect
+from sqlalchemy.exc import DBAPIError, OperationalError, ProgrammingError
+
+from sqlalchemydiff.comparer import Comparer
+from sqlalchemydiff.inspection import checkpoint as checkpoint_module
+from sqlalchemydiff.inspection.base import BaseInspector
+from sqlalchemydiff.inspection.checkpoint import (
+    Checkpoint,
+    InspectionCheckpoint,
+    RetryPolicy,
+    call_with_retries,
+    current_checkpoint,
+    is_transient,
+    retrying,
+)
+from sqlalchemydiff.inspection.records import ColumnRecord, FrozenDict, FrozenList, Interner
+from tests.models.models_one import Base as BaseOne
+from tests.models.models_two import Base as BaseTwo
+from tests.util import get_engine, prepare_schema_from_models, record_bulk_tables
+
+
+def make_transient_error(code="40001", attribute="pgcode"):
+    orig = Exception("could not serialize access due to concurrent update")
+    setattr(orig, attribute, code)
+    return OperationalError("SELECT 1", {}, orig)
+
+
+class TestInspectionCheckpoint:
+    def test_tables(self, tmp_path):
+        inspection = InspectionCheckpoint(tmp_path / "inspection.json")
+        assert not inspection.completed
+        inspection.put_table("employees", [{"name": "id"}])
+        inspection.put_table("roles", [{"name": "name"}])
+        inspection.close()
+
+        inspection = InspectionCheckpoint(tmp_path / "inspection.json")
+        assert not inspection.completed
+        assert inspection.tables == {"employees": [{"name": "id"}], "roles": [{"name": "name"}]}
+
+    def test_truncated_tables(self, tmp_path):
+        inspection = InspectionCheckpoint(tmp_path / "inspection.json")
+        inspection.put_table("employees", [{"name": "id"}])
+        inspection.put_table("roles", [{"name": "name"}])
+        inspection.close()
+        size = os.path.getsize(inspection.tables_path)
+        os.truncate(inspection.tables_path, size - 3)
+
+        inspection = InspectionCheckpoint(tmp_path / "inspection.json")
+        assert inspection.tables == {"employees": [{"name": "id"}]}
+
+        # The incomplete table is overwritten
+        inspection.put_table("skills", [])
+        inspection.close()
+        inspection = InspectionCheckpoint(tmp_path / "inspection.json")
+        assert inspection.tables == {"employees": [{"name": "id"}], "skills": []}
+
+    def test_complete(self, tmp_path):
+        inspection = InspectionCheckpoint(tmp_path / "inspection.json")
+        inspection.put_table("employees", [{"name": "id"}])
+        inspection.complete({"employees": [{"name": "id"}]})
+
+        assert not inspection.tables_path.exists()
+        inspection = InspectionCheckpoint(tmp_path / "inspection.json")
+        assert inspection.completed
+        assert inspection.info == {"employees": [{"name": "id"}]}
+
+    def test_types(self, tmp_path):
+        info = {
+            "employees": [
+                ColumnRecord({"name": "id", "type": "INTEGER", "dialect_options": {"a": [1]}}),
+                ColumnRecord({"name": "name", "computed": {"sqltext": "x"}}, Interner()),
+            ],
+            "roles": {
+                "tuple": ("a", ("b",)),
+                "frozen": [FrozenList(["c"]), FrozenDict.from_dict({"d": (1,)})],
+                "keys": {1: "one", ("a", "b"): "two"},
+                "__type__": "tuple",
+                "other": Decimal("1.5"),
+            },
+        }
+        inspection = InspectionCheckpoint(tmp_path / "inspection.json")
+        inspection.put_table("employees", info["employees"])
+        inspection.complete(info)
+
+        # The results are saved as JSON, and loaded back with their types, except for the values
+        # of other types, which are loaded as strings
+        assert isinstance(json.loads(inspection.path.read_text()), dict)
+        loaded = InspectionCheckpoint(tmp_path / "inspection.json").info
+        assert loaded == {
+            "employees": info["employees"],
+            "roles": {**info["roles"], "other": "1.5"},
+        }
+        assert [type(column) for column in loaded["employees"]] == [ColumnRecord, ColumnRecord]
+        roles = loaded["roles"]
+        assert type(roles["tuple"][1]) is tuple
+        assert [type(value) for value in roles["frozen"]] == [FrozenList, FrozenDict]
+        assert type(dict(roles["frozen"][1])["d"]) is tuple
+        assert list(roles["keys"]) == [1, ("a", "b")]
+
+
+class TestCheckpoint:
+    def test_resume(self, tmp_path):
+        checkpoint = Checkpoint(tmp_path / "checkpoint")
+
+        with checkpoint.resume(("one", "columns")) as inspection:
+            assert current_checkpoint.get() is inspection
+            inspection.put_table("employees", [])
+        assert current_checkpoint.get() is None
+
+        with checkpoint.resume(("one", "columns")) as inspection:
+            assert inspection.tables == {"employees": []}
+            inspection.complete({"employees": []})
+        with checkpoint.resume(("two", "columns")) as inspection:
+            assert inspection.tables == {}
+            inspection.put_table("employees", [])
+
+        assert len(os.listdir(checkpoint.directory)) == 2
+        checkpoint.clear()
+        assert os.listdir(checkpoint.directory) == []
+
+
+class TestRetries:
+    @pytest.fixture
+    def sleeps(self, monkeypatch):
+        sleeps = []
+        monkeypatch.setattr(checkpoint_module.time, "sleep", sleeps.append)
+        return sleeps
+
+    def make_failing(self, *errors):
+        errors = list(errors)
+
+        def function(value):
+            if errors:
+                raise errors.pop(0)
+            return value
+
+        return function
+
+    def test_is_transient(self):
+        assert is_transient(make_transient_error())
+        assert is_transient(make_transient_error("40P01", "sqlstate"))
+        assert is_transient(make_transient_error("08006"))
+        assert is_transient(make_transient_error("57014"))
+        assert is_transient(DBAPIError("SELECT 1", {}, Exception(), connection_invalidated=True))
+        assert not is_transient(OperationalError("SELECT 1", {}, Exception()))
+        assert not is_transient(make_transient_error("55P03"))
+        assert not is_transient(ProgrammingError("SELECT 1", {}, Exception()))
+        assert not is_transient(ValueError())
+
+    def test_retries(self, sleeps):
+        error = make_transient_error()
+        function = self.make_failing(error, error, error)
+
+        with retrying(RetryPolicy(retries=3, backoff=1, max_backoff=3)):
+            assert call_with_retries(function, "value") == "value"
+        assert sleeps == [1, 2, 3]
+
+    def test_retries_exhausted(self, sleeps):
+        error = make_transient_error()
+
+        with retrying(RetryPolicy(retries=1)), pytest.raises(OperationalError):
+            call_with_retries(self.make_failing(error, error), "value")
+        assert sleeps == [0.5]
+
+    def test_not_transient(self, sleeps):
+        error = ProgrammingError("SELECT 1", {}, Exception())
+
+        with retrying(RetryPolicy(retries=3)), pytest.raises(ProgrammingError):
+            call_with_retries(self.make_failing(error), "value")
+        with pytest.raises(OperationalError):
+            call_with_retries(self.make_failing(OperationalError("", {}, Exception())), "value")
+        assert sleeps == []
+
+
+class TestCompareCheckpoint:
+    @pytest.fixture
+    def comparer(self, tmp_path):
+        engines = []
+        for name, base in (("one", BaseOne), ("two", BaseTwo)):
+            engine = get_engine(f"sqlite:///{tmp_path / name}.db")
+            prepare_schema_from_models(engine, base)
+            engines.append(engine)
+        return Comparer(*engines)
+
+    @pytest.fixture
+    def reflected(self, monkeypatch):
+        """Record the tables reflected by the columns inspector, failing on `fail_on` ones."""
+        reflected = SimpleNamespace(tables=[], fail_on={})
+        inspect_tables = BaseInspector._inspect_tables
+
+        def _inspect_tables(inspector, sqlalchemy_inspector, ignore_clauses, inspect_table):
+            def wrapper(table_name):
+                if inspector.key == "columns":
+                    reflected.tables.append(table_name)
+                    if reflected.fail_on.get(table_name):
+                        raise reflected.fail_on[table_name].pop(0)
+                return inspect_table(table_name)
+
+            return inspect_tables(inspector, sqlalchemy_inspector, ignore_clauses, wrapper)
+
+        monkeypatch.setattr(BaseInspector, "_inspect_tables", _inspect_tables)
+        return reflected
+
+    def test_resume(self, comparer, reflected, tmp_path):
+        expected = comparer.compare().result
+        all_tables = list(reflected.tables)
+        reflected.tables.clear()
+        checkpoint = tmp_path / "checkpoint"
+
+        reflected.fail_on["roles"] = [ProgrammingError("SELECT 1", {}, Exception())]
+        with pytest.raises(ProgrammingError):
+            comparer.compare(checkpoint=checkpoint)
+        first_run = list(reflected.tables)
+        assert first_run[-1] == "roles"
+        assert os.listdir(checkpoint)
+
+        reflected.tables.clear()
+        queried = record_bulk_tables(comparer.db_one_engine)
+        assert comparer.compare(checkpoint=checkpoint).result == expected
+        # The tables reflected before the failure are not reflected again, nor queried in bulk
+        assert reflected.tables == all_tables[len(first_run) - 1 :]
+        saved = set(first_run[:-1])
+        assert set(inspect(comparer.db_one_engine).get_table_names()) - saved in queried
+        assert not any(tables is not None and tables & saved for tables in queried)
+        assert os.listdir(checkpoint) == []
+
+    @pytest.mark.parametrize(
+        "options, other_options",
+        [
+            ({"reflection": "per_table"}, {"reflection": "bulk"}),
+            ({}, {"partitions": True}),
+        ],
+    )
+    def test_resume_other_options(self, comparer, reflected, tmp_path, options, other_options):
+        comparer.compare(**other_options)
+        all_tables = list(reflected.tables)
+        reflected.tables.clear()
+        checkpoint = tmp_path / "checkpoint"
+
+        reflected.fail_on["roles"] = [ProgrammingError("SELECT 1", {}, Exception())]
+        with pytest.raises(ProgrammingError):
+            comparer.compare(checkpoint=checkpoint, **options)
+
+        reflected.tables.clear()
+        comparer.compare(checkpoint=checkpoint, **other_options)
+        # The inspection is not resumed from a comparison with other options
+        assert reflected.tables == all_tables
+
+    def test_resume_compact(self, comparer, reflected, tmp_path):
+        expected = comparer.compare(compact=True).result
+        checkpoint = tmp_path / "checkpoint"
+
+        reflected.fail_on["roles"] = [ProgrammingError("SELECT 1", {}, Exception())]
+        with pytest.raises(ProgrammingError):
+            comparer.compare(checkpoint=checkpoint, compact=True)
+
+        assert comparer.compare(checkpoint=checkpoint, compact=True).result == expected
+
+    def test_retries(self, comparer, reflected, monkeypatch):
+        monkeypatch.setattr(checkpoint_module.time, "sleep", lambda seconds: None)
+        expected = comparer.compare().result
+        reflected.tables.clear()
+
+        reflected.fail_on["roles"] = [make_transient_error()] * 2
+        assert comparer.compare(retries=2, jobs=2).result == expected
+        assert reflected.tables.count("roles") == 4
+
+    def test_invalid_retries(self, comparer):
+        with pytest.raises(ValueError, match="retries must not be negative"):
+            comparer.compare(retries=-1)
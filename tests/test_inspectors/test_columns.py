@@ -1,4 +1,7 @@
+from unittest.mock import patch
+
 import pytest
+from sqlalchemy.types import VARCHAR, TypeEngine
 
 from sqlalchemydiff.inspection import ColumnsInspector
 from sqlalchemydiff.inspection.ignore import TableIgnoreSpec
@@ -49,6 +52,35 @@ class TestColumnsInspector(BaseTest):
         result = inspector.inspect(db_engine_one)
         assert_dicts_equal(result, columns_one)
 
+    @pytest.mark.usefixtures("setup_db_one")
+    def test_inspector_compiles_types_once(self, db_engine_one, inspector, columns_one):
+        with patch.object(
+            TypeEngine, "compile", autospec=True, side_effect=TypeEngine.compile
+        ) as compile_mock:
+            result_one = inspector.inspect(db_engine_one)
+            compile_count = compile_mock.call_count
+            result_two = inspector.inspect(db_engine_one)
+            # The compiled types are not shared with other inspectors
+            result_three = ColumnsInspector().inspect(db_engine_one)
+
+        assert compile_count == len(inspector._compiled_types)
+        assert compile_mock.call_count == 2 * compile_count
+        assert_dicts_equal(result_one, columns_one)
+        assert_dicts_equal(result_two, columns_one)
+        assert_dicts_equal(result_three, columns_one)
+
+    def test_compile_type_not_hashable(self, db_engine_one, inspector):
+        type_ = VARCHAR(10)
+        type_.unhashable = {"VARCHAR"}
+
+        with patch.object(
+            TypeEngine, "compile", autospec=True, side_effect=TypeEngine.compile
+        ) as compile_mock:
+            assert inspector._compile_type(type_, db_engine_one.dialect) == "VARCHAR(10)"
+            assert inspector._compile_type(type_, db_engine_one.dialect) == "VARCHAR(10)"
+
+        assert compile_mock.call_count == 2
+
     @pytest.mark.usefixtures("setup_db_one")
     def test_inspector_with_ignores(self, db_engine_one, inspector, columns_one_with_ignores):
         ignore_specs = [
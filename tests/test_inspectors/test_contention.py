@@ -0,0 +1,187 @@
+import os
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import inspect
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import DBAPIError, OperationalError, ProgrammingError
+
+from sqlalchemydiff.comparer import Comparer
+from sqlalchemydiff.inspection import checkpoint as checkpoint_module
+from sqlalchemydiff.inspection.base import BaseInspector
+from sqlalchemydiff.inspection.contention import is_lock_contention, savepoint
+from sqlalchemydiff.inspection.throttle import Throttle
+from tests.base import BaseTest
+from tests.models.models_one import Base as BaseOne
+from tests.models.models_two import Base as BaseTwo
+from tests.util import get_engine, prepare_schema_from_models
+
+
+def make_lock_error(attribute="pgcode"):
+    orig = Exception("canceling statement due to lock timeout")
+    setattr(orig, attribute, "55P03")
+    return OperationalError("SELECT 1", {}, orig)
+
+
+def test_is_lock_contention():
+    assert is_lock_contention(make_lock_error())
+    assert is_lock_contention(make_lock_error("sqlstate"))
+    assert not is_lock_contention(OperationalError("SELECT 1", {}, Exception()))
+    assert not is_lock_contention(DBAPIError("SELECT 1", {}, Exception()))
+
+
+def test_savepoint(tmp_path):
+    engine = get_engine(f"sqlite:///{tmp_path / 'one.db'}")
+
+    with savepoint(inspect(engine)):
+        pass
+    with engine.connect() as connection:
+        with savepoint(inspect(connection)):
+            assert not connection.in_nested_transaction()
+        with connection.begin(), savepoint(inspect(connection)):
+            assert connection.in_nested_transaction()
+
+
+@pytest.fixture
+def reflected(monkeypatch):
+    """Record the tables reflected by the columns inspector, failing on `fail_on` ones."""
+    reflected = SimpleNamespace(tables=[], fail_on={})
+    inspect_tables = BaseInspector._inspect_tables
+
+    def _inspect_tables(inspector, sqlalchemy_inspector, ignore_clauses, inspect_table):
+        def wrapper(table_name):
+            if inspector.key == "columns":
+                reflected.tables.append(table_name)
+                if reflected.fail_on.get(table_name):
+                    fail = reflected.fail_on[table_name].pop(0)
+                    fail(sqlalchemy_inspector)
+            return inspect_table(table_name)
+
+        return inspect_tables(inspector, sqlalchemy_inspector, ignore_clauses, wrapper)
+
+    monkeypatch.setattr(BaseInspector, "_inspect_tables", _inspect_tables)
+    return reflected
+
+
+def raise_error(error):
+    def fail(sqlalchemy_inspector):
+        raise error
+
+    return fail
+
+
+class TestCompareContention:
+    @pytest.fixture
+    def comparer(self, tmp_path):
+        engines = []
+        for name, base in (("one", BaseOne), ("two", BaseTwo)):
+            engine = get_engine(f"sqlite:///{tmp_path / name}.db")
+            prepare_schema_from_models(engine, base)
+            engines.append(engine)
+        return Comparer(*engines)
+
+    @pytest.fixture
+    def expected(self, comparer, reflected):
+        expected = comparer.compare().result
+        reflected.tables.clear()
+        return expected
+
+    def test_locked_once(self, comparer, reflected, expected):
+        reflected.fail_on["roles"] = [raise_error(make_lock_error())]
+
+        result = comparer.compare(throttle=Throttle(lock_timeout=0.1))
+
+        assert result.result == expected
+        assert list(result.result["columns"]) == list(expected["columns"])
+        assert result.unavailable == {}
+        # The locked table is reflected again after the other tables of the first database
+        assert reflected.tables[:7] == [
+            "companies",
+            "employees",
+            "mobile_numbers",
+            "roles",
+            "skills",
+            "tenures",
+            "roles",
+        ]
+
+    def test_unavailable(self, comparer, reflected, expected, monkeypatch):
+        monkeypatch.setattr(checkpoint_module.time, "sleep", lambda seconds: None)
+        reflected.fail_on["roles"] = [raise_error(make_lock_error())] * 2
+
+        result = comparer.compare(throttle=Throttle(lock_timeout=0.1), retries=3)
+
+        assert result.unavailable == {"columns": ["roles"]}
+        assert result.is_partial
+        assert result.uncovered == {}
+        assert result.result["columns"] == {
+            table_name: item
+            for table_name, item in expected["columns"].items()
+            if table_name != "roles"
+        }
+        assert result.result["indexes"] == expected["indexes"]
+        # Lock contention is not retried: the table is reflected twice in the first database
+        assert reflected.tables.count("roles") == 3
+
+    def test_without_lock_timeout(self, comparer, reflected, expected):
+        reflected.fail_on["roles"] = [raise_error(make_lock_error())]
+
+        with pytest.raises(OperationalError):
+            comparer.compare()
+
+    def test_other_errors(self, comparer, reflected, expected):
+        reflected.fail_on["roles"] = [raise_error(ProgrammingError("SELECT 1", {}, Exception()))]
+
+        with pytest.raises(ProgrammingError):
+            comparer.compare(throttle=Throttle(lock_timeout=0.1))
+
+    def test_resume(self, comparer, reflected, expected, tmp_path):
+        checkpoint = tmp_path / "checkpoint"
+        reflected.fail_on["roles"] = [raise_error(make_lock_error())] * 2
+
+        result = comparer.compare(checkpoint=checkpoint, throttle=Throttle(lock_timeout=0.1))
+        assert result.unavailable == {"columns": ["roles"]}
+        assert os.listdir(checkpoint)
+
+        reflected.tables.clear()
+        assert comparer.compare(checkpoint=checkpoint).result == expected
+        assert reflected.tables == ["roles"]
+
+
+class TestLockTimeout(BaseTest):
+    @pytest.fixture
+    def lock(self, db_engine_one):
+        """Hold an exclusive lock on the roles table of the first database."""
+        with db_engine_one.connect() as connection, connection.begin():
+            connection.exec_driver_sql("LOCK TABLE roles IN ACCESS EXCLUSIVE MODE")
+            yield
+
+    def query_roles(self, sqlalchemy_inspector):
+        """Query the roles table, through the connection of the inspector if it has one."""
+        bind = sqlalchemy_inspector.bind
+        if isinstance(bind, Connection):
+            bind.exec_driver_sql("SELECT count(*) FROM roles")
+        else:
+            with bind.begin() as connection:
+                connection.exec_driver_sql("SELECT count(*) FROM roles")
+
+    @pytest.mark.usefixtures("setup_db_one", "setup_db_two")
+    @pytest.mark.parametrize("consistent", [False, True])
+    def test_unavailable(
+        self, db_engine_one, db_engine_two, compare_result, reflected, consistent, request
+    ):
+        comparer = Comparer(db_engine_one, db_engine_two)
+        reflected.fail_on["roles"] = [self.query_roles] * 2
+        request.getfixturevalue("lock")
+
+        result = comparer.compare(consistent=consistent, throttle=Throttle(lock_timeout=0.1))
+
+        # The check constraints are reflected with pg_get_constraintdef, which waits for the lock
+        assert result.unavailable == {"columns": ["roles"], "check_constraints": ["roles"]}
+        for key in result.unavailable:
+            assert result.result[key] == {
+                table_name: item
+                for table_name, item in compare_result[key].items()
+                if table_name != "roles"
+            }
+        assert result.result["indexes"] == compare_result["indexes"]
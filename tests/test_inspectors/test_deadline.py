@@ -0,0 +1,274 @@
+import os
+import time
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.exc import OperationalError, ProgrammingError
+
+from sqlalchemydiff.comparer import Comparer
+from sqlalchemydiff.inspection import checkpoint as checkpoint_module
+from sqlalchemydiff.inspection.base import BaseInspector
+from sqlalchemydiff.inspection.checkpoint import RetryPolicy, call_with_retries, retrying
+from sqlalchemydiff.inspection.deadline import Budget, Deadline, current_deadline, within
+from sqlalchemydiff.inspection.exceptions import UnknownInspector
+from sqlalchemydiff.inspection.inspectors import EnumsInspector
+from tests.base import BaseTest
+from tests.models.models_one import Base as BaseOne
+from tests.models.models_two import Base as BaseTwo
+from tests.test_inspectors.test_checkpoint import make_transient_error
+from tests.util import get_engine, prepare_schema_from_models
+
+
+class TestDeadline:
+    def test_deadline(self):
+        deadline = Deadline(time.monotonic() + 60)
+        assert not deadline.expired
+        assert 0 < deadline.remaining <= 60
+
+        deadline = Deadline(time.monotonic() - 1)
+        assert deadline.expired
+        assert deadline.remaining == 0
+
+    def test_within(self):
+        deadline = Deadline(0)
+        with within(deadline):
+            assert current_deadline.get() is deadline
+        assert current_deadline.get() is None
+
+
+class TestBudget:
+    def test_start(self):
+        assert Budget().start("columns", "one") is None
+
+        budget = Budget(60, {"columns": 1})
+        overall = budget.start("indexes", "one")
+        columns = budget.start("columns", "one")
+        assert columns.expires_at < overall.expires_at
+        assert Budget(1, {"columns": 60}).start("columns", "one").expires_at < overall.expires_at
+        assert budget.deadlines == {("indexes", "one"): overall, ("columns", "one"): columns}
+
+    def test_get_uncovered(self):
+        budget = Budget(60)
+        one, two = budget.start("columns", "one"), budget.start("columns", "two")
+        assert budget.get_uncovered("columns", ("one", "two")) == []
+        assert budget.get_uncovered("indexes", ("one", "two")) == []
+
+        one.uncovered_tables.extend(["skills", "roles"])
+        two.uncovered_tables.extend(["roles"])
+        assert budget.get_uncovered("columns", ("one", "two")) == ["roles", "skills"]
+
+        two.skipped = True
+        assert budget.get_uncovered("columns", ("one", "two")) is None
+
+    def test_no_retries_past_deadline(self, monkeypatch):
+        sleeps = []
+        monkeypatch.setattr(checkpoint_module.time, "sleep", sleeps.append)
+
+        def function():
+            raise make_transient_error()
+
+        with retrying(RetryPolicy(retries=3)), within(Deadline(0)):
+            with pytest.raises(OperationalError):
+                call_with_retries(function)
+        assert sleeps == []
+
+    def test_backoff_within_deadline(self, monkeypatch):
+        deadline = Deadline(time.monotonic() + 5)
+        sleeps, calls = [], []
+
+        def sleep(seconds):
+            sleeps.append(seconds)
+            # The deadline passes while waiting
+            deadline.expires_at = 0
+
+        def function():
+            calls.append(None)
+            raise make_transient_error()
+
+        monkeypatch.setattr(checkpoint_module.time, "sleep", sleep)
+
+        with retrying(RetryPolicy(retries=3, backoff=30)), within(deadline):
+            with pytest.raises(OperationalError):
+                call_with_retries(function)
+        # The wait is cut short at the deadline, and there is no retry past it
+        assert len(sleeps) == 1 and 4 < sleeps[0] <= 5
+        assert len(calls) == 1
+
+
+@pytest.fixture
+def reflected(monkeypatch):
+    """Run `on_table` before the inspector with the `key` reflects each table."""
+    reflected = SimpleNamespace(on_table=lambda table_name: None, key="columns")
+    inspect_tables = BaseInspector._inspect_tables
+
+    def _inspect_tables(inspector, sqlalchemy_inspector, ignore_clauses, inspect_table):
+        def wrapper(table_name):
+            if inspector.key == reflected.key:
+                reflected.on_table(table_name)
+            return inspect_table(table_name)
+
+        return inspect_tables(inspector, sqlalchemy_inspector, ignore_clauses, wrapper)
+
+    monkeypatch.setattr(BaseInspector, "_inspect_tables", _inspect_tables)
+    return reflected
+
+
+def expire(table_name):
+    """Expire the current deadline once `table_name` is reflected."""
+
+    def on_table(name):
+        if name == table_name:
+            current_deadline.get().expires_at = 0
+
+    return on_table
+
+
+class TestCompareDeadline:
+    @pytest.fixture
+    def comparer(self, tmp_path):
+        engines = []
+        for name, base in (("one", BaseOne), ("two", BaseTwo)):
+            engine = get_engine(f"sqlite:///{tmp_path / name}.db")
+            prepare_schema_from_models(engine, base)
+            engines.append(engine)
+        return Comparer(*engines)
+
+    def test_compare_within_timeout(self, comparer):
+        expected = comparer.compare()
+
+        result = comparer.compare(timeout=60, inspector_timeouts={"columns": 60})
+
+        assert result.result == expected.result
+        assert result.uncovered == {}
+        assert not result.is_partial
+
+    def test_timeout_expired(self, comparer):
+        result = comparer.compare(timeout=0)
+
+        assert result.result == {}
+        assert result.is_partial
+        # The inspections are skipped before knowing if the databases support them
+        assert set(result.uncovered) == set(comparer.compare().result) | {"enums"}
+        assert all(tables is None for tables in result.uncovered.values())
+
+    def test_inspector_timeout_expired(self, comparer, reflected):
+        expected = comparer.compare().result
+        reflected.on_table = expire("roles")
+
+        result = comparer.compare(inspector_timeouts={"columns": 60})
+
+        uncovered = result.uncovered["columns"]
+        assert list(result.uncovered) == ["columns"]
+        assert "roles" not in uncovered
+        assert sorted(set(result.result["columns"]) | set(uncovered)) == sorted(expected["columns"])
+        for table_name, item in result.result["columns"].items():
+            assert item == expected["columns"][table_name]
+        assert {key: item for key, item in result.result.items() if key != "columns"} == {
+            key: item for key, item in expected.items() if key != "columns"
+        }
+
+    def test_tables_timeout_expired(self, comparer, reflected):
+        expected = comparer.compare().result
+        reflected.key = "tables"
+        reflected.on_table = expire("roles")
+
+        result = comparer.compare(inspector_timeouts={"tables": 60})
+
+        # The tables inspector also stops at the deadline, and only the tables it compared are left
+        uncovered = result.uncovered["tables"]
+        assert list(result.uncovered) == ["tables"]
+        assert uncovered and "roles" not in uncovered
+        compared = {
+            table["name"]
+            for kind in ("one_only", "two_only", "common", "diff")
+            for table in result.result["tables"].get(kind, [])
+        }
+        assert compared and not compared & set(uncovered)
+        assert result.result["columns"] == expected["columns"]
+
+    def test_resume_partial(self, comparer, reflected, tmp_path):
+        expected = comparer.compare().result
+        checkpoint = tmp_path / "checkpoint"
+        reflected.on_table = expire("roles")
+
+        result = comparer.compare(checkpoint=checkpoint, inspector_timeouts={"columns": 60})
+        assert result.is_partial
+        # The partial inspections are kept in the checkpoint
+        assert any(name.endswith(".tables") for name in os.listdir(checkpoint))
+
+        reflected.on_table = lambda table_name: None
+        result = comparer.compare(checkpoint=checkpoint)
+        assert result.result == expected
+        assert os.listdir(checkpoint) == []
+
+    def test_error_before_deadline(self, comparer, reflected):
+        def on_table(table_name):
+            raise ProgrammingError("SELECT 1", {}, Exception())
+
+        reflected.on_table = on_table
+
+        with pytest.raises(ProgrammingError):
+            comparer.compare(timeout=60)
+
+    def test_unknown_inspector(self, comparer):
+        with pytest.raises(UnknownInspector, match="Unknown inspector: unknown"):
+            comparer.compare(inspector_timeouts={"unknown": 1})
+
+
+class TestStatementTimeout(BaseTest):
+    @pytest.mark.usefixtures("setup_db_one")
+    def test_statement_timeout(self, db_engine_one):
+        budget = Budget(60)
+
+        with budget.listen([db_engine_one]), db_engine_one.begin() as conn:
+            assert conn.exec_driver_sql("SHOW statement_timeout").scalar() == "0"
+
+        with (
+            budget.listen([db_engine_one, db_engine_one]),
+            within(Deadline(time.monotonic() + 0.2)),
+        ):
+            with db_engine_one.begin() as conn:
+                assert conn.exec_driver_sql("SHOW statement_timeout").scalar() != "0"
+            with pytest.raises(OperationalError, match="statement timeout"):
+                with db_engine_one.begin() as conn:
+                    conn.exec_driver_sql("SELECT pg_sleep(5)")
+
+        with db_engine_one.begin() as conn:
+            assert conn.exec_driver_sql("SHOW statement_timeout").scalar() == "0"
+
+    @pytest.mark.usefixtures("setup_db_one", "setup_db_two")
+    @pytest.mark.parametrize("consistent", [False, True])
+    def test_cancelled_table(self, db_engine_one, db_engine_two, reflected, consistent):
+        comparer = Comparer(db_engine_one, db_engine_two)
+        expected = comparer.compare().result
+
+        def on_table(table_name):
+            if table_name == "roles":
+                with db_engine_one.begin() as conn:
+                    conn.exec_driver_sql("SELECT pg_sleep(5)")
+
+        reflected.on_table = on_table
+
+        result = comparer.compare(consistent=consistent, inspector_timeouts={"columns": 0.5})
+
+        assert "roles" in result.uncovered["columns"]
+        assert "roles" not in result.result["columns"]
+        assert result.result["tables"] == expected["tables"]
+
+    @pytest.mark.usefixtures("setup_db_one", "setup_db_two")
+    def test_cancelled_inspection(self, db_engine_one, db_engine_two, monkeypatch):
+        inspect = EnumsInspector.inspect
+
+        def slow_inspect(inspector, engine, ignore_specs=None):
+            with db_engine_one.begin() as conn:
+                conn.exec_driver_sql("SELECT pg_sleep(5)")
+            return inspect(inspector, engine, ignore_specs)
+
+        monkeypatch.setattr(EnumsInspector, "inspect", slow_inspect)
+        comparer = Comparer(db_engine_one, db_engine_two)
+
+        result = comparer.compare(inspector_timeouts={"enums": 0.5})
+
+        assert result.uncovered == {"enums": None}
+        assert "enums" not in result.result
+        assert "columns" in result.result
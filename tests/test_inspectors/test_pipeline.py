@@ -0,0 +1,154 @@
+import pytest
+from psycopg import _pipeline_base
+from sqlalchemy import event, inspect, text
+from sqlalchemy.engine import make_url
+
+from sqlalchemydiff.inspection.inspectors import ColumnsInspector
+from sqlalchemydiff.inspection.pipeline import get_pipeline_connection, query_tables
+from sqlalchemydiff.inspection.schema import reflect_schema
+from tests.base import BaseTest
+from tests.util import get_engine
+
+
+COLUMN_NAMES = text(
+    "SELECT column_name FROM information_schema.columns "
+    "WHERE table_schema = :schema AND table_name = :table_name ORDER BY ordinal_position"
+)
+
+
+class TestQueryTables(BaseTest):
+    @pytest.fixture
+    def psycopg_engine(self, db_uri_one):
+        """An engine of the first database, with psycopg 3, which has a pipeline mode."""
+        return get_engine(make_url(db_uri_one).set(drivername="postgresql+psycopg"))
+
+    @pytest.fixture
+    def syncs(self, monkeypatch):
+        """Record the syncs of the pipelines, after each of which the results are waited for."""
+        syncs = []
+        enqueue_sync = _pipeline_base.BasePipeline._enqueue_sync
+
+        def _enqueue_sync(pipeline):
+            syncs.append(pipeline)
+            return enqueue_sync(pipeline)
+
+        monkeypatch.setattr(_pipeline_base.BasePipeline, "_enqueue_sync", _enqueue_sync)
+        return syncs
+
+    def record_cursors(self, conn):
+        """Record the cursor of each statement run on `conn`, as seen by its listeners."""
+        cursors = []
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            assert statement == statements.pop(0)
+            cursors.append(cursor)
+
+        event.listen(conn, "before_cursor_execute", before_cursor_execute)
+        event.listen(conn, "after_cursor_execute", after_cursor_execute)
+        return cursors
+
+    def get_expected(self, engine, table_names):
+        inspector = inspect(engine)
+        return {
+            table_name: [(column["name"],) for column in inspector.get_columns(table_name)]
+            for table_name in table_names
+        }
+
+    @pytest.mark.usefixtures("setup_db_one")
+    def test_query_tables(self, db_engine_one):
+        table_names = inspect(db_engine_one).get_table_names()
+
+        with db_engine_one.connect() as conn:
+            cursors = self.record_cursors(conn)
+            assert get_pipeline_connection(conn) is None
+            result = query_tables(conn, COLUMN_NAMES, table_names, {"schema": "public"})
+
+        assert result == self.get_expected(db_engine_one, table_names)
+        assert len(cursors) == len(table_names)
+
+    @pytest.mark.usefixtures("setup_db_one")
+    def test_pipeline(self, psycopg_engine, syncs):
+        table_names = inspect(psycopg_engine).get_table_names()
+        expected = self.get_expected(psycopg_engine, table_names)
+
+        with psycopg_engine.connect() as conn:
+            assert get_pipeline_connection(conn) is not None
+            result = query_tables(conn, COLUMN_NAMES, table_names[:1], {"schema": "public"})
+        assert result == {table_names[0]: expected[table_names[0]]}
+        one_table_syncs = len(syncs)
+        syncs.clear()
+
+        with psycopg_engine.connect() as conn:
+            cursors = self.record_cursors(conn)
+            result = query_tables(conn, COLUMN_NAMES, table_names, {"schema": "public"})
+
+        assert result == expected
+        # The results of all the tables are waited for at once, as for a single table
+        assert len(table_names) > 1
+        assert one_table_syncs > 0
+        assert len(syncs) == one_table_syncs
+        # The listeners of the connection see each query, and its cursor is closed
+        assert len(cursors) == len(table_names)
+        assert all(cursor.closed for cursor in cursors)
+
+    @pytest.mark.usefixtures("setup_db_one")
+    def test_pipeline_transaction(self, psycopg_engine):
+        with psycopg_engine.begin() as conn:
+            conn.exec_driver_sql("CREATE TABLE uncommitted (id INTEGER)")
+
+            # The queries run in the transaction of the connection, and see what it sees
+            result = query_tables(conn, COLUMN_NAMES, ["uncommitted"], {"schema": "public"})
+            assert result == {"uncommitted": [("id",)]}
+            conn.rollback()
+
+    @pytest.mark.usefixtures("setup_db_one")
+    def test_inspector_query_tables(self, db_engine_one, psycopg_engine):
+        inspector = ColumnsInspector()
+        expected = self.get_expected(db_engine_one, ["employees", "skills"])
+
+        for engine in (db_engine_one, psycopg_engine):
+            sqlalchemy_inspector = inspector._get_inspector(engine)
+            assert (
+                inspector._query_tables(sqlalchemy_inspector, COLUMN_NAMES, ["employees", "skills"])
+                == expected
+            )
+            with engine.connect() as conn:
+                sqlalchemy_inspector = inspector._get_inspector(conn)
+                assert (
+                    inspector._query_tables(
+                        sqlalchemy_inspector, COLUMN_NAMES, ["employees", "skills"]
+                    )
+                    == expected
+                )
+
+    @pytest.mark.usefixtures("setup_db_one")
+    def test_inspector_query_tables_schema(self, db_engine_one):
+        with db_engine_one.begin() as conn:
+            conn.exec_driver_sql("CREATE SCHEMA other")
+            conn.exec_driver_sql("CREATE TABLE other.employees (code TEXT)")
+        inspector = ColumnsInspector()
+
+        # The schema reflected in the current context is bound to the queries
+        with reflect_schema("other"):
+            result = inspector._query_tables(
+                inspector._get_inspector(db_engine_one), COLUMN_NAMES, ["employees"]
+            )
+        assert result == {"employees": [("code",)]}
+
+    def test_sqlite(self):
+        engine = get_engine("sqlite://")
+        with engine.begin() as conn:
+            conn.exec_driver_sql("CREATE TABLE one (id INTEGER, name TEXT)")
+            conn.exec_driver_sql("CREATE TABLE two (code TEXT)")
+
+            result = query_tables(
+                conn,
+                text("SELECT name FROM pragma_table_info(:table_name) ORDER BY cid"),
+                ["one", "two"],
+            )
+
+        assert result == {"one": [("id",), ("name",)], "two": [("code",)]}
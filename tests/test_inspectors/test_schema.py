@@ -0,0 +1,78 @@
+from sqlalchemy import inspect
+
+from sqlalchemydiff.connection import DBConnectionFactory
+from sqlalchemydiff.inspection import register
+from sqlalchemydiff.inspection.schema import (
+    SchemaInspector,
+    current_schema,
+    get_schema_inspector,
+    reflect_schema,
+)
+from tests.models.models_one import Base as BaseOne
+from tests.util import get_engine, prepare_schema_from_models
+
+
+class TestSchemaInspector:
+    def test_reflect_schema(self):
+        inspector = inspect(get_engine("sqlite://"))
+        assert get_schema_inspector(inspector) is inspector
+
+        with reflect_schema("two"):
+            assert current_schema.get() == "two"
+            schema_inspector = get_schema_inspector(inspector)
+
+        assert current_schema.get() is None
+        assert isinstance(schema_inspector, SchemaInspector)
+        assert schema_inspector.schema == "two"
+
+    def test_inspect(self, tmp_path):
+        engine = get_engine(f"sqlite:///{tmp_path / 'one.db'}")
+        prepare_schema_from_models(engine, BaseOne)
+        attached_engine = get_engine("sqlite://")
+        DBConnectionFactory.attach_sqlite_database(attached_engine, str(tmp_path / "one.db"), "two")
+
+        columns_inspector = register["columns"][1]()
+        foreign_keys_inspector = register["foreign_keys"][1]()
+        with reflect_schema("two"):
+            columns = columns_inspector.inspect(attached_engine)
+            foreign_keys = foreign_keys_inspector.inspect(attached_engine)
+
+        assert columns == columns_inspector.inspect(engine)
+        assert foreign_keys == foreign_keys_inspector.inspect(engine)
+
+    def test_methods(self):
+        class Inspector:
+            dialect = "dialect"
+            default_schema_name = "public"
+
+            def get_enums(self, schema=None):
+                return [
+                    {"name": "status", "schema": schema, "visible": False},
+                    {"name": "kind", "schema": "other", "visible": False},
+                ]
+
+            def get_schema_names(self, **kw):
+                return ["main", "two"]
+
+            def get_foreign_keys(self, table_name, schema=None, **kw):
+                return [
+                    {"name": "fk_one", "referred_schema": schema},
+                    {"name": "fk_two", "referred_schema": "other"},
+                ]
+
+        inspector = SchemaInspector(Inspector(), "two")
+
+        assert inspector.dialect == "dialect"
+        assert inspector.get_schema_names() == ["main", "two"]
+        assert inspector.get_foreign_keys("employees") == [
+            {"name": "fk_one", "referred_schema": None},
+            {"name": "fk_two", "referred_schema": "other"},
+        ]
+        assert inspector.get_enums() == [
+            {"name": "status", "schema": "public", "visible": True},
+            {"name": "kind", "schema": "other", "visible": False},
+        ]
+        assert inspector.get_foreign_keys("employees", schema="main") == [
+            {"name": "fk_one", "referred_schema": "main"},
+            {"name": "fk_two", "referred_schema": "other"},
+        ]
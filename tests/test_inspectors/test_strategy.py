@@ -0,0 +1,117 @@
+import pytest
+
+from sqlalchemydiff.comparer import Comparer
+from sqlalchemydiff.inspection import strategy
+from sqlalchemydiff.inspection.bulk import SQLiteBulkInspector
+from sqlalchemydiff.inspection.inspectors import ColumnsInspector
+from sqlalchemydiff.inspection.strategy import (
+    BULK,
+    PER_TABLE,
+    choose_strategy,
+    count_tables,
+    current_strategy,
+    reflecting,
+)
+from sqlalchemydiff.snapshot import Snapshot
+from tests.models.models_one import Base as BaseOne
+from tests.models.models_two import Base as BaseTwo
+from tests.util import get_engine, prepare_schema_from_models
+
+
+def not_counted():
+    raise AssertionError("The tables are not counted")
+
+
+class TestChooseStrategy:
+    def test_explicit(self):
+        assert choose_strategy("bulk", "postgresql", not_counted) == BULK
+        assert choose_strategy("per_table", "postgresql", not_counted) == PER_TABLE
+
+    def test_no_backend(self):
+        assert choose_strategy("bulk", "mysql", not_counted) == PER_TABLE
+        assert choose_strategy("auto", "mysql", not_counted) == PER_TABLE
+
+    def test_auto(self, monkeypatch):
+        monkeypatch.setattr(strategy, "BULK_THRESHOLD", 10)
+
+        assert choose_strategy("auto", "sqlite", lambda: 9) == PER_TABLE
+        assert choose_strategy("auto", "sqlite", lambda: 10) == BULK
+
+
+class TestReflecting:
+    @pytest.fixture
+    def engine(self, tmp_path):
+        engine = get_engine(f"sqlite:///{tmp_path / 'one.db'}")
+        prepare_schema_from_models(engine, BaseOne)
+        return engine
+
+    def test_count_tables(self, engine):
+        with engine.connect() as connection:
+            assert count_tables(connection, None) == 6
+
+    def test_reflecting(self, engine):
+        inspector = ColumnsInspector()
+
+        with reflecting(PER_TABLE):
+            assert current_strategy.get() == PER_TABLE
+            assert not isinstance(inspector._get_inspector(engine), SQLiteBulkInspector)
+        assert current_strategy.get() is None
+        assert isinstance(inspector._get_inspector(engine), SQLiteBulkInspector)
+
+
+class TestCompareStrategy:
+    @pytest.fixture
+    def comparer(self, tmp_path):
+        engines = []
+        for name, base in (("one", BaseOne), ("two", BaseTwo)):
+            engine = get_engine(f"sqlite:///{tmp_path / name}.db")
+            prepare_schema_from_models(engine, base)
+            engines.append(engine)
+        return Comparer(*engines)
+
+    def test_default(self, comparer):
+        result = comparer.compare()
+
+        assert result.reflection == {"one": "bulk", "two": "bulk"}
+
+    @pytest.mark.parametrize(
+        "threshold, reflection",
+        [
+            (100, {"one": "per_table", "two": "per_table"}),
+            (6, {"one": "bulk", "two": "bulk"}),
+            (7, {"one": "bulk", "two": "per_table"}),
+        ],
+    )
+    def test_auto(self, comparer, monkeypatch, threshold, reflection):
+        with comparer.db_one_engine.begin() as connection:
+            connection.exec_driver_sql("CREATE TABLE extra (id INTEGER)")
+        expected = comparer.compare().result
+        monkeypatch.setattr(strategy, "BULK_THRESHOLD", threshold)
+
+        result = comparer.compare(reflection="auto")
+
+        assert result.reflection == reflection
+        assert result.result == expected
+
+    def test_per_table(self, comparer):
+        expected = comparer.compare()
+
+        result = comparer.compare(reflection="per_table")
+
+        assert result.reflection == {"one": "per_table", "two": "per_table"}
+        assert result.result == expected.result
+        assert (
+            result.stats.inspectors["columns"].inspection["one"].statements
+            > expected.stats.inspectors["columns"].inspection["one"].statements
+        )
+
+    def test_snapshot(self, comparer):
+        snapshot = Snapshot.take(comparer.db_one_engine)
+
+        result = Comparer(snapshot, comparer.db_two_engine).compare(reflection="auto")
+
+        assert result.reflection == {"one": "snapshot", "two": "per_table"}
+
+    def test_invalid(self, comparer):
+        with pytest.raises(ValueError, match="reflection must be one of: auto, bulk, per_table"):
+            comparer.compare(reflection="sharded")
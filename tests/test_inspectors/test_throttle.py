@@ -0,0 +1,210 @@
+import threading
+import time
+
+import pytest
+from sqlalchemy import event
+
+from sqlalchemydiff.comparer import Comparer
+from sqlalchemydiff.inspection import throttle as throttle_module
+from sqlalchemydiff.inspection.checkpoint import RetryPolicy, call_with_retries, retrying
+from sqlalchemydiff.inspection.deadline import Deadline, within
+from sqlalchemydiff.inspection.throttle import Throttle
+from tests.base import BaseTest
+from tests.models.models_one import Base as BaseOne
+from tests.models.models_two import Base as BaseTwo
+from tests.util import get_engine, prepare_schema_from_models
+
+
+class FakeClock:
+    """A clock that only moves forward when slept on."""
+
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TestThrottle:
+    @pytest.fixture
+    def engine(self, tmp_path):
+        engine = get_engine(f"sqlite:///{tmp_path / 'one.db'}")
+        prepare_schema_from_models(engine, BaseOne)
+        return engine
+
+    @pytest.mark.parametrize(
+        "kwargs, message",
+        [
+            ({"max_qps": 0}, "max_qps must be positive"),
+            ({"max_connections": 0}, "max_connections must be a positive integer"),
+        ],
+    )
+    def test_invalid(self, kwargs, message):
+        with pytest.raises(ValueError, match=message):
+            Throttle(**kwargs)
+
+    def test_max_qps(self, engine, monkeypatch):
+        clock = FakeClock()
+        monkeypatch.setattr(throttle_module, "time", clock)
+        throttle = Throttle(max_qps=4)
+
+        with throttle.listen([engine, engine]), engine.connect() as connection:
+            for _ in range(3):
+                connection.exec_driver_sql("SELECT 1")
+        # The first statement runs at once, and the next ones a quarter of a second apart
+        assert clock.sleeps == [0.25, 0.25]
+
+        clock.now += 10
+        with engine.connect() as connection:
+            connection.exec_driver_sql("SELECT 1")
+        assert clock.sleeps == [0.25, 0.25]
+
+    def test_max_connections(self, engine):
+        throttle = Throttle(max_connections=1)
+        entered = threading.Event()
+
+        def inspect():
+            with throttle.connection(engine):
+                entered.set()
+
+        with throttle.connection(engine):
+            thread = threading.Thread(target=inspect)
+            thread.start()
+            assert not entered.wait(0.1)
+        thread.join()
+        assert entered.is_set()
+
+        # The limit is per engine
+        with throttle.connection(engine), throttle.connection(object()):
+            pass
+
+    def test_no_max_connections(self, engine):
+        throttle = Throttle()
+        with throttle.connection(engine), throttle.connection(engine):
+            assert throttle._semaphores == {}
+
+
+class TestCompareThrottle:
+    @pytest.fixture
+    def comparer(self, tmp_path):
+        engines = []
+        for name, base in (("one", BaseOne), ("two", BaseTwo)):
+            engine = get_engine(f"sqlite:///{tmp_path / name}.db")
+            prepare_schema_from_models(engine, base)
+            engines.append(engine)
+        return Comparer(*engines)
+
+    def test_compare(self, comparer, monkeypatch):
+        expected = comparer.compare()
+        clock = FakeClock()
+        monkeypatch.setattr(throttle_module, "time", clock)
+        running, max_running = [0], [0]
+        get_db_info = Comparer._get_db_info
+
+        def counting_get_db_info(self, ignore_specs, inspector, engine):
+            running[0] += 1
+            max_running[0] = max(max_running[0], running[0])
+            time.sleep(0.01)
+            try:
+                return get_db_info(self, ignore_specs, inspector, engine)
+            finally:
+                running[0] -= 1
+
+        monkeypatch.setattr(Comparer, "_get_db_info", counting_get_db_info)
+
+        result = comparer.compare(jobs=4, throttle=Throttle(max_qps=1000, max_connections=1))
+
+        assert result.result == expected.result
+        # One inspection at a time on each of the two databases
+        assert max_running[0] <= 2
+        assert clock.sleeps
+
+
+class TestSessionSettings(BaseTest):
+    SETTINGS = (
+        "SELECT current_setting('statement_timeout'), current_setting('lock_timeout'), "
+        "current_setting('application_name')"
+    )
+
+    @pytest.mark.usefixtures("setup_db_one")
+    def test_session_settings(self, db_engine_one):
+        throttle = Throttle(statement_timeout=5, lock_timeout=0.1, application_name="diff's %s")
+
+        with throttle.listen([db_engine_one]):
+            with db_engine_one.begin() as conn:
+                assert tuple(conn.exec_driver_sql(self.SETTINGS).one()) == (
+                    "5s",
+                    "100ms",
+                    "diff's %s",
+                )
+            with within(Deadline(time.monotonic() + 0.5)), db_engine_one.begin() as conn:
+                timeout = conn.exec_driver_sql("SHOW statement_timeout").scalar()
+                assert timeout.endswith("ms") and int(timeout[:-2]) <= 500
+
+        with db_engine_one.begin() as conn:
+            assert conn.exec_driver_sql("SHOW lock_timeout").scalar() == "0"
+
+    @pytest.mark.usefixtures("setup_db_one")
+    def test_settings_statements(self, db_engine_one, monkeypatch):
+        clock = FakeClock()
+        monkeypatch.setattr(throttle_module, "time", clock)
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db_engine_one, "before_cursor_execute", record)
+        throttle = Throttle(
+            max_qps=4, statement_timeout=5, lock_timeout=0.1, application_name="diff"
+        )
+
+        with throttle.listen([db_engine_one]):
+            for _ in range(2):
+                with db_engine_one.begin() as conn:
+                    conn.exec_driver_sql("SELECT 1")
+            with within(Deadline(time.monotonic() + 60)), db_engine_one.begin() as conn:
+                conn.exec_driver_sql("SELECT 1")
+
+        # The settings are set once, on the connection, and only the statement timeout is
+        # lowered in the transactions run before a deadline
+        assert statements[:2] == ["SELECT 1", "SELECT 1"]
+        assert statements[2].startswith("SET LOCAL statement_timeout = ")
+        assert statements[3:] == ["SELECT 1"]
+        # Setting the statement timeout is not throttled
+        assert clock.sleeps == [0.25, 0.25]
+
+    @pytest.mark.usefixtures("setup_db_one")
+    def test_statement_timeout_retried(self, db_engine_one):
+        throttle = Throttle(statement_timeout=0.05)
+        sleeps = [1, 0]
+
+        def sleep():
+            with db_engine_one.begin() as conn:
+                return conn.exec_driver_sql(f"SELECT pg_sleep({sleeps.pop(0)})").scalar()
+
+        # A statement cancelled by the statement timeout is retried
+        with throttle.listen([db_engine_one]), retrying(RetryPolicy(retries=1, backoff=0)):
+            assert call_with_retries(sleep) == ""
+        assert sleeps == []
+
+    @pytest.mark.usefixtures("setup_db_one")
+    def test_no_settings(self, db_engine_one):
+        with Throttle().listen([db_engine_one]), db_engine_one.begin() as conn:
+            assert conn.exec_driver_sql("SHOW lock_timeout").scalar() == "0"
+
+    @pytest.mark.usefixtures("setup_db_one", "setup_db_two")
+    def test_compare_consistent(self, db_engine_one, db_engine_two, compare_result):
+        throttle = Throttle(
+            max_connections=2, statement_timeout=30, lock_timeout=1, application_name="diff"
+        )
+
+        result = Comparer(db_engine_one, db_engine_two).compare(
+            consistent=True, jobs=4, throttle=throttle, timeout=60
+        )
+
+        assert result.result == compare_result
@@ -0,0 +1,124 @@
+import textwrap
+
+import pytest
+from alembic.config import Config
+
+from sqlalchemydiff.migrations import get_migration_tables
+
+
+REVISIONS = {
+    "r1": """
+        import sqlalchemy as sa
+        from alembic import op
+
+        revision = "r1"
+        down_revision = None
+
+
+        def upgrade():
+            op.create_table("employees", sa.Column("id", sa.Integer, primary_key=True))
+    """,
+    "r2": """
+        import sqlalchemy as sa
+        from alembic import op
+
+        revision = "r2"
+        down_revision = "r1"
+
+
+        def upgrade():
+            roles = op.create_table("roles", sa.Column("name", sa.Unicode(50)))
+            op.bulk_insert(roles, [{"name": "admin"}])
+            op.add_column("employees", sa.Column("role_name", sa.Unicode(50)))
+            op.create_index("ix_roles_name", "roles", ["name"])
+            op.create_foreign_key(None, "skills", "employees", ["employee_id"], ["id"])
+            op.rename_table("mobile_numbers", "phone_numbers")
+            with op.batch_alter_table("companies") as batch_op:
+                batch_op.drop_column("address")
+    """,
+    "r3": """
+        from alembic import op
+
+        revision = "r3"
+        down_revision = "r2"
+
+
+        def upgrade():
+            op.execute("UPDATE employees SET role_name = 'admin'")
+    """,
+    "r4": """
+        from alembic import op
+
+        revision = "r4"
+        down_revision = "r3"
+
+
+        def upgrade():
+            op.drop_index("ix_roles_name")
+    """,
+}
+
+
+def make_alembic_config(path, revisions=REVISIONS):
+    """Write the migrations of `revisions` and their Alembic config in `path`."""
+    versions = path / "migrations" / "versions"
+    versions.mkdir(parents=True)
+    for revision, source in revisions.items():
+        (versions / f"{revision}.py").write_text(textwrap.dedent(source))
+
+    config_path = path / "alembic.ini"
+    config_path.write_text(f"[alembic]\nscript_location = {path / 'migrations'}\n")
+    return config_path
+
+
+class TestGetMigrationTables:
+    @pytest.fixture
+    def config_path(self, tmp_path):
+        return make_alembic_config(tmp_path)
+
+    def test_tables(self, config_path):
+        assert get_migration_tables(config_path, "r1", "r2") == {
+            "roles",
+            "employees",
+            "skills",
+            "mobile_numbers",
+            "phone_numbers",
+            "companies",
+        }
+
+    def test_from_base(self, config_path):
+        assert get_migration_tables(Config(config_path), head="r1") == {"employees"}
+        assert get_migration_tables(config_path, head="r1", dialect_name="sqlite") == {"employees"}
+
+    @pytest.mark.parametrize(
+        "upgrade",
+        [
+            """
+            def upgrade():
+                op.create_foreign_key(None, "skills", "employees", ["employee_id"], ["id"])
+            """,
+            """
+            def upgrade():
+                with op.batch_alter_table("companies") as batch_op:
+                    batch_op.drop_column("address")
+            """,
+        ],
+    )
+    def test_unsupported_operations(self, tmp_path, upgrade):
+        source = 'from alembic import op\n\nrevision = "r1"\ndown_revision = None\n'
+        config_path = make_alembic_config(tmp_path, {"r1": source + textwrap.dedent(upgrade)})
+
+        # The operations that cannot be run offline on SQLite leave the tables unknown
+        assert get_migration_tables(config_path, dialect_name="postgresql") is not None
+        assert get_migration_tables(config_path, dialect_name="sqlite") is None
+
+    @pytest.mark.parametrize(
+        "base, head",
+        [
+            ("r2", "r3"),  # op.execute
+            ("r3", "heads"),  # op.drop_index without a table name
+            ("base", "heads"),
+        ],
+    )
+    def test_unknown_tables(self, config_path, base, head):
+        assert get_migration_tables(config_path, base, head) is None
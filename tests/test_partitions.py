@@ -0,0 +1,144 @@
+import pytest
+
+from sqlalchemydiff.comparer import Comparer
+from sqlalchemydiff.inspection.partitions import (
+    Partition,
+    find_partitioned_tables,
+    find_partitions,
+)
+from sqlalchemydiff.snapshot import Snapshot
+from tests.base import BaseTest
+from tests.util import get_engine
+
+
+EVENTS = [
+    "CREATE TABLE events (id INTEGER, day DATE NOT NULL, kind TEXT, PRIMARY KEY (id, day)) "
+    "PARTITION BY RANGE (day)",
+    "CREATE INDEX ix_events_kind ON events (kind)",
+    "CREATE TABLE events_p20250101 PARTITION OF events "
+    "FOR VALUES FROM ('2025-01-01') TO ('2025-01-02')",
+    "CREATE TABLE events_p20250102 PARTITION OF events "
+    "FOR VALUES FROM ('2025-01-02') TO ('2025-01-03') PARTITION BY RANGE (day)",
+    "CREATE TABLE events_p20250102_all PARTITION OF events_p20250102 "
+    "FOR VALUES FROM ('2025-01-02') TO ('2025-01-03')",
+    "CREATE TABLE logs (id INTEGER PRIMARY KEY, message TEXT)",
+]
+
+
+class TestPartitions(BaseTest):
+    @pytest.fixture
+    def setup_partitions(self, setup_db_one, setup_db_two, db_engine_one, db_engine_two):
+        for engine in (db_engine_one, db_engine_two):
+            with engine.begin() as conn:
+                for statement in EVENTS:
+                    conn.exec_driver_sql(statement)
+
+    def create(self, engine, *statements):
+        with engine.begin() as conn:
+            for statement in statements:
+                conn.exec_driver_sql(statement)
+
+    @pytest.mark.usefixtures("setup_partitions")
+    def test_find_partitions(self, db_engine_one):
+        self.create(
+            db_engine_one,
+            "CREATE TABLE events_p20250103 PARTITION OF events "
+            "FOR VALUES FROM ('2025-01-03') TO ('2025-01-04')",
+            "CREATE INDEX ix_events_p20250103_id ON events_p20250103 (id)",
+            "CREATE TABLE events_p20250104 PARTITION OF events "
+            "(kind DEFAULT 'view') FOR VALUES FROM ('2025-01-04') TO ('2025-01-05')",
+            "CREATE TABLE events_p20250105 PARTITION OF events "
+            "(CONSTRAINT check_id CHECK (id > 0)) FOR VALUES FROM ('2025-01-05') TO ('2025-01-06')",
+        )
+
+        with db_engine_one.connect() as conn:
+            assert find_partitions(conn, None) == {
+                "events_p20250101": Partition("events", True),
+                "events_p20250102": Partition("events", True),
+                "events_p20250102_all": Partition("events", True),
+                "events_p20250103": Partition("events", False),
+                "events_p20250104": Partition("events", False),
+                "events_p20250105": Partition("events", False),
+            }
+            assert find_partitions(conn, "public") == find_partitions(conn, None)
+            assert find_partitions(conn, "information_schema") == {}
+
+    @pytest.mark.usefixtures("setup_partitions")
+    def test_find_partitioned_tables(self, db_engine_one):
+        self.create(
+            db_engine_one, "CREATE TABLE empty (id INTEGER, day DATE) PARTITION BY RANGE (day)"
+        )
+
+        # Partitioned tables are found with or without partitions, but not partitioned partitions
+        with db_engine_one.connect() as conn:
+            assert find_partitioned_tables(conn, None) == {"events", "empty"}
+            assert find_partitioned_tables(conn, "information_schema") == set()
+
+    def test_find_partitions_sqlite(self):
+        with get_engine("sqlite://").connect() as conn:
+            assert find_partitions(conn, None) == {}
+            assert find_partitioned_tables(conn, None) == set()
+
+    @pytest.mark.usefixtures("setup_partitions")
+    @pytest.mark.parametrize("consistent", [False, True])
+    def test_compare(self, db_engine_one, db_engine_two, consistent):
+        self.create(
+            db_engine_two,
+            "CREATE TABLE events_p20250103 PARTITION OF events "
+            "FOR VALUES FROM ('2025-01-03') TO ('2025-01-04')",
+        )
+        comparer = Comparer(db_engine_one, db_engine_two)
+        result = comparer.compare(partitions=True, consistent=consistent, jobs=2).result
+
+        for key in ("columns", "primary_keys", "foreign_keys", "indexes", "unique_constraints"):
+            assert result[key]["events"] == comparer.compare().result[key]["events"]
+            assert not any(name.startswith("events_") for name in result[key])
+
+        # Partitions are left out of the tables, and the partitioned table reports its group
+        tables = result["tables"]
+        assert not any(table["name"].startswith("events_") for table in tables["two_only"])
+        assert {"name": "events", "comment": "", "mismatched_partitions": []} in tables["common"]
+        assert {"name": "logs", "comment": ""} in tables["common"]
+
+    @pytest.mark.usefixtures("setup_partitions")
+    def test_compare_mismatched(self, db_engine_one, db_engine_two):
+        self.create(
+            db_engine_two,
+            "CREATE INDEX ix_events_p20250101_id ON events_p20250101 (id)",
+        )
+        comparer = Comparer(Snapshot.take(db_engine_one), db_engine_two)
+        result = comparer.compare(partitions=True)
+
+        # The partitions of a snapshot are not collapsed
+        assert {"name": "events_p20250101", "comment": ""} in result.result["tables"]["one_only"]
+        assert {"name": "events", "comment": ""} == result.result["tables"]["diff"][0]["one"]
+        assert result.result["tables"]["diff"][0]["two"] == {
+            "name": "events",
+            "comment": "",
+            "mismatched_partitions": ["events_p20250101"],
+        }
+
+    @pytest.mark.usefixtures("setup_db_one", "setup_db_two")
+    def test_compare_partitioned_one_side(self, db_engine_one, db_engine_two):
+        self.create(
+            db_engine_one,
+            "CREATE TABLE events (id INTEGER, day DATE NOT NULL) PARTITION BY RANGE (day)",
+            "CREATE TABLE logs (id INTEGER, day DATE NOT NULL) PARTITION BY RANGE (day)",
+        )
+        self.create(
+            db_engine_two,
+            *EVENTS[:3],
+            "CREATE TABLE logs (id INTEGER, day DATE NOT NULL)",
+        )
+
+        result = Comparer(db_engine_one, db_engine_two).compare(partitions=True).result
+
+        # A partitioned table without partitions has no mismatched partitions, like its
+        # counterpart with matching partitions, but a table that is not partitioned differs
+        tables = result["tables"]
+        assert {"name": "events", "comment": "", "mismatched_partitions": []} in tables["common"]
+        assert {
+            "one": {"name": "logs", "comment": "", "mismatched_partitions": []},
+            "two": {"name": "logs", "comment": ""},
+        } in tables["diff"]
+        assert not any(diff["one"]["name"] == "events" for diff in tables["diff"])
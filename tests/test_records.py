@@ -0,0 +1,252 @@
+import copy
+import json
+import pickle
+import tracemalloc
+
+import pytest
+
+from sqlalchemydiff.comparer import Comparer
+from sqlalchemydiff.inspection import register
+from sqlalchemydiff.inspection.records import (
+    MISSING,
+    ColumnRecord,
+    FrozenDict,
+    FrozenList,
+    IndexRecord,
+    Interner,
+    Record,
+    freeze,
+    to_builtin,
+)
+from sqlalchemydiff.snapshot import Snapshot
+from tests.base import BaseTest
+
+
+class TestRecord:
+    @pytest.fixture
+    def index(self):
+        return {
+            "name": "ix_employees_name",
+            "column_names": ["name"],
+            "unique": False,
+            "column_sorting": {"name": ("desc",)},
+            "dialect_options": {"postgresql_include": []},
+            "custom": "value",
+        }
+
+    def test_record(self, index):
+        record = IndexRecord(index)
+
+        assert not hasattr(record, "__dict__")
+        assert record.as_dict() == index
+        assert list(record) == list(index)
+        assert len(record) == len(index)
+        assert record["name"] == "ix_employees_name"
+        assert record["custom"] == "value"
+        assert record.expressions is MISSING
+        assert isinstance(record.column_names, FrozenList)
+        assert isinstance(record.dialect_options, FrozenDict)
+
+    @pytest.mark.parametrize("key", ["expressions", "unknown"])
+    def test_missing_key(self, index, key):
+        record = IndexRecord(index)
+
+        with pytest.raises(KeyError):
+            record[key]
+        assert record.get(key) is None
+
+    def test_immutable(self, index):
+        record = IndexRecord(index)
+
+        with pytest.raises(AttributeError, match="IndexRecord is immutable"):
+            record.name = "other"  # ty: ignore[invalid-assignment]
+
+        assert copy.deepcopy(record) is record
+
+    def test_pickle(self, index):
+        record = IndexRecord(index)
+        loaded = pickle.loads(pickle.dumps(record))
+
+        assert loaded == record
+        assert loaded.as_dict() == index
+        assert loaded.expressions is MISSING
+        assert pickle.loads(pickle.dumps(MISSING)) is MISSING
+
+    def test_equality(self, index):
+        record = IndexRecord(index)
+        same = IndexRecord(dict(index))
+        other = IndexRecord({**index, "unique": True})
+
+        assert record == record
+        assert record == same
+        assert hash(record) == hash(same)
+        assert record != other
+        assert record != ColumnRecord(index)
+        assert record != index
+        assert len({record, same, other}) == 2
+
+    def test_repr(self):
+        record = ColumnRecord({"name": "id", "type": "INTEGER"})
+
+        assert repr(record) == "ColumnRecord({'name': 'id', 'type': 'INTEGER'})"
+        assert repr(MISSING) == "MISSING"
+
+    def test_freeze_and_to_builtin(self):
+        value = {"list": [1, {"a": [2]}], "tuple": (3, [4]), "record": ColumnRecord({"name": "id"})}
+        frozen = freeze(value)
+
+        assert isinstance(frozen, FrozenDict)
+        assert hash(frozen)
+        assert freeze(value["record"]) is value["record"]
+        assert to_builtin(frozen) == {
+            "list": [1, {"a": [2]}],
+            "tuple": (3, [4]),
+            "record": {"name": "id"},
+        }
+        assert to_builtin([value]) == [{**value, "record": {"name": "id"}}]
+
+    def test_empty_dicts_are_shared(self):
+        one = ColumnRecord({"name": "id", "dialect_options": {}})
+        two = ColumnRecord({"name": "id"})
+
+        assert one.dialect_options is two.extra is one.extra
+
+
+class TestInterner:
+    def test_strings(self):
+        interner = Interner()
+        name = "".join(["created", "_at"])
+
+        assert interner(name) is interner("created_at")
+        assert len(interner) == 0
+
+    def test_values(self):
+        interner = Interner()
+        value = FrozenList(["id"])
+
+        assert interner(value) is value
+        assert interner(FrozenList(["id"])) is value
+        assert interner(("id",)) is not value
+        assert interner([1]) == [1]
+        assert len(interner) == 2
+
+    def test_nested_values(self):
+        interner = Interner()
+        values = [
+            FrozenList([1]),
+            FrozenList([True]),
+            FrozenList([1.0]),
+            FrozenList([FrozenList([1])]),
+            FrozenList([(1,)]),
+            FrozenDict.from_dict({"x": 1}),
+            FrozenDict.from_dict({"x": True}),
+        ]
+
+        # Equal values are not shared when the values they contain have other types
+        for value in values:
+            assert interner(value) is value
+        assert interner(FrozenDict.from_dict({"x": True})) is values[-1]
+        assert len(interner) == len(values)
+
+    def test_records(self):
+        interner = Interner()
+        index = {
+            "name": "".join(["ix_", "name"]),
+            "column_names": ["name"],
+            "dialect_options": {"postgresql_include": []},
+        }
+        one = interner(IndexRecord(index, interner))
+        two = interner(IndexRecord(dict(index), interner))
+        other = interner(IndexRecord({**index, "name": "ix_other"}, interner))
+
+        assert one is two
+        assert other is not one
+        assert other.column_names is one.column_names
+        assert other.dialect_options is one.dialect_options
+        assert one.name is "ix_name"  # noqa: F632
+        assert other.as_dict() == {**index, "name": "ix_other"}
+
+        unique = interner(IndexRecord({**index, "unique": True}, interner))
+        assert interner(IndexRecord({**index, "unique": 1}, interner)) is not unique
+        assert interner(IndexRecord({**index, "unique": 1}, interner)).unique is 1  # noqa: F632
+
+    def test_memory(self):
+        def get_columns(interner):
+            tracemalloc.start()
+            try:
+                columns = [
+                    ColumnRecord(
+                        {
+                            "name": f"column_{number}",
+                            "type": "INTEGER",
+                            "nullable": bool(number % 2),
+                            "default": None,
+                            "dialect_options": {"number": number},
+                        },
+                        interner,
+                    )
+                    for number in range(10000)
+                ]
+                if interner is not None:
+                    columns = [interner(column) for column in columns]
+                return tracemalloc.get_traced_memory()[0]
+            finally:
+                tracemalloc.stop()
+
+        # Pooling distinct records takes less memory than the records themselves
+        assert get_columns(Interner()) < 2 * get_columns(None)
+
+
+class TestCompactInspectors(BaseTest):
+    @pytest.mark.usefixtures("setup_db_one")
+    def test_inspect(self, db_engine_one):
+        for _, inspector_class in register.values():
+            info = inspector_class().inspect(db_engine_one)
+            compact_info = inspector_class(compact=True).inspect(db_engine_one)
+
+            assert to_builtin(compact_info) == info
+
+    @pytest.mark.usefixtures("setup_db_one")
+    def test_records(self, db_engine_one):
+        compact_info = register["columns"][1](compact=True).inspect(db_engine_one)
+
+        assert all(
+            isinstance(column, ColumnRecord)
+            for columns in compact_info.values()
+            for column in columns
+        )
+
+    @pytest.mark.usefixtures("setup_db_one")
+    def test_inspect_with_interner(self, db_engine_one):
+        interner = Interner()
+        inspector = register["columns"][1](compact=True, interner=interner)
+        one = inspector.inspect(db_engine_one)
+        two = inspector.inspect(db_engine_one)
+
+        assert one == two
+        for table_name, columns in one.items():
+            assert next(key for key in two if key == table_name) is table_name
+            assert all(a is b for a, b in zip(columns, two[table_name], strict=True))
+
+    @pytest.mark.usefixtures("setup_db_one", "setup_db_two")
+    def test_compare(self, db_engine_one, db_engine_two, compare_result, compare_errors, tmp_path):
+        comparer = Comparer(db_engine_one, db_engine_two)
+        result = comparer.compare(compact=True)
+
+        assert to_builtin(result.result) == compare_result
+        assert to_builtin(result.errors) == compare_errors
+        assert all(not isinstance(record["item"], Record) for record in result.iter_errors())
+
+        result.dump_errors(tmp_path / "errors.json")
+        with open(tmp_path / "errors.json") as stream:
+            assert json.load(stream) == compare_errors
+
+    @pytest.mark.usefixtures("setup_db_one", "setup_db_two")
+    def test_compare_with_snapshot(
+        self, db_engine_one, db_engine_two, compare_result, compare_errors
+    ):
+        comparer = Comparer(Snapshot.take(db_engine_one), db_engine_two)
+        result = comparer.compare(compact=True)
+
+        assert result.result == compare_result
+        assert result.errors == compare_errors
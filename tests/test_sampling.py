@@ -0,0 +1,122 @@
+import pytest
+
+from sqlalchemydiff.comparer import Comparer
+from sqlalchemydiff.sampling import SampleResult, get_max_drifted, sample_tables
+from sqlalchemydiff.snapshot import Snapshot
+from tests.util import get_engine, prepare_schema_from_models, record_bulk_tables
+
+from .models.models_one import Base as BaseOne
+from .models.models_two import Base as BaseTwo
+
+
+TABLE_LEVEL_KEYS = ("columns", "primary_keys", "foreign_keys", "indexes", "unique_constraints")
+
+
+def test_sample_tables():
+    tables = [f"table_{number}" for number in range(100)]
+
+    sample = sample_tables(tables, 10)
+
+    assert len(sample) == 10
+    assert sample <= set(tables)
+    assert sample_tables(reversed(tables), 10) == sample
+    assert sample_tables(tables, 10, seed="other") != sample
+    # Tables stay in the sample when other tables are dropped
+    assert sample_tables(sorted(sample) + tables[:5], 10) == sample
+    assert sample_tables(tables, 200) == set(tables)
+
+
+@pytest.mark.parametrize(
+    "tables, sampled, drifted, confidence, max_drifted",
+    [
+        (1000, 100, 0, 0.95, 28),
+        (1000, 100, 0, 0.99, 42),
+        (1000, 100, 5, 0.95, 99),
+        (1000, 1000, 3, 0.95, 3),
+        (10, 0, 0, 0.95, 10),
+        (0, 0, 0, 0.95, 0),
+    ],
+)
+def test_get_max_drifted(tables, sampled, drifted, confidence, max_drifted):
+    assert get_max_drifted(tables, sampled, drifted, confidence) == max_drifted
+
+
+def test_max_drift_rate():
+    assert SampleResult(1000, 100, 0, 0.95, 28).max_drift_rate == 0.028
+    assert SampleResult(0, 0, 0, 0.95, 0).max_drift_rate == 0.0
+
+
+class TestCompareSample:
+    @pytest.fixture
+    def comparer(self, tmp_path):
+        engines = []
+        for name, base in (("one", BaseOne), ("two", BaseTwo)):
+            engine = get_engine(f"sqlite:///{tmp_path / name}.db")
+            prepare_schema_from_models(engine, base)
+            engines.append(engine)
+        return Comparer(*engines)
+
+    def test_compare(self, comparer):
+        full = comparer.compare()
+        tables = full.result["tables"]
+        one_sided = {table["name"] for table in tables["one_only"] + tables["two_only"]}
+        common = {table["name"] for table in tables["common"] + tables.get("diff", [])}
+
+        result = comparer.compare(sample=2, sample_seed="seed")
+
+        sampled = sample_tables(common, 2, "seed")
+        assert result.result["tables"] == full.result["tables"]
+        for key in TABLE_LEVEL_KEYS:
+            assert set(result.result[key]) == sampled | one_sided
+
+        drifted = {record["table"] for record in full.iter_errors()} & sampled
+        assert result.sample == SampleResult(
+            len(common), 2, len(drifted), 0.95, get_max_drifted(len(common), 2, len(drifted), 0.95)
+        )
+        assert full.sample is None
+
+    def test_compare_bulk(self, tmp_path):
+        engines = []
+        for name in ("one", "two"):
+            engine = get_engine(f"sqlite:///{tmp_path / name}.db")
+            with engine.begin() as connection:
+                for number in range(300):
+                    connection.exec_driver_sql(f"CREATE TABLE table_{number} (id INTEGER)")
+            engines.append(engine)
+        queried = record_bulk_tables(engines[0])
+
+        result = Comparer(*engines).compare(sample=3)
+
+        sampled = sample_tables([f"table_{number}" for number in range(300)], 3)
+        assert set(result.result["columns"]) == sampled
+        # The bulk queries only cover the sampled tables
+        assert queried
+        assert all(tables == sampled for tables in queried)
+
+    def test_compare_all(self, comparer):
+        full = comparer.compare()
+        result = comparer.compare(sample=100, sample_confidence=0.99)
+
+        assert result.result == full.result
+        assert result.sample.sampled == result.sample.tables
+        assert result.sample.max_drifted == result.sample.drifted > 0
+
+    def test_compare_without_tables(self, comparer):
+        snapshot = Snapshot.take(comparer.db_one_engine, ignore_inspectors=["tables"])
+        comparer = Comparer(snapshot, comparer.db_two_engine)
+
+        result = comparer.compare(sample=2)
+
+        assert result.result == comparer.compare().result
+        assert result.sample is None
+
+    @pytest.mark.parametrize(
+        "kwargs, message",
+        [
+            ({"sample": -1}, "sample must not be negative"),
+            ({"sample_confidence": 1}, "sample_confidence must be between 0 and 1"),
+        ],
+    )
+    def test_invalid(self, comparer, kwargs, message):
+        with pytest.raises(ValueError, match=message):
+            comparer.compare(**kwargs)
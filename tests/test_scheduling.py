@@ -0,0 +1,118 @@
+import json
+
+import pytest
+
+from sqlalchemydiff.comparer import Comparer
+from sqlalchemydiff.scheduling import InspectorHistory
+from tests.util import get_engine, prepare_schema_from_models
+
+from .models.models_one import Base as BaseOne
+from .models.models_two import Base as BaseTwo
+
+
+class TestInspectorHistory:
+    def test_empty(self, tmp_path):
+        history = InspectorHistory(tmp_path / "history.json")
+
+        assert history.get_cost("columns") == 0.0
+        assert history.get_mismatch_rate("columns") == 0.5
+        assert history.order(["tables", "columns"]) == ["tables", "columns"]
+
+    def test_record(self, tmp_path):
+        history = InspectorHistory(tmp_path / "history.json", decay=0.5)
+
+        history.record({"columns": (2.0, True), "indexes": (1.0, False)})
+        history.record({"columns": (4.0, False)})
+
+        assert history.inspectors == {
+            "columns": {"runs": 1.5, "seconds": 5.0, "mismatches": 0.5},
+            "indexes": {"runs": 0.5, "seconds": 0.5, "mismatches": 0.0},
+        }
+        assert history.get_cost("columns") == pytest.approx(5.0 / 1.5)
+        assert history.get_mismatch_rate("columns") == pytest.approx(1.5 / 3.5)
+
+    def test_order(self, tmp_path):
+        history = InspectorHistory(tmp_path / "history.json")
+        for _ in range(5):
+            history.record(
+                {
+                    "tables": (1.0, False),
+                    "columns": (1.0, True),
+                    "indexes": (0.1, False),
+                    "enums": (0.1, False),
+                }
+            )
+
+        # Cheap inspectors first, then the ones that often differ, and never run ones first
+        assert history.order(["tables", "columns", "indexes", "enums", "unknown"]) == [
+            "unknown",
+            "indexes",
+            "enums",
+            "columns",
+            "tables",
+        ]
+
+    def test_save(self, tmp_path):
+        path = tmp_path / "history" / "history.json"
+        history = InspectorHistory(path)
+        history.record({"columns": (2.0, True)})
+        history.save()
+
+        with open(path) as stream:
+            assert json.load(stream) == history.inspectors
+        assert InspectorHistory(path).inspectors == history.inspectors
+
+
+class TestCompareSchedule:
+    @pytest.fixture
+    def comparer(self, tmp_path):
+        engines = []
+        for name, base in (("one", BaseOne), ("two", BaseTwo)):
+            engine = get_engine(f"sqlite:///{tmp_path / name}.db")
+            prepare_schema_from_models(engine, base)
+            engines.append(engine)
+        return Comparer(*engines)
+
+    def test_history(self, comparer, tmp_path):
+        path = tmp_path / "history.json"
+        expected = comparer.compare()
+
+        result = comparer.compare(history=path)
+        assert result.result == expected.result
+        assert list(result.result) == list(expected.result)
+        assert not result.is_partial
+
+        history = InspectorHistory(path)
+        # Not supported by SQLite, the enums are never diffed
+        assert set(history.inspectors) == set(expected.result)
+        for key, inspector_history in history.inspectors.items():
+            assert inspector_history["mismatches"] == bool(expected.errors.get(key))
+
+    @pytest.mark.parametrize("jobs", [1, 2])
+    def test_fail_fast(self, comparer, tmp_path, jobs):
+        path = tmp_path / "history.json"
+        expected = comparer.compare()
+        history = InspectorHistory(path)
+        history.record(dict.fromkeys(expected.result, (10.0, False)))
+        history.record({"indexes": (0.001, True)})
+        history.save()
+
+        result = comparer.compare(history=path, fail_fast=True, jobs=jobs)
+
+        # The indexes are compared first, since they are cheap and often differ
+        assert list(result.result) == ["indexes"]
+        assert result.result["indexes"] == expected.result["indexes"]
+        assert result.uncovered == {
+            key: None for key in [*expected.result, "enums"] if key != "indexes"
+        }
+        assert not result.is_match
+
+        history = InspectorHistory(path)
+        assert history.inspectors["indexes"]["runs"] == pytest.approx(2.71)
+        assert history.inspectors["columns"]["runs"] == pytest.approx(0.81)
+
+    def test_fail_fast_match(self, comparer):
+        result = Comparer(comparer.db_one_engine, comparer.db_one_engine).compare(fail_fast=True)
+
+        assert result.is_match
+        assert not result.is_partial
@@ -0,0 +1,118 @@
+import json
+import logging
+from decimal import Decimal
+
+import pytest
+
+from sqlalchemydiff.comparer import Comparer
+from sqlalchemydiff.inspection import register
+from sqlalchemydiff.inspection.exceptions import UnknownInspector
+from sqlalchemydiff.inspection.ignore import EnumIgnoreSpec, TableIgnoreSpec, TableIncludeSpec
+from sqlalchemydiff.snapshot import Snapshot
+from tests import assert_items_equal
+from tests.base import BaseTest
+from tests.util import get_engine
+
+
+class TestSnapshot(BaseTest):
+    @pytest.fixture
+    def ignore_specs(self):
+        return [
+            TableIgnoreSpec("employees"),
+            TableIgnoreSpec("companies", "columns", "name"),
+            TableIgnoreSpec("roles", "primary_keys", "roles_pkey"),
+            TableIgnoreSpec("skills", "foreign_keys", "fk_skills_employees"),
+            EnumIgnoreSpec("title"),
+        ]
+
+    @pytest.mark.usefixtures("setup_db_one")
+    def test_take(self, db_engine_one, enums_one):
+        snapshot = Snapshot.take(db_engine_one)
+
+        assert snapshot.dialect == "postgresql"
+        assert list(snapshot.info) == list(register)
+        assert_items_equal(snapshot.info["enums"], enums_one)
+
+    @pytest.mark.usefixtures("setup_db_one")
+    def test_take_ignore_inspectors(self, db_engine_one):
+        snapshot = Snapshot.take(db_engine_one, ignore_inspectors=["columns", "enums"])
+        assert "columns" not in snapshot.info
+        assert "enums" not in snapshot.info
+
+    def test_take_unknown_inspector(self):
+        with pytest.raises(UnknownInspector, match="Unknown inspector: unknown"):
+            Snapshot.take(get_engine("sqlite://"), ignore_inspectors=["unknown"])
+
+    def test_take_unsupported_inspector(self, caplog):
+        engine = get_engine("sqlite://")
+
+        with caplog.at_level(logging.WARNING):
+            snapshot = Snapshot.take(engine)
+
+        assert "enums" not in snapshot.info
+        assert caplog.record_tuples == [
+            (
+                "sqlalchemydiff.snapshot",
+                logging.WARNING,
+                str(
+                    {
+                        "engine": engine,
+                        "inspector": "enums",
+                        "error": "enums are not supported on this database",
+                    }
+                ),
+            )
+        ]
+
+    @pytest.mark.usefixtures("setup_db_one")
+    def test_get_info(self, db_engine_one, ignore_specs):
+        snapshot = Snapshot.take(db_engine_one)
+
+        for _, inspector_class in register.values():
+            inspector = inspector_class()
+            expected = Snapshot.normalise(inspector.inspect(db_engine_one, ignore_specs))
+            assert snapshot.get_info(inspector, ignore_specs) == expected
+
+    @pytest.mark.usefixtures("setup_db_one")
+    def test_get_info_include(self, db_engine_one):
+        snapshot = Snapshot.take(db_engine_one)
+        ignore_specs = [TableIncludeSpec("employees"), TableIncludeSpec("role*")]
+
+        for _, inspector_class in register.values():
+            inspector = inspector_class()
+            expected = Snapshot.normalise(inspector.inspect(db_engine_one, ignore_specs))
+            assert snapshot.get_info(inspector, ignore_specs) == expected
+
+    def test_normalise(self):
+        assert Snapshot.normalise({"default": Decimal("1.5"), "labels": ("a", "b")}) == {
+            "default": "1.5",
+            "labels": ["a", "b"],
+        }
+
+    def test_get_info_missing_inspector(self):
+        assert Snapshot({}).get_info(register["tables"][1]()) is None
+
+    @pytest.mark.usefixtures("setup_db_one")
+    def test_dump_and_load(self, db_engine_one, tmp_path):
+        snapshot = Snapshot.take(db_engine_one)
+        filename = tmp_path / "snapshot.json"
+
+        snapshot.dump(filename)
+        loaded = Snapshot.load(filename)
+
+        assert loaded.info == snapshot.info
+        assert loaded.dialect == "postgresql"
+
+    def test_load_unsupported_format(self, tmp_path):
+        filename = tmp_path / "snapshot.json"
+        filename.write_text(json.dumps({"format_version": 0, "info": {}}))
+
+        with pytest.raises(ValueError, match="Unsupported snapshot format"):
+            Snapshot.load(filename)
+
+    @pytest.mark.usefixtures("setup_db_one", "setup_db_two")
+    def test_compare(self, db_engine_one, db_engine_two, compare_result, compare_errors):
+        comparer = Comparer(Snapshot.take(db_engine_one), db_engine_two)
+        result = comparer.compare()
+        assert result.result == compare_result
+        assert result.errors == compare_errors
@@ -0,0 +1,80 @@
+import pytest
+from sqlalchemy import event, text
+
+from sqlalchemydiff.comparer import Comparer
+from sqlalchemydiff.inspection import register
+from sqlalchemydiff.stats import CompareStats, InspectionStats, InspectorStats, StatsRecorder
+from tests.base import BaseTest
+from tests.util import get_engine
+
+
+class TestStatsRecorder:
+    @pytest.fixture
+    def engine(self):
+        return get_engine("sqlite://")
+
+    def test_listen(self, engine):
+        recorder = StatsRecorder()
+
+        with recorder.listen([engine, engine]), engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            with recorder.time_inspection("tables", "one"):
+                conn.execute(text("SELECT 1"))
+                conn.execute(text("SELECT 2"))
+
+        inspection_stats = recorder.stats.inspectors["tables"].inspection["one"]
+        assert inspection_stats.statements == 2
+        assert inspection_stats.rows == 0
+        assert inspection_stats.query_time > 0
+        assert inspection_stats.wall_time >= inspection_stats.query_time
+
+        assert not event.contains(engine, "before_cursor_execute", recorder._before_cursor_execute)
+        assert not event.contains(engine, "after_cursor_execute", recorder._after_cursor_execute)
+
+    def test_time_diff(self):
+        recorder = StatsRecorder()
+
+        with recorder.time_comparison():
+            with recorder.time_diff("columns"):
+                pass
+
+        assert recorder.stats.inspectors["columns"].diff_time > 0
+        assert recorder.stats.wall_time > recorder.stats.inspectors["columns"].diff_time
+
+    def test_as_dict(self):
+        stats = CompareStats(
+            inspectors={"tables": InspectorStats({"one": InspectionStats(1.0, 0.5, 2, 3)}, 0.1)},
+            wall_time=2.0,
+        )
+        assert stats.as_dict() == {
+            "inspectors": {
+                "tables": {
+                    "inspection": {
+                        "one": {"wall_time": 1.0, "query_time": 0.5, "statements": 2, "rows": 3}
+                    },
+                    "diff_time": 0.1,
+                }
+            },
+            "wall_time": 2.0,
+        }
+
+
+class TestCompareStats(BaseTest):
+    @pytest.mark.parametrize("jobs", [1, 4])
+    @pytest.mark.usefixtures("setup_db_one", "setup_db_two")
+    def test_compare(self, db_engine_one, db_engine_two, jobs):
+        comparer = Comparer(db_engine_one, db_engine_two)
+        result = comparer.compare(one_alias="production", two_alias="staging", jobs=jobs)
+
+        assert result.stats.wall_time > 0
+        assert set(result.stats.inspectors) == set(register)
+        for inspector_stats in result.stats.inspectors.values():
+            assert set(inspector_stats.inspection) == {"production", "staging"}
+            assert inspector_stats.diff_time > 0
+            for inspection_stats in inspector_stats.inspection.values():
+                assert inspection_stats.statements > 0
+                assert inspection_stats.rows > 0
+                assert inspection_stats.wall_time > inspection_stats.query_time > 0
+
+    def test_compare_result_without_stats(self):
+        assert Comparer.compare_result_class({}).stats is None
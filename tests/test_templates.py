@@ -0,0 +1,205 @@
+import re
+
+import pytest
+
+from sqlalchemydiff import templates
+from sqlalchemydiff.comparer import Comparer
+from sqlalchemydiff.snapshot import Snapshot
+from sqlalchemydiff.templates import (
+    TemplateTable,
+    find_template_tables,
+    get_definitions,
+    get_template_tables,
+)
+from tests.base import BaseTest
+from tests.util import get_engine, record_bulk_tables
+
+
+PATTERN = re.compile(r"tenant_\d+_(\w+)")
+
+
+def create_tenant(engine, tenant):
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            f"CREATE TABLE tenant_{tenant}_customers (id INTEGER PRIMARY KEY, name VARCHAR(50))"
+        )
+        conn.exec_driver_sql(
+            f"CREATE TABLE tenant_{tenant}_orders (id INTEGER PRIMARY KEY, "
+            f"customer_id INTEGER REFERENCES tenant_{tenant}_customers (id))"
+        )
+        conn.exec_driver_sql(
+            f"CREATE INDEX ix_tenant_{tenant}_orders_customer_id "
+            f"ON tenant_{tenant}_orders (customer_id)"
+        )
+
+
+def test_get_template_tables():
+    definitions = {
+        "tenant_1_orders": ["CREATE TABLE tenant_1_orders (id INTEGER)", "CREATE INDEX ix"],
+        "tenant_2_orders": ["CREATE INDEX ix", "CREATE TABLE tenant_2_orders (id INTEGER)"],
+        "tenant_3_orders": ["CREATE TABLE tenant_3_orders (id BIGINT)"],
+        "tenant_1_customers": ["CREATE TABLE tenant_1_customers (id INTEGER)"],
+        "employees": ["CREATE TABLE employees (id INTEGER)"],
+    }
+
+    tables = get_template_tables(definitions, PATTERN)
+
+    assert sorted(tables) == [
+        "tenant_1_customers",
+        "tenant_1_orders",
+        "tenant_2_orders",
+        "tenant_3_orders",
+    ]
+    assert tables["tenant_1_orders"].template == "orders"
+    assert tables["tenant_1_customers"].template == "customers"
+    assert tables["tenant_1_orders"].digest == tables["tenant_2_orders"].digest
+    assert tables["tenant_1_orders"].digest != tables["tenant_3_orders"].digest
+
+
+def test_get_template_tables_names():
+    definitions = {
+        "orders_1": ["CREATE TABLE orders_1 (x_1 INTEGER)", "CREATE INDEX ix_orders_1 ON orders_1"],
+        "orders_2": ["CREATE TABLE orders_2 (x_2 INTEGER)", "CREATE INDEX ix_orders_2 ON orders_2"],
+        "orders_3": ["CREATE TABLE orders_3 (x_1 INTEGER)", "CREATE INDEX ix_orders_3 ON orders_3"],
+        "items_1": ["CREATE TABLE items_1 (order_id INTEGER REFERENCES orders_1)"],
+        "items_2": ["CREATE TABLE items_2 (order_id INTEGER REFERENCES orders_2)"],
+        "items_3": ["CREATE TABLE items_3 (order_id INTEGER REFERENCES orders_1)"],
+    }
+
+    tables = get_template_tables(definitions, re.compile(r"(\w+)_\d+"))
+
+    # The rest of the name is only replaced in the names of the tables, not of the columns
+    assert tables["orders_1"].digest != tables["orders_2"].digest
+    assert tables["orders_1"].digest == tables["orders_3"].digest
+    # The references to the tables with the same rest of the name are replaced too
+    assert tables["items_1"].digest == tables["items_2"].digest
+    assert tables["items_1"].digest != tables["items_3"].digest
+
+
+def test_get_template_tables_optional_group():
+    definitions = {"orders": ["CREATE TABLE orders"], "orders_1": ["CREATE TABLE orders_1"]}
+
+    assert list(get_template_tables(definitions, re.compile(r"orders(_\d+)?"))) == ["orders_1"]
+
+
+def test_find_template_tables():
+    one = {
+        "t_1_orders": TemplateTable("orders", "a"),
+        "t_2_orders": TemplateTable("orders", "a"),
+        "t_3_orders": TemplateTable("orders", "b"),
+        "t_4_orders": TemplateTable("orders", "a"),
+        "t_9_customers": TemplateTable("customers", "c"),
+    }
+    two = {
+        "t_0_orders": TemplateTable("orders", "a"),
+        "t_1_orders": TemplateTable("orders", "a"),
+        "t_2_orders": TemplateTable("orders", "a"),
+        "t_3_orders": TemplateTable("orders", "a"),
+        "t_4_orders": TemplateTable("orders", "b"),
+        "t_8_customers": TemplateTable("customers", "c"),
+    }
+
+    # A table is only left out if its representative is in each database the table is in
+    assert find_template_tables([one, two]) == {
+        "t_0_orders": "t_1_orders",
+        "t_2_orders": "t_1_orders",
+    }
+
+
+def test_get_definitions_unsupported_dialect(monkeypatch):
+    monkeypatch.delitem(templates.finders, "sqlite")
+
+    with get_engine("sqlite://").connect() as conn:
+        assert get_definitions(conn, None) == {}
+
+
+class TestTemplates(BaseTest):
+    @pytest.fixture
+    def setup_tenants(self, setup_db_one, setup_db_two, db_engine_one, db_engine_two):
+        for engine in (db_engine_one, db_engine_two):
+            for tenant in ("0001", "0002", "0003"):
+                create_tenant(engine, tenant)
+
+    def test_get_definitions(self, setup_tenants, db_engine_one):
+        with db_engine_one.connect() as conn:
+            tables = get_template_tables(get_definitions(conn, None), PATTERN)
+
+        assert len({table.digest for table in tables.values()}) == 2
+        assert tables["tenant_0001_orders"] == tables["tenant_0003_orders"]
+
+    @pytest.mark.parametrize("consistent", [False, True])
+    def test_compare(self, setup_tenants, db_engine_one, db_engine_two, consistent):
+        with db_engine_two.begin() as conn:
+            conn.exec_driver_sql("ALTER TABLE tenant_0003_orders ADD COLUMN total INTEGER")
+            conn.exec_driver_sql("CREATE TABLE tenant_0004_orders (id INTEGER PRIMARY KEY)")
+
+        result = Comparer(db_engine_one, db_engine_two).compare(
+            include=["tenant_*"], template_pattern=PATTERN.pattern, consistent=consistent
+        )
+
+        # Only the representatives and the outliers are reflected
+        assert sorted(result.result["columns"]) == [
+            "tenant_0001_customers",
+            "tenant_0001_orders",
+            "tenant_0003_orders",
+            "tenant_0004_orders",
+        ]
+        assert sorted(result.errors["columns"]) == ["tenant_0003_orders", "tenant_0004_orders"]
+
+        # All the tables are still recorded
+        assert len(result.result["tables"]["common"]) == 6
+        assert result.result["tables"]["two_only"] == [
+            {"name": "tenant_0004_orders", "comment": ""}
+        ]
+
+    def test_compare_ignored_representative(self, setup_tenants, db_engine_one, db_engine_two):
+        result = Comparer(db_engine_one, db_engine_two).compare(
+            ignores=["tenant_0001_orders"],
+            include=["tenant_*"],
+            template_pattern=PATTERN.pattern,
+        )
+
+        assert sorted(result.result["columns"]) == ["tenant_0001_customers", "tenant_0002_orders"]
+
+
+class TestTemplatesSQLite:
+    def test_compare(self, tmp_path):
+        paths = [str(tmp_path / "one.db"), str(tmp_path / "two.db")]
+        for path in paths:
+            engine = get_engine(f"sqlite:///{path}")
+            for tenant in ("0001", "0002"):
+                create_tenant(engine, tenant)
+            engine.dispose()
+
+        result = Comparer.from_sqlite_files(*paths).compare(template_pattern=PATTERN.pattern)
+
+        assert sorted(result.result["columns"]) == ["tenant_0001_customers", "tenant_0001_orders"]
+        assert result.is_match
+
+    def test_compare_bulk(self, tmp_path):
+        engines = [get_engine(f"sqlite:///{tmp_path / name}.db") for name in ("one", "two")]
+        for engine in engines:
+            for tenant in ("0001", "0002", "0003"):
+                create_tenant(engine, tenant)
+        queried = record_bulk_tables(engines[0])
+
+        result = Comparer(*engines).compare(template_pattern=PATTERN.pattern)
+
+        assert result.is_match
+        # The other tables made from each template are not reflected by the bulk queries
+        assert queried
+        assert all(tables == {"tenant_0001_customers", "tenant_0001_orders"} for tables in queried)
+
+    @pytest.mark.parametrize(
+        "pattern, message",
+        [
+            (r"tenant_\d+_\w+", "template_pattern needs a group capturing the template name"),
+            (PATTERN, "template_pattern needs both sides to be databases"),
+        ],
+    )
+    def test_invalid(self, pattern, message):
+        engine = get_engine("sqlite://")
+        comparer = Comparer(engine, Snapshot.take(engine))
+
+        with pytest.raises(ValueError, match=message):
+            comparer.compare(template_pattern=pattern)
@@ -0,0 +1,110 @@
+import logging
+
+import pytest
+
+from sqlalchemydiff import tracing
+from sqlalchemydiff.comparer import Comparer
+from sqlalchemydiff.inspection import register
+from sqlalchemydiff.tracing import LoggingTracer, RecordingTracer, Tracer
+from tests.base import BaseTest
+
+
+@pytest.fixture
+def recording_tracer():
+    tracer = RecordingTracer()
+    tracing.add_tracer(tracer)
+    yield tracer
+    tracing.remove_tracer(tracer)
+
+
+class TestTracer:
+    @pytest.fixture
+    def tracer(self):
+        class TestTracer(Tracer):
+            def __init__(self):
+                self.calls = []
+
+            def start(self, phase, attributes):
+                self.calls.append(("start", phase, attributes))
+
+            def end(self, phase, attributes, error):
+                self.calls.append(("end", phase, attributes, error))
+
+        tracer = TestTracer()
+        tracing.add_tracer(tracer)
+        yield tracer
+        tracing.remove_tracer(tracer)
+
+    def test_span(self, tracer):
+        with tracing.span("diff", inspector="columns"):
+            pass
+
+        assert tracer.calls == [
+            ("start", "diff", {"inspector": "columns"}),
+            ("end", "diff", {"inspector": "columns"}, None),
+        ]
+
+    def test_span_error(self, tracer):
+        error = ValueError("boom")
+
+        with pytest.raises(ValueError, match="boom"), tracing.span("dump", filename="f"):
+            raise error
+
+        assert tracer.calls == [
+            ("start", "dump", {"filename": "f"}),
+            ("end", "dump", {"filename": "f"}, error),
+        ]
+
+    def test_base_tracer(self):
+        tracer = Tracer()
+
+        with tracer.span("diff", {}):
+            pass
+
+    def test_no_tracers(self):
+        assert tracing.span("diff", inspector="columns") is tracing._no_span
+
+    def test_logging_tracer(self, caplog):
+        tracer = LoggingTracer(level=logging.INFO)
+        tracing.add_tracer(tracer)
+
+        try:
+            with caplog.at_level(logging.INFO), tracing.span("diff", inspector="columns"):
+                pass
+        finally:
+            tracing.remove_tracer(tracer)
+
+        [record] = caplog.records
+        assert record.name == "sqlalchemydiff.tracing"
+        assert record.levelno == logging.INFO
+        assert record.msg["phase"] == "diff"
+        assert record.msg["inspector"] == "columns"
+        assert record.msg["duration"] >= 0
+
+
+class TestComparerTracing(BaseTest):
+    @pytest.mark.usefixtures("setup_db_one", "setup_db_two")
+    def test_compare(self, db_engine_one, db_engine_two, recording_tracer, tmp_path):
+        comparer = Comparer(db_engine_one, db_engine_two)
+        result = comparer.compare(ignore_inspectors=["enums"])
+        result.dump_errors(tmp_path / "errors.json")
+
+        events = recording_tracer.events
+        starts = [(phase, attributes) for event, phase, attributes in events if event == "start"]
+        ends = [(phase, attributes) for event, phase, attributes in events if event == "end"]
+        assert sorted(starts, key=str) == sorted(ends, key=str)
+
+        assert starts[:2] == [("connect", {"database": "one"}), ("connect", {"database": "two"})]
+        assert starts[-2:] == [
+            ("compile_errors", {}),
+            ("dump", {"filename": str(tmp_path / "errors.json")}),
+        ]
+
+        inspector_keys = [key for key in register if key != "enums"]
+        for key in inspector_keys:
+            assert ("inspect", {"inspector": key, "database": "one"}) in starts
+            assert ("inspect", {"inspector": key, "database": "two"}) in starts
+            assert ("diff", {"inspector": key}) in starts
+
+        assert ("inspect_table", {"inspector": "columns", "table": "employees"}) in starts
+        assert ("inspect_table", {"inspector": "tables", "table": "employees"}) in starts
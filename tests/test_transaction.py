@@ -0,0 +1,67 @@
+import pytest
+from sqlalchemy import inspect
+from sqlalchemy.exc import DBAPIError
+
+from sqlalchemydiff import tracing
+from sqlalchemydiff.comparer import Comparer
+from sqlalchemydiff.tracing import Tracer
+from sqlalchemydiff.transaction import export_snapshot, import_snapshot
+from tests.base import BaseTest
+from tests.util import get_engine
+
+
+class TestSnapshots(BaseTest):
+    @pytest.mark.usefixtures("setup_db_one")
+    def test_import_snapshot(self, db_engine_one):
+        with export_snapshot(db_engine_one) as snapshot_id:
+            with db_engine_one.begin() as conn:
+                conn.exec_driver_sql("CREATE TABLE late (id INTEGER)")
+
+            with import_snapshot(db_engine_one, snapshot_id) as conn:
+                assert "late" not in inspect(conn).get_table_names()
+                with pytest.raises(DBAPIError, match="read-only transaction"):
+                    conn.exec_driver_sql("CREATE TABLE later (id INTEGER)")
+
+        assert "late" in inspect(db_engine_one).get_table_names()
+
+
+class TestComparerConsistent(BaseTest):
+    @pytest.fixture
+    def migration(self, db_engine_two):
+        """Create a table in the second database when the first inspector starts."""
+
+        class MigrationTracer(Tracer):
+            def start(self, phase, attributes):
+                if phase == "inspect" and not self.done:
+                    self.done = True
+                    with db_engine_two.begin() as conn:
+                        conn.exec_driver_sql("CREATE TABLE late (id INTEGER)")
+
+        tracer = MigrationTracer()
+        tracer.done = False
+        tracing.add_tracer(tracer)
+        yield
+        tracing.remove_tracer(tracer)
+
+    @pytest.mark.usefixtures("setup_db_one", "setup_db_two")
+    @pytest.mark.parametrize("jobs", [1, 4])
+    def test_compare(self, db_engine_one, db_engine_two, compare_result, compare_errors, jobs):
+        comparer = Comparer(db_engine_one, db_engine_two)
+        result = comparer.compare(consistent=True, jobs=jobs)
+
+        assert result.result == compare_result
+        assert result.errors == compare_errors
+
+    @pytest.mark.usefixtures("setup_db_one", "setup_db_two", "migration")
+    def test_compare_during_migration(self, db_engine_one, db_engine_two, compare_result):
+        comparer = Comparer(db_engine_one, db_engine_two)
+        result = comparer.compare(consistent=True)
+
+        assert result.result == compare_result
+        assert "late" in inspect(db_engine_two).get_table_names()
+
+    def test_not_supported(self):
+        comparer = Comparer(get_engine("sqlite://"), get_engine("sqlite://"))
+
+        with pytest.raises(ValueError, match="only supported on PostgreSQL"):
+            comparer.compare(consistent=True)
@@ -1,6 +1,6 @@
 from collections.abc import Mapping
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.engine import Engine
 from sqlalchemy.orm.decl_api import DeclarativeMeta
 from sqlalchemy_utils import create_database, database_exists, drop_database
@@ -24,6 +24,22 @@ def get_engine(uri: str) -> Engine:
     return create_engine(uri)
 
 
+def record_bulk_tables(engine: Engine) -> list[set[str] | None]:
+    """Record the tables each bulk pragma query of a SQLite `engine` is restricted to.
+
+    `None` is recorded for the queries that are not restricted, and cover all the tables.
+    """
+    tables: list[set[str] | None] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if "LEFT JOIN pragma_" in statement:
+            # The first parameter is the schema, and the next ones the names of the tables
+            tables.append(set(parameters[1:]) if len(parameters) > 1 else None)
+
+    event.listen(engine, "before_cursor_execute", record)
+    return tables
+
+
 def prepare_schema_from_models(engine: Engine, sqlalchemy_base: DeclarativeMeta):
     """Creates the database schema from the `SQLAlchemy` models."""
     sqlalchemy_base.metadata.create_all(engine)